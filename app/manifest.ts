@@ -4,7 +4,8 @@ import type { MetadataRoute } from "next";
 // home screens + Chrome/Edge install prompts. Icons here mirror the
 // filesystem icons Next.js auto-serves from app/{icon,apple-icon}.png.
 // If the icons change, regenerate via scripts/gen_icons.py (mounts the
-// 1024px master at public/curify_logo_1024.png).
+// 1024px master at public/curify_logo_1024.png). The maskable entries use
+// the padded icon-maskable-* variants so launcher masks don't clip the logo.
 export default function manifest(): MetadataRoute.Manifest {
   return {
     name: "Curify AI",
@@ -29,7 +30,13 @@ export default function manifest(): MetadataRoute.Manifest {
         purpose: "any",
       },
       {
-        src: "/icon-512.png",
+        src: "/icon-maskable-192.png",
+        sizes: "192x192",
+        type: "image/png",
+        purpose: "maskable",
+      },
+      {
+        src: "/icon-maskable-512.png",
         sizes: "512x512",
         type: "image/png",
         purpose: "maskable",
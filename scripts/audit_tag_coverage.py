@@ -2,64 +2,32 @@
 """Audit gallery-tag → topic coverage.
 
 Reads lib/generated/nanobanana_prompts_metadata.json for the tag-count
-metadata, parses lib/topicRegistry.ts to extract TOPIC_GALLERY_TAG +
-EXTRA_TAG_TO_TOPICS values, and reports the % of tag occurrences that
-land in a topic via either bridge.
+metadata, reads TOPIC_GALLERY_TAG + EXTRA_TAG_TO_TOPICS from
+lib/topicRegistry_pure.ts (ts_registry.py), and reports the % of tag
+occurrences that land in a topic via either bridge.
 
 Run after editing the registry to confirm the coverage % moves in the
-direction the proposal at docs/gallery-tag-taxonomy.md predicted.
+direction the proposal at docs/gallery-tag-taxonomy.md predicted; with
+--watch it re-runs whenever the registry (or taxonomy.json) changes.
 """
+import argparse
 import json
-import re
+import time
 from pathlib import Path
 
-REPO = Path('/Users/qqwjq/curify-frontend')
+import ts_registry
 
+REPO = Path(__file__).resolve().parent.parent
 
-def parse_registry_tags():
-    """Pull tag keys + topic values from the two reverse-map blocks in
-    topicRegistry.ts. Robust to comment lines and trailing commas, but
-    expects the entries to be in the form `key: ["topic", ...]`.
-
-    Returns (topic_gallery_tag: dict[topic, tag], extra: dict[tag, [topic]]).
-    """
-    src = (REPO / 'lib/topicRegistry.ts').read_text(encoding='utf-8')
-
-    def block(name: str) -> str:
-        # Match: const NAME ... = { ... };
-        m = re.search(rf'const\s+{name}[^=]*=\s*\{{(.+?)\n\}}', src, re.S)
-        if not m:
-            raise RuntimeError(f'Could not locate {name} block in topicRegistry.ts')
-        return m.group(1)
-
-    def kv_lines(blk: str):
-        for line in blk.splitlines():
-            line = line.split('//', 1)[0].strip()
-            if not line:
-                continue
-            # key: value
-            m = re.match(r'^"?([^":,]+?)"?\s*:\s*(.+?),?\s*$', line)
-            if not m:
-                continue
-            yield m.group(1).strip(), m.group(2).strip()
-
-    # TOPIC_GALLERY_TAG: topic -> "tag string"
-    gallery: dict[str, str] = {}
-    for k, v in kv_lines(block('TOPIC_GALLERY_TAG')):
-        sv = v.strip().strip('"').strip("'")
-        gallery[k] = sv
-
-    # EXTRA_TAG_TO_TOPICS: tag -> ["topic", ...]
-    extra: dict[str, list[str]] = {}
-    for k, v in kv_lines(block('EXTRA_TAG_TO_TOPICS')):
-        items = re.findall(r'"([^"]+)"', v)
-        if items:
-            extra[k] = items
 
-    return gallery, extra
+def parse_registry_tags():
+    """(topic_gallery_tag: dict[topic, tag], extra: dict[tag, [topic]]) from
+    lib/topicRegistry_pure.ts, via the cached extractor in ts_registry.py."""
+    reg = ts_registry.load()
+    return reg.gallery_tag, reg.extra_tag_to_topics
 
 
-def main():
+def report():
     meta = json.loads(
         (REPO / 'lib/generated/nanobanana_prompts_metadata.json').read_text(encoding='utf-8')
     )['metadata']
@@ -93,5 +61,30 @@ def main():
         print(f'  {tag:<25s} {ct:>4d}')
 
 
+def main():
+    ap = argparse.ArgumentParser(description='Gallery-tag → topic coverage')
+    ap.add_argument('--watch', action='store_true', help='re-run when the registry changes')
+    args = ap.parse_args()
+    report()
+    if not args.watch:
+        return
+    deps = [ts_registry.REGISTRY_TS, REPO / 'lib/taxonomy.json',
+            REPO / 'lib/generated/nanobanana_prompts_metadata.json']
+    stamp = [p.stat().st_mtime_ns for p in deps]
+    try:
+        while True:
+            time.sleep(0.5)
+            now = [p.stat().st_mtime_ns for p in deps]
+            if now != stamp:
+                stamp = now
+                print(f'\n--- {time.strftime("%H:%M:%S")} ---')
+                try:
+                    report()
+                except (RuntimeError, SyntaxError, ValueError) as e:    # mid-edit file
+                    print(f'  (registry not readable yet: {e})')
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""One CLI for the search / routing benchmarks, with a run history.
+
+Suites (any subset, --suites a,b):
+  abstention   tool_intent_queries → /api/search-template-match; does top
+               confidence separate direct from gap? (calibrate_abstention)
+  routing      gap + direct queries → /api/design-agent/plan; plan shape
+               accuracy (eval_deliverable_routing)
+  search-eval  scripts/configs/search_eval_set.json → matcher template
+               richness vs `expected_templates` (same buckets and PASS/WARN/FAIL
+               rule as eval_search.cjs --matcher)
+  vir-gold     scripts/configs/vir_routing_gold.json → top-1 / top-3 route
+               accuracy against acceptable_template_ids
+Every suite also records latency (p50/p95/p99, seconds) and error count.
+
+Each run is stored in raw/bench/history.sqlite — run metadata (label, git SHA,
+dirty flag, endpoint, concurrency), one metric per row, and the per-query rows
+as JSON — so any two runs can be diffed later:
+
+    python3 scripts/bench.py run --label prompt-v7 [--suites abstention,vir-gold] [--baseline prompt-v6]
+    python3 scripts/bench.py list
+    python3 scripts/bench.py diff prompt-v6 [prompt-v7]     # label (latest run) or run id
+
+Point --base at eval_replay.py serve for a deterministic, offline run.
+Cache warning (as calibrate_abstention): restart the dev server between prompt
+changes, searchTemplateMatch keeps a process-local LRU.
+"""
+import argparse, asyncio, json, sqlite3, subprocess, time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import calibrate_abstention
+import eval_deliverable_routing
+from eval_http import Pool, percentiles, run_ordered
+
+ROOT = Path(__file__).resolve().parent.parent
+DB = ROOT / "raw" / "bench" / "history.sqlite"
+SEARCH_EVAL = ROOT / "scripts" / "configs" / "search_eval_set.json"
+VIR_GOLD = ROOT / "scripts" / "configs" / "vir_routing_gold.json"
+BASE = "http://localhost:3000"
+MATCH, PLAN = "/api/search-template-match", "/api/design-agent/plan"
+
+MATCHER_MIN_CONFIDENCE = 0.4            # production GenerableTemplatesSection threshold
+TPL_BUCKET_ORDER = ["empty", "thin", "moderate", "rich"]
+
+
+def _latency(rows, key="latency_s"):
+    xs = [r[key] for r in rows if key in r]
+    return {f"latency_p{p}_s": round(v, 4) for p, v in percentiles(xs).items()}
+
+
+def _mean(xs):
+    return sum(xs) / len(xs) if xs else 0.0
+
+
+async def _match_all(base, queries, concurrency):
+    """POST each query to the matcher; [(Response | Exception)] in order."""
+    async with Pool(base, size=concurrency, timeout=90) as pool:
+        return await run_ordered(queries, lambda q: pool.post_json(MATCH, {"query": q}, tries=2), concurrency)
+
+
+def _matches(r):
+    if isinstance(r, Exception) or not r.ok:
+        return None
+    try:
+        body = r.json()
+    except ValueError:
+        return None
+    if not isinstance(body, dict):
+        return None
+    return sorted(body.get("matches") or [], key=lambda m: -m.get("confidence", 0))
+
+
+async def suite_abstention(base, concurrency, a):
+    qs = calibrate_abstention.load_queries(a.tool_queries)
+    rows = await calibrate_abstention.collect(qs, base + MATCH, concurrency, log=lambda *_: None)
+    by = defaultdict(list)
+    for r in rows:
+        by[r["coverage"]].append(r["top_conf"])
+    d, g = by.get("direct", []), by.get("gap", [])
+    m = {"n": len(qs), "errors": len(qs) - len(rows),
+         "direct_conf_mean": _mean(d), "adjacent_conf_mean": _mean(by.get("adjacent", [])),
+         "gap_conf_mean": _mean(g), "separation": _mean(d) - _mean(g),
+         "direct_kept_at_0.60": _mean([c >= .60 for c in d]), "gap_rejected_at_0.60": _mean([c < .60 for c in g])}
+    best = max((_mean([c >= t for c in d]) + _mean([c < t for c in g]), t)
+               for t in [x / 100 for x in range(40, 96, 5)])
+    m.update(best_threshold=best[1], best_keep_plus_reject=best[0], **_latency(rows))
+    return m, rows
+
+
+async def suite_routing(base, concurrency, a):
+    qs = [q for q in calibrate_abstention.load_queries(a.tool_queries) if q.get("coverage") in ("gap", "direct")]
+    rows = await eval_deliverable_routing.plan_all(qs, base + PLAN, concurrency)
+    ok = [r for r in rows if "error" not in r]
+    scored = [r for r in ok if r["coverage"] == "gap" and r["expected"]]
+    direct = [r for r in ok if r["coverage"] == "direct"]
+    gap = [r for r in ok if r["coverage"] == "gap"]
+    m = {"n": len(rows), "errors": len(rows) - len(ok),
+         "gap_shape_accuracy": _mean([r["got"] == r["expected"] for r in scored]),
+         "gap_multi_step": _mean([r["steps"] > 1 for r in gap]),
+         "direct_single": _mean([r["got"] == "single" for r in direct]),
+         "direct_planned": _mean([r["steps"] > 0 for r in direct]), **_latency(rows)}
+    for shape, s in eval_deliverable_routing.latency_table(rows).items():
+        m[f"{shape}_latency_p50_s"], m[f"{shape}_latency_p95_s"] = s["wall_p50"], s["wall_p95"]
+    return m, rows
+
+
+def _tpl_bucket(count):
+    return "rich" if count >= 3 else "moderate" if count >= 2 else "thin" if count >= 1 else "empty"
+
+
+async def suite_search_eval(base, concurrency, a):
+    items = json.loads(SEARCH_EVAL.read_text(encoding="utf-8"))["queries"]
+    res = await _match_all(base, [q["query"] for q in items], concurrency)
+    rows, verdicts = [], Counter()
+    for q, r in zip(items, res):
+        ms = _matches(r)
+        row = {"query": q["query"], "expected_templates": q.get("expected_templates") or ""}
+        if ms is None:
+            row["error"] = True
+        else:
+            count = sum(m.get("confidence", 0) >= MATCHER_MIN_CONFIDENCE for m in ms)
+            bucket = _tpl_bucket(count)
+            row.update(matcher_count=count, tpl_bucket=bucket)
+            if row["expected_templates"] in TPL_BUCKET_ORDER:
+                diff = abs(TPL_BUCKET_ORDER.index(bucket) - TPL_BUCKET_ORDER.index(row["expected_templates"]))
+                row["tpl_verdict"] = "PASS" if diff <= 1 else "WARN" if diff == 2 else "FAIL"
+                verdicts[row["tpl_verdict"]] += 1
+        if not isinstance(r, Exception):
+            row["latency_s"] = round(r.elapsed, 4)
+        rows.append(row)
+    scored = sum(verdicts.values())
+    m = {"n": len(items), "errors": sum("error" in r for r in rows), "scored": scored,
+         "pass_rate": verdicts["PASS"] / scored if scored else 0.0,
+         "warn": verdicts["WARN"], "fail": verdicts["FAIL"],
+         "matcher_count_mean": _mean([r["matcher_count"] for r in rows if "matcher_count" in r]),
+         **_latency(rows)}
+    return m, rows
+
+
+async def suite_vir_gold(base, concurrency, a):
+    items = json.loads(VIR_GOLD.read_text(encoding="utf-8"))["queries"]
+    res = await _match_all(base, [q["query"] for q in items], concurrency)
+    rows = []
+    for q, r in zip(items, res):
+        ms = _matches(r)
+        row = {"query": q["query"], "ambiguity": q.get("ambiguity"), "primary": q.get("primary_template_id")}
+        if ms is None:
+            row["error"] = True
+        else:
+            ids = [m.get("template_id") for m in ms]
+            ok, near = set(q.get("acceptable_template_ids") or []), set(q.get("near_miss_template_ids") or [])
+            row.update(top=ids[:3], top_conf=ms[0].get("confidence", 0) if ms else 0.0,
+                       top1=bool(ids) and ids[0] in ok, top3=bool(ok.intersection(ids[:3])),
+                       near_miss_top1=bool(ids) and ids[0] in near)
+        if not isinstance(r, Exception):
+            row["latency_s"] = round(r.elapsed, 4)
+        rows.append(row)
+    ok = [r for r in rows if "error" not in r]
+    m = {"n": len(items), "errors": len(items) - len(ok),
+         "top1_accuracy": _mean([r["top1"] for r in ok]), "top3_accuracy": _mean([r["top3"] for r in ok]),
+         "near_miss_top1": _mean([r["near_miss_top1"] for r in ok]),
+         "correct_conf_mean": _mean([r["top_conf"] for r in ok if r["top1"]]),
+         "wrong_conf_mean": _mean([r["top_conf"] for r in ok if not r["top1"]])}
+    m["separation"] = m["correct_conf_mean"] - m["wrong_conf_mean"]
+    for amb in ("low", "medium", "high"):
+        sub = [r for r in ok if r["ambiguity"] == amb]
+        if sub:
+            m[f"top1_accuracy_{amb}"] = _mean([r["top1"] for r in sub])
+    m.update(_latency(rows))
+    return m, rows
+
+
+SUITES = {"abstention": suite_abstention, "routing": suite_routing,
+          "search-eval": suite_search_eval, "vir-gold": suite_vir_gold}
+
+
+# --- history -----------------------------------------------------------------
+
+def connect(path=DB):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY, started TEXT, label TEXT, git_sha TEXT, git_dirty INTEGER,
+            base TEXT, concurrency INTEGER, suites TEXT, wall_s REAL);
+        CREATE TABLE IF NOT EXISTS metrics (
+            run_id INTEGER, suite TEXT, metric TEXT, value REAL, PRIMARY KEY (run_id, suite, metric));
+        CREATE TABLE IF NOT EXISTS rows (run_id INTEGER, suite TEXT, data TEXT);
+    """)
+    return db
+
+
+def git_state():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return git("rev-parse", "--short=12", "HEAD") or "unknown", bool(git("status", "--porcelain", "-uno"))
+
+
+def resolve(db, ref):
+    """Run id, or the latest run carrying that label."""
+    if ref is None:
+        row = db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    elif str(ref).isdigit():
+        row = db.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+    else:
+        row = db.execute("SELECT id FROM runs WHERE label = ? ORDER BY id DESC LIMIT 1", (ref,)).fetchone()
+    if not row:
+        raise SystemExit(f"no run matching {ref!r} in {DB}")
+    return row[0]
+
+
+def load_metrics(db, run_id):
+    out = defaultdict(dict)
+    for suite, metric, value in db.execute("SELECT suite, metric, value FROM metrics WHERE run_id = ?", (run_id,)):
+        out[suite][metric] = value
+    return out
+
+
+def direction(metric):
+    """+1 higher is better, -1 lower is better, 0 informational."""
+    if "latency" in metric or metric in ("errors", "warn", "fail", "near_miss_top1", "gap_conf_mean"):
+        return -1
+    if metric in ("n", "scored", "best_threshold") or metric.endswith("conf_mean") or metric == "matcher_count_mean":
+        return 0
+    return 1
+
+
+def diff(db, base_id, new_id, tol=0.05):
+    """Print baseline → run for every metric of the suites the run has; a change
+    bigger than `tol` (relative, absolute when the baseline is 0) in the wrong
+    direction counts as a regression. Returns the regression count."""
+    meta = {r[0]: r for r in db.execute("SELECT id, label, git_sha, git_dirty, started FROM runs WHERE id IN (?, ?)",
+                                        (base_id, new_id))}
+    for rid, tag in ((base_id, "baseline"), (new_id, "run")):
+        _, label, sha, dirty, started = meta[rid]
+        print(f"{tag:9s} #{rid} {label} @ {sha}{'+dirty' if dirty else ''}  {started}")
+    old, new = load_metrics(db, base_id), load_metrics(db, new_id)
+    regressions = 0
+    skipped = sorted(set(old) - set(new))
+    if skipped:
+        print(f"(baseline-only suites not compared: {', '.join(skipped)})")
+    for suite in sorted(new):
+        print(f"\n[{suite}]")
+        o, n = old.get(suite, {}), new.get(suite, {})
+        for metric in sorted(set(o) | set(n)):
+            a, b = o.get(metric), n.get(metric)
+            if a is None or b is None:
+                print(f"  {metric:28s} {'' if a is None else f'{a:10.4f}':>10s} → {'' if b is None else f'{b:10.4f}':>10s}")
+                continue
+            delta, sign = b - a, direction(metric)
+            flag = ""
+            if abs(delta) > tol * (abs(a) or 1) and sign:
+                better = (delta > 0) == (sign > 0)
+                flag = "  better" if better else "  WORSE"
+                regressions += not better
+            pct = f" ({100 * delta / a:+.0f}%)" if a else ""
+            print(f"  {metric:28s} {a:10.4f} → {b:10.4f}  {delta:+.4f}{pct}{flag}")
+    print(f"\n{regressions} metric(s) moved the wrong way")
+    return regressions
+
+
+def cmd_run(a):
+    suites = [s.strip() for s in a.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise SystemExit(f"unknown suite(s): {', '.join(sorted(unknown))} (have: {', '.join(SUITES)})")
+    sha, dirty = git_state()
+    db = connect()
+    t0 = time.time()
+    results = {}
+    for s in suites:
+        ts = time.time()
+        print(f"[{s}] → {a.base} (concurrency {a.concurrency})")
+        results[s] = asyncio.run(SUITES[s](a.base, a.concurrency, a))
+        m = results[s][0]
+        print("  " + "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in m.items()))
+        print(f"  {time.time() - ts:.1f}s")
+    cur = db.execute(
+        "INSERT INTO runs (started, label, git_sha, git_dirty, base, concurrency, suites, wall_s) VALUES (?,?,?,?,?,?,?,?)",
+        (time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t0)), a.label, sha, int(dirty), a.base,
+         a.concurrency, ",".join(suites), round(time.time() - t0, 2)))
+    run_id = cur.lastrowid
+    for s, (m, rows) in results.items():
+        db.executemany("INSERT INTO metrics VALUES (?,?,?,?)", [(run_id, s, k, float(v)) for k, v in m.items()])
+        db.executemany("INSERT INTO rows VALUES (?,?,?)", [(run_id, s, json.dumps(r, ensure_ascii=False)) for r in rows])
+    db.commit()
+    print(f"\nrun #{run_id} '{a.label}' @ {sha}{'+dirty' if dirty else ''} → {DB.relative_to(ROOT)}")
+    if a.baseline:
+        print()
+        diff(db, resolve(db, a.baseline), run_id)
+
+
+def cmd_list(a):
+    db = connect()
+    for rid, started, label, sha, dirty, suites, wall in db.execute(
+            "SELECT id, started, label, git_sha, git_dirty, suites, wall_s FROM runs ORDER BY id DESC LIMIT ?", (a.limit,)):
+        print(f"#{rid:<4d} {started}  {label:20s} {sha}{'+' if dirty else ' '} {wall:7.1f}s  {suites}")
+
+
+def cmd_diff(a):
+    db = connect()
+    diff(db, resolve(db, a.baseline), resolve(db, a.run), a.tol)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Search / routing benchmark suite with run history")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run suites and store the result")
+    r.add_argument("--suites", default=",".join(SUITES), help=f"comma list of {', '.join(SUITES)}")
+    r.add_argument("--label", default="run")
+    r.add_argument("--base", default=BASE, help="dev server (or eval_replay.py serve) origin")
+    r.add_argument("--concurrency", type=int, default=8)
+    r.add_argument("--tool-queries", default=calibrate_abstention.QUERIES, help="tool_intent_queries.jsonl")
+    r.add_argument("--baseline", help="diff against this run id / label when done")
+    r.set_defaults(fn=cmd_run)
+    ls = sub.add_parser("list", help="recent runs")
+    ls.add_argument("--limit", type=int, default=20)
+    ls.set_defaults(fn=cmd_list)
+    d = sub.add_parser("diff", help="compare two stored runs")
+    d.add_argument("baseline", help="run id or label (latest run with it)")
+    d.add_argument("run", nargs="?", help="run id or label (default: latest run)")
+    d.add_argument("--tol", type=float, default=0.05, help="relative change ignored as noise (default 0.05)")
+    d.set_defaults(fn=cmd_diff)
+    a = ap.parse_args()
+    a.fn(a)
+
+
+if __name__ == "__main__":
+    main()
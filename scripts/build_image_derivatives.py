@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Build responsive derivatives for the public image tree — incrementally.
+
+For every image under the roots (default public/images — the gallery and
+nano_insp / nano_insp_preview examples synced from GCS) this emits:
+
+    public/images/_derived/<rel path>-<w>w.webp   one per ladder width
+    public/images/_derived/<rel path>-<w>w.avif   (when Pillow has AVIF)
+
+and records, in lib/generated/image_derivatives.json,
+
+    "/images/nano_insp/x.jpg": {
+        "w": 1536, "h": 2048,                       # intrinsic size → width/height attrs, no layout shift
+        "lqip": "data:image/webp;base64,...",       # ~20 px blur placeholder
+        "variants": {"webp": [{"w": 320, "h": 427, "src": "/images/_derived/nano_insp/x.jpg-320w.webp"}, ...],
+                     "avif": [...]},
+        "sha": "<content hash of the source>"}
+
+The source extension stays in the name (x.jpg-640w.webp), so x.jpg and x.png in
+one folder don't write each other's variants.
+
+Incremental: a source whose content hash (and the build settings) match the
+manifest, with every variant file still on disk, is skipped — a rebuild after a
+drop only touches the new images. Widths never upscale: the ladder is clipped
+to the source width. Work is spread over a process pool (--workers).
+
+Usage:
+    python3 scripts/build_image_derivatives.py [--root public/images] [--workers 8] [--prune] [--force]
+Then sync public/images/_derived to the bucket with the rest of public/images.
+"""
+import argparse, base64, hashlib, io, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+REPO = Path(__file__).resolve().parent.parent
+PUBLIC = REPO / "public"
+ROOTS = [PUBLIC / "images"]
+OUT_DIR = PUBLIC / "images" / "_derived"
+MANIFEST = REPO / "lib" / "generated" / "image_derivatives.json"
+
+LADDER = (320, 640, 960, 1280, 1920)
+QUALITY = {"webp": 78, "avif": 52}
+LQIP_W = 20
+NAMING = "<rel path>-<w>w"              # part of the settings signature: a rename rebuilds everything
+EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def formats():
+    return [f for f in ("webp", "avif") if features.check(f)]
+
+
+def settings_sig(fmts):
+    return hashlib.sha256(json.dumps([LADDER, QUALITY, LQIP_W, fmts, NAMING]).encode()).hexdigest()[:12]
+
+
+def file_sha(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def url_of(path):
+    return "/" + path.relative_to(PUBLIC).as_posix()
+
+
+def derived_path(src, width, fmt):
+    rel = src.relative_to(PUBLIC / "images")
+    return OUT_DIR / f"{rel.as_posix()}-{width}w.{fmt}"
+
+
+def widths_for(w):
+    return sorted({min(x, w) for x in LADDER})
+
+
+def build_one(src, sha, fmts):
+    """Decode once, emit every variant + the LQIP. Returns the manifest entry."""
+    im = ImageOps.exif_transpose(Image.open(src))
+    alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+    im = im.convert("RGBA" if alpha else "RGB")
+    w, h = im.size
+    entry = {"w": w, "h": h, "variants": {f: [] for f in fmts}, "sha": sha}
+    # largest first, each step resampled from the master (reducing_gap does the
+    # cheap integer pre-shrink, LANCZOS the final pass)
+    for width in reversed(widths_for(w)):
+        size = (width, max(1, round(h * width / w)))
+        v = im if size == im.size else im.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        for fmt in fmts:
+            out = derived_path(src, width, fmt)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            tmp = out.with_name(out.name + ".tmp")
+            v.save(tmp, fmt.upper(), quality=QUALITY[fmt], **({"method": 5} if fmt == "webp" else {"speed": 6}))
+            os.replace(tmp, out)
+            entry["variants"][fmt].append({"w": size[0], "h": size[1], "src": url_of(out)})
+    for f in fmts:
+        entry["variants"][f].sort(key=lambda x: x["w"])
+    lq = im.resize((LQIP_W, max(1, round(h * LQIP_W / w))), Image.BILINEAR, reducing_gap=2.0)
+    buf = io.BytesIO()
+    lq.save(buf, "WEBP", quality=40)
+    entry["lqip"] = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()
+    return entry
+
+
+def _job(args):
+    src, sha, fmts = args
+    try:
+        return url_of(src), build_one(src, sha, fmts), None
+    except Exception as e:     # noqa: BLE001 — one bad file must not sink the batch
+        return url_of(src), None, f"{type(e).__name__}: {e}"
+
+
+def fresh(entry, sha, fmts):
+    if not entry or entry.get("sha") != sha:
+        return False
+    variants = entry.get("variants", {})
+    return all(variants.get(f) and all((PUBLIC / v["src"].lstrip("/")).exists() for v in variants[f])
+               for f in fmts)
+
+
+def walk(roots):
+    for root in roots:
+        for p in sorted(Path(root).rglob("*")):
+            if p.suffix.lower() in EXTS and OUT_DIR not in p.parents and p.is_file():
+                yield p
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental responsive image derivatives + dimension manifest")
+    ap.add_argument("--root", action="append", type=Path, help="image tree(s) under public/images (repeatable)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--force", action="store_true", help="rebuild everything")
+    ap.add_argument("--prune", action="store_true", help="drop manifest entries + derived files for deleted sources")
+    a = ap.parse_args()
+
+    fmts = formats()
+    sig = settings_sig(fmts)
+    old = json.loads(MANIFEST.read_text(encoding="utf-8")) if MANIFEST.exists() else {}
+    images = old.get("images", {}) if old.get("settings") == sig and not a.force else {}
+
+    t0 = time.time()
+    roots = [r.resolve() for r in (a.root or ROOTS)]
+    for r in roots:
+        if not r.is_relative_to((PUBLIC / "images").resolve()):
+            raise SystemExit(f"--root must be inside public/images: {r}")
+    srcs = list(walk(roots))
+    todo, seen = [], set()
+    for src in srcs:
+        url = url_of(src)
+        seen.add(url)
+        sha = file_sha(src)
+        if not fresh(images.get(url), sha, fmts):
+            todo.append((src, sha, fmts))
+    print(f"{len(srcs)} sources, {len(todo)} to build ({', '.join(fmts)}; ladder {'/'.join(map(str, LADDER))})")
+
+    errors = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=max(1, a.workers)) as pool:
+            for i, (url, entry, err) in enumerate(pool.map(_job, todo, chunksize=4), 1):
+                if err:
+                    errors += 1
+                    print(f"  ERROR {url}: {err}")
+                else:
+                    images[url] = entry
+                if i % 100 == 0:
+                    print(f"  {i}/{len(todo)}")
+
+    if a.prune:
+        gone = [u for u in images if u not in seen and any(
+            (PUBLIC / u.lstrip("/")).is_relative_to(r) for r in roots)]
+        for u in gone:
+            for f in images[u]["variants"].values():
+                for v in f:
+                    (PUBLIC / v["src"].lstrip("/")).unlink(missing_ok=True)
+            del images[u]
+        print(f"  pruned {len(gone)}")
+
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST.write_text(json.dumps({"settings": sig, "images": dict(sorted(images.items()))},
+                                   ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    print(f"{len(images)} images in {MANIFEST.relative_to(REPO)}; built {len(todo) - errors}, "
+          f"{errors} errors, {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
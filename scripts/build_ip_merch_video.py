@@ -13,10 +13,27 @@ zoom and crossfades, over a music bed.
 Usage:
   python scripts/build_ip_merch_video.py <ip-key> <source.png> <emotion.png> \
       <sticker.png> <mockup.png> <music.mp3> <out.mp4>
+  python scripts/build_ip_merch_video.py --batch manifest.json [--jobs 4] [--cache DIR]
+
+Batch mode builds many IPs from a manifest — a JSON list of
+  {"ip", "source", "emotion", "sticker", "mockup", "music", "out"}
+(relative paths resolve against the manifest's folder). Instead of one big
+zoompan+xfade encode per IP it:
+  1. encodes each zoomed panel ONCE as a short intermediate clip, cached under
+     raw/.cache/ip-merch-clips/ by a hash of the panel pixels + encode settings —
+     so the outro (identical for every IP) is encoded once ever, and re-running
+     after changing one IP's mockup only re-encodes that panel;
+  2. assembles each IP (xfade chain + music) from the cached clips, several IPs in
+     parallel (--jobs);
+  3. prints per-video timings (render / panel encode / assemble, cache hits) so the
+     filter graph can be tuned with numbers.
 """
-import os, sys, subprocess, tempfile
+import hashlib, json, os, sys, subprocess, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+import image_cache
+
 W, H = 1080, 1920
 PANEL_SEC = 2.9
 XFADE = 0.5
@@ -24,6 +41,10 @@ FPS = 30
 INDIGO = (91, 63, 214)
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOGO = os.path.join(ROOT, "public", "curify_logo_1024.png")
+CLIP_CACHE = os.path.join(ROOT, "raw", ".cache", "ip-merch-clips")
+ZOOM = "z='min(zoom+0.0009,1.10)'"
+CLIP_X264 = ["-c:v", "libx264", "-preset", "medium", "-crf", "14", "-pix_fmt", "yuv420p"]
+CAPTIONS = ["YOUR CHARACTER", "9 EXPRESSIONS", "STICKER PACK", "ON MERCH"]
 
 
 def _font(size, bold=True):
@@ -35,26 +56,17 @@ def _font(size, bold=True):
     return ImageFont.load_default()
 
 
-def _cover(img, w, h):
-    s = max(w / img.width, h / img.height)
-    im = img.resize((int(img.width * s) + 1, int(img.height * s) + 1), Image.LANCZOS)
-    x = (im.width - w) // 2; y = (im.height - h) // 2
-    return im.crop((x, y, x + w, y + h))
-
-
 def content_panel(img_path, caption, logo):
-    im = Image.open(img_path).convert("RGB")
-    # blurred cover-fill background, slightly darkened
-    bg = _cover(im, W, H).filter(ImageFilter.GaussianBlur(40))
+    # blurred cover-fill background, slightly darkened (both resamples come from
+    # the on-disk image cache — the source is only decoded on a miss)
+    bg = image_cache.cover(img_path, (W, H)).filter(ImageFilter.GaussianBlur(40))
     dark = Image.new("RGB", (W, H), (0, 0, 0))
     bg = Image.blend(bg, dark, 0.28)
     page = bg
     d = ImageDraw.Draw(page)
     # contained image, centered, with a soft white card behind
-    box_w, box_h = int(W * 0.9), int(H * 0.62)
-    s = min(box_w / im.width, box_h / im.height)
-    nw, nh = int(im.width * s), int(im.height * s)
-    im2 = im.resize((nw, nh), Image.LANCZOS)
+    im2 = image_cache.fit(img_path, (int(W * 0.9), int(H * 0.62)))
+    nw, nh = im2.size
     ix, iy = (W - nw) // 2, (H - nh) // 2
     d.rectangle([ix - 16, iy - 16, ix + nw + 16, iy + nh + 16], fill=(255, 255, 255))
     page.paste(im2, (ix, iy))
@@ -101,15 +113,123 @@ def outro_panel(logo):
     return page
 
 
+# ── batch mode: cached per-panel clips + parallel assembly ──────────────────
+_outro = None
+
+
+def _outro_image(logo):
+    """The outro is the same for every IP — render it once per process."""
+    global _outro
+    if _outro is None:
+        _outro = outro_panel(logo)
+    return _outro
+
+
+def panel_clip(img, cache_dir):
+    """Encode one panel as its own zoompan clip, cached by pixel hash + settings.
+    Returns (clip path, was_cached)."""
+    d_frames = int(PANEL_SEC * FPS)
+    h = hashlib.sha256()
+    h.update(f"{W}x{H}|{FPS}|{d_frames}|{ZOOM}|{' '.join(CLIP_X264)}|{img.mode}{img.size}".encode())
+    h.update(img.tobytes())
+    clip = os.path.join(cache_dir, f"{h.hexdigest()[:24]}.mp4")
+    if os.path.exists(clip):
+        return clip, True
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="ipclip-") as tmp:
+        png = os.path.join(tmp, "panel.png")
+        img.save(png)
+        part = os.path.join(tmp, "clip.mp4")
+        # single input frame -> zoompan emits exactly d_frames frames (= PANEL_SEC)
+        vf = (f"scale={W}:{H},zoompan={ZOOM}:d={d_frames}:"
+              f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s={W}x{H}:fps={FPS},setsar=1")
+        subprocess.run(["ffmpeg", "-y", "-i", png, "-vf", vf, "-frames:v", str(d_frames),
+                        *CLIP_X264, "-r", str(FPS), part],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        os.replace(part, clip)   # atomic: parallel jobs never see a half-written clip
+    return clip, False
+
+
+def assemble(clips, music, out):
+    """xfade chain over pre-encoded panel clips + music bed. Returns video seconds."""
+    n = len(clips)
+    inputs = []
+    for c in clips:
+        inputs += ["-i", c]
+    inputs += ["-i", music]
+    # xfade needs a declared constant frame rate on each input; setpts alone drops it
+    fc = [f"[{i}:v]setpts=PTS-STARTPTS,fps={FPS}[v{i}]" for i in range(n)]
+    prev = "v0"
+    total = PANEL_SEC
+    for i in range(1, n):
+        off = total - XFADE
+        out_lbl = f"x{i}"
+        fc.append(f"[{prev}][v{i}]xfade=transition=fade:duration={XFADE}:offset={off:.3f}[{out_lbl}]")
+        prev = out_lbl
+        total += PANEL_SEC - XFADE
+    vdur = total
+    fc.append(f"[{n}:a]afade=t=in:st=0:d=0.6,afade=t=out:st={vdur-1.0:.3f}:d=1.0,atrim=0:{vdur:.3f}[a]")
+    cmd = ["ffmpeg", "-y", *inputs, "-filter_complex", ";".join(fc),
+           "-map", f"[{prev}]", "-map", "[a]", "-c:v", "libx264", "-pix_fmt", "yuv420p",
+           "-c:a", "aac", "-b:a", "160k", "-shortest", "-r", str(FPS), out]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return vdur
+
+
+def build_job(job, logo, cache_dir):
+    t0 = time.time()
+    imgs = [content_panel(job[k], cap, logo)
+            for k, cap in zip(("source", "emotion", "sticker", "mockup"), CAPTIONS)]
+    imgs.append(_outro_image(logo))
+    t1 = time.time()
+    clips, hits = [], 0
+    for im in imgs:
+        c, cached = panel_clip(im, cache_dir)
+        clips.append(c); hits += cached
+    t2 = time.time()
+    os.makedirs(os.path.dirname(os.path.abspath(job["out"])), exist_ok=True)
+    vdur = assemble(clips, job["music"], job["out"])
+    t3 = time.time()
+    print(f"OK {job['ip']} -> {job['out']}  ({vdur:.1f}s video) "
+          f"render {t1-t0:.1f}s  panels {t2-t1:.1f}s ({hits}/{len(clips)} cached)  "
+          f"assemble {t3-t2:.1f}s  total {t3-t0:.1f}s")
+    return {"ip": job["ip"], "render": t1 - t0, "panels": t2 - t1, "cached": hits,
+            "assemble": t3 - t2, "total": t3 - t0}
+
+
+def main_batch(argv):
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", required=True, help="manifest JSON: [{ip, source, emotion, sticker, mockup, music, out}]")
+    ap.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                    help="IPs assembled in parallel (each ffmpeg is itself multi-threaded)")
+    ap.add_argument("--cache", default=CLIP_CACHE, help="panel clip cache dir")
+    a = ap.parse_args(argv)
+    root = os.path.dirname(os.path.abspath(a.batch))
+    jobs = json.load(open(a.batch))
+    for j in jobs:
+        for k in ("source", "emotion", "sticker", "mockup", "music", "out"):
+            j[k] = os.path.join(root, j[k])
+    logo = Image.open(LOGO).convert("RGBA")
+    # encode the shared outro up front so parallel jobs don't race to encode it
+    panel_clip(_outro_image(logo), a.cache)
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=a.jobs) as ex:
+        stats = list(ex.map(lambda j: build_job(j, logo, a.cache), jobs))
+    wall = time.time() - t0
+    if stats:
+        mean = lambda k: sum(s[k] for s in stats) / len(stats)
+        print(f"\n{len(stats)} video(s) in {wall:.1f}s wall, --jobs {a.jobs}; per video mean: "
+              f"render {mean('render'):.1f}s  panels {mean('panels'):.1f}s  "
+              f"assemble {mean('assemble'):.1f}s  total {mean('total'):.1f}s")
+
+
 def main():
+    if "--batch" in sys.argv[1:]:
+        return main_batch(sys.argv[1:])
     ip, src, emo, stk, mock, music, out = sys.argv[1:8]
     logo = Image.open(LOGO).convert("RGBA")
-    panels = [
-        (src, "YOUR CHARACTER"),
-        (emo, "9 EXPRESSIONS"),
-        (stk, "STICKER PACK"),
-        (mock, "ON MERCH"),
-    ]
+    panels = list(zip([src, emo, stk, mock], CAPTIONS))
     tmp = tempfile.mkdtemp(prefix=f"ipvid-{ip}-")
     frame_paths = []
     for i, (p, cap) in enumerate(panels):
@@ -131,7 +251,7 @@ def main():
     fc = []
     for i in range(n):
         fc.append(
-            f"[{i}:v]scale={W}:{H},zoompan=z='min(zoom+0.0009,1.10)':d={d_frames}:"
+            f"[{i}:v]scale={W}:{H},zoompan={ZOOM}:d={d_frames}:"
             f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s={W}x{H}:fps={FPS},setsar=1[v{i}]"
         )
     prev = "v0"
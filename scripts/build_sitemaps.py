@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Sharded, gzipped sitemaps built straight from the catalogs, diffed against the last build.
+
+The live sitemaps (app/sitemap.xml, sitemap-blogs.xml, sitemap-examples.xml
+route.ts) render every URL on each request, and the audits need a separate dump
+of them (seo_funnel_audit.py's --sitemap). This builds the same URL set offline
+from the same inputs:
+
+    pages     static routes, topics (template topics with EN i18n), MBTI types,
+              use cases, tools, tags (EN only), nano templates  — app/sitemap.xml
+    blogs     public/data/blogs.json                            — app/sitemap-blogs.xml
+    examples  public/data/nano_inspiration.json, GSC-whitelisted — app/sitemap-examples.xml
+
+Lastmod / priority / locale policy is read from those route.ts files (their
+*_LASTMOD constants, STATIC_ROUTES, PERSONALITY_LOCALES, TOPIC_LASTMOD_OVERRIDES)
+and lib/seo_retitled_templates.ts, so a bump there is a bump here.
+
+Each section is split into 2^k shards by a hash of the route (all locales of a
+route stay together), k being the smallest that keeps every shard under 50,000
+URLs and 50 MB uncompressed. A new template or example therefore lands in one
+shard and only that shard's file changes; files whose content is unchanged are
+not rewritten, and the index carries each shard's newest lastmod.
+
+Output (default raw/sitemaps/; --out public/sitemaps to serve them statically):
+    <section>-<n>.xml.gz      shards
+    sitemap-index.xml         index over the shards (locs under --base-url)
+    manifest.json             shard → sha / URL count / lastmod
+    urls.tsv                  every URL + its lastmod — the next build's diff base,
+                              and a --sitemap input for seo_funnel_audit.py
+    diff.json                 added / removed / lastmod-bumped URLs since the last build
+                              (feed "added" to the Indexing API)
+
+Usage:
+    python3 scripts/build_sitemaps.py [--out raw/sitemaps] [--base-url https://www.curify-ai.com/sitemaps]
+                                      [--inspiration public/data/nano_inspiration.json] [--dry-run]
+"""
+import argparse, gzip, hashlib, io, json, os, re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from site_routes import LOCALES, SITE
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA = ROOT / "public" / "data"
+OUT = ROOT / "raw" / "sitemaps"
+MAX_URLS = 50_000
+MAX_BYTES = 50 * 1000 * 1000
+FILL = 0.8                           # start k with this much headroom per shard
+
+PAGES_TS = ROOT / "app" / "sitemap.xml" / "route.ts"
+EXAMPLES_TS = ROOT / "app" / "sitemap-examples.xml" / "route.ts"
+RETITLED_TS = ROOT / "lib" / "seo_retitled_templates.ts"
+
+
+# --- TS constants ---------------------------------------------------------------
+
+def _src(path):
+    return path.read_text(encoding="utf-8")
+
+
+def _const(src, name):
+    m = re.search(rf"const\s+{name}\b[^=]*=\s*\"([^\"]*)\"", src)
+    if not m:
+        raise RuntimeError(f"could not locate const {name}")
+    return m.group(1)
+
+
+def _block(src, name, open_="[", close="]"):
+    m = re.search(rf"const\s+{name}\b[^=]*=\s*(?:new Set\(\s*)?{re.escape(open_)}(.*?){re.escape(close)}", src, re.S)
+    if not m:
+        raise RuntimeError(f"could not locate const {name}")
+    return "\n".join(l.split("//", 1)[0] for l in m.group(1).splitlines())
+
+
+def _strings(src, name):
+    return re.findall(r"\"([^\"]*)\"", _block(src, name))
+
+
+def _enc(s):
+    return quote(s, safe="-_.!~*'()")              # encodeURIComponent
+
+
+def _to_slug(template_id):
+    return re.sub(r"^template-", "", template_id)   # lib/nano_pure.ts toSlug
+
+
+def _iso(s, default):
+    """Date string as the routes print it (new Date(s).toISOString())."""
+    if not s:
+        return default
+    for parse in (lambda v: datetime.fromisoformat(v.replace("Z", "+00:00")),
+                  lambda v: datetime.strptime(v, "%B %d, %Y")):
+        try:
+            d = parse(s)
+        except ValueError:
+            continue
+        d = d.replace(tzinfo=d.tzinfo or timezone.utc).astimezone(timezone.utc)
+        return d.strftime("%Y-%m-%dT%H:%M:%S.") + f"{d.microsecond // 1000:03d}Z"
+    return default
+
+
+def _json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- URL sources ----------------------------------------------------------------
+# Each yields (route, emit_locales, hreflang_locales, lastmod, changefreq, priority).
+
+def _template_topics(templates):
+    seen = {}
+    for t in templates:
+        raw = t.get("topics")
+        for tp in raw if isinstance(raw, list) else (raw.split(",") if isinstance(raw, str) else []):
+            tp = tp.strip().lower()
+            if tp:
+                seen.setdefault(tp, None)
+    return list(seen)
+
+
+def pages(templates):
+    src, ret = _src(PAGES_TS), _src(RETITLED_TS)
+    stable, topics_lm = _const(src, "STABLE_LASTMOD"), _const(src, "TOPICS_LASTMOD")
+    overrides = dict(re.findall(r"(?m)^\s*\"?([\w-]+)\"?\s*:\s*\"([^\"]+)\"",
+                                _block(src, "TOPIC_LASTMOD_OVERRIDES", "{", "}")))
+    localized = set(_json(ROOT / "messages" / "en" / "topics.json")["topics"])
+    personality = _strings(src, "PERSONALITY_LOCALES")
+    tpl_lm, retitled_lm = _const(src, "NANO_TEMPLATES_LASTMOD"), _const(ret, "SEO_RETITLED_LASTMOD")
+    retitled = set(_strings(ret, "SEO_RETITLED_TEMPLATE_IDS"))
+
+    for route in _strings(src, "STATIC_ROUTES"):
+        yield route, LOCALES, LOCALES, stable, "daily" if route == "" else "weekly", None
+    for tp in _template_topics(templates):
+        if tp in localized:
+            yield f"/topics/{tp}", LOCALES, LOCALES, overrides.get(tp, topics_lm), "weekly", "0.8"
+    for t in _strings(_src(ROOT / "lib" / "mbti-meta.ts"), "MBTI_TYPES"):
+        yield f"/personality/{t}", personality, personality, _const(src, "PERSONALITY_LASTMOD"), "weekly", "0.7"
+    for slug in re.findall(r"\bslug:\s*\"([^\"]+)\"", _block(_src(ROOT / "lib" / "use-cases.ts"), "USE_CASES", "[", "\n]")):
+        yield f"/use-cases/{slug}", LOCALES, LOCALES, _const(src, "USE_CASES_LASTMOD"), "weekly", "0.8"
+    tools = _block(_src(ROOT / "lib" / "tools-registry.ts"), "TOOL_REGISTRY", "[", "\n]")
+    for slug, status in re.findall(r"\bslug:\s*\"([^\"]+)\"[^{}]*?\bstatus:\s*\"(\w+)\"", tools):
+        if status != "coming_soon":
+            yield f"/tools/{_enc(slug)}", LOCALES, LOCALES, _const(src, "TOOLS_LASTMOD"), "weekly", "0.8"
+    for t in _json(ROOT / "lib" / "generated" / "nanobanana_prompts_metadata.json")["metadata"]["tags"]:
+        yield f"/nano-banana-pro-prompts/tag/{_enc(t['tag'])}", ["en"], LOCALES, stable, "weekly", "0.7"
+    for t in templates:
+        tid = t.get("id")
+        if not isinstance(tid, str) or not tid:
+            continue
+        tid = tid.strip()
+        locs = [l for l in (t.get("locales") or {}) if l in LOCALES] or ["en"]
+        lm = retitled_lm if tid in retitled and retitled_lm > tpl_lm else tpl_lm
+        yield f"/nano-template/{_enc(_to_slug(tid))}", locs, locs, lm, "weekly", "0.6"
+
+
+def blogs(path=DATA / "blogs.json", today=None):
+    today = today or datetime.now(timezone.utc).strftime("%Y-%m-%dT00:00:00.000Z")
+    for b in _json(path):
+        if b.get("slug"):
+            yield (f"/blog/{_enc(b['slug'])}", LOCALES, LOCALES, _iso(b.get("lastmod") or b.get("date"), today),
+                   "weekly", "0.7")
+
+
+def examples(templates, path=DATA / "nano_inspiration.json", now=None):
+    src, ret = _src(EXAMPLES_TS), _src(RETITLED_TS)
+    stable = _const(src, "STABLE_LASTMOD")
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=int(
+        re.search(r"FRESH_WINDOW_DAYS\s*=\s*(\d+)", src).group(1)))
+    retitled = set(_strings(ret, "SEO_RETITLED_TEMPLATE_IDS"))
+    retitled_lm, i18n_lm, mbti_lm = (_const(ret, n) for n in
+                                     ("SEO_RETITLED_LASTMOD", "I18N_DESCRIPTIONS_LASTMOD", "MBTI_RECRAWL_LASTMOD"))
+    i18n_ids = set(_json(ROOT / "messages" / "en" / "example.json"))
+    visible = set(_json(DATA / "example_visibility_whitelist.json").get("ids") or [])
+    tpl_locales = {t["id"].strip(): list(t["locales"]) for t in templates
+                   if isinstance(t.get("id"), str) and t.get("locales")}
+
+    def fresh(ex):
+        d = _iso(ex.get("updated_at") or ex.get("lastmod") or ex.get("date"), None)
+        return d is not None and d >= cutoff.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    for ex in _json(path):
+        if not ex.get("id") or not ex.get("template_id"):
+            continue
+        tid, eid = str(ex["template_id"]).strip(), str(ex["id"]).strip()
+        if not (eid in visible or tid in retitled or fresh(ex)):
+            continue
+        locs = LOCALES if ex.get("allow_i18n") else (list(ex.get("locales") or {}) or tpl_locales.get(tid) or LOCALES)
+        lm = (mbti_lm if "mbti" in tid else i18n_lm if eid in i18n_ids else retitled_lm if tid in retitled
+              else ex.get("updated_at") or ex.get("lastmod") or ex.get("date") or stable)
+        yield f"/nano-template/{_enc(_to_slug(tid))}/example/{_enc(eid)}", locs, locs, lm, "weekly", "0.5"
+
+
+# --- rendering / sharding -------------------------------------------------------
+
+def _loc(locale, route):
+    return f"{SITE}{'' if locale == 'en' else '/' + locale}{route}"
+
+
+def _url_xml(locale, route, alternates, lastmod, changefreq, priority):
+    links = "".join(f'<xhtml:link rel="alternate" hreflang="{l}" href="{escape(_loc(l, route))}"/>'
+                    for l in alternates)
+    links += f'<xhtml:link rel="alternate" hreflang="x-default" href="{escape(SITE + route)}"/>'
+    priority = priority or ("1.0" if route == "" and locale == "en" else "0.8")
+    return (f"<url><loc>{escape(_loc(locale, route))}</loc><lastmod>{lastmod}</lastmod>"
+            f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority>{links}</url>\n")
+
+
+URLSET_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+               'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n')
+URLSET_TAIL = "</urlset>\n"
+
+
+def _bucket(route, k):
+    return int.from_bytes(hashlib.blake2b(route.encode(), digest_size=8).digest(), "little") & ((1 << k) - 1)
+
+
+def shard(name, entries):
+    """[(shard name, xml bytes, [(url, lastmod)])] for one section."""
+    entries = sorted({e[0]: e for e in entries}.values())              # one entry per route
+    n_urls = sum(len(e[1]) for e in entries)
+    k = 0
+    while n_urls > MAX_URLS * FILL * (1 << k):
+        k += 1
+    while True:
+        buckets = defaultdict(list)
+        for e in entries:
+            buckets[_bucket(e[0], k)].append(e)
+        out, fits = [], True
+        for b in range(1 << k):
+            parts, urls = [URLSET_HEAD], []
+            for route, locs, alternates, lastmod, freq, prio in buckets.get(b, []):
+                for loc in locs:
+                    parts.append(_url_xml(loc, route, alternates, lastmod, freq, prio))
+                    urls.append((_loc(loc, route), lastmod))
+            parts.append(URLSET_TAIL)
+            xml = "".join(parts).encode()
+            if len(urls) > MAX_URLS or len(xml) > MAX_BYTES:
+                fits = False
+                break
+            out.append((f"{name}-{b}.xml.gz", xml, urls))
+        if fits:
+            return out
+        k += 1
+
+
+def _gzip(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(filename="", mode="wb", fileobj=buf, mtime=0) as f:   # reproducible bytes
+        f.write(data)
+    return buf.getvalue()
+
+
+def _write(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _index(shards, base_url):
+    rows = "".join(f"<sitemap><loc>{escape(base_url)}/{name}</loc><lastmod>{s['lastmod']}</lastmod></sitemap>\n"
+                   for name, s in sorted(shards.items()))
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f"{rows}</sitemapindex>\n").encode()
+
+
+def _read_urls(path):
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return dict(line.rstrip("\n").split("\t", 1) for line in f if "\t" in line)
+
+
+def build(out=OUT, base_url=f"{SITE}/sitemaps", inspiration=DATA / "nano_inspiration.json", dry_run=False):
+    """Build into `out`; returns (manifest, diff)."""
+    templates = _json(DATA / "nano_templates.json")
+    sections = {"pages": pages(templates), "blogs": blogs()}
+    if inspiration.exists():
+        sections["examples"] = examples(templates, inspiration)
+    else:
+        print(f"  ({inspiration} not found — examples section skipped)")
+
+    old_manifest = _json(out / "manifest.json") if (out / "manifest.json").exists() else {"shards": {}}
+    old_urls = _read_urls(out / "urls.tsv")
+    shards, urls, written = {}, {}, []
+    for name, entries in sections.items():
+        for fname, xml, shard_urls in shard(name, entries):
+            sha = hashlib.sha256(xml).hexdigest()
+            shards[fname] = {"sha": sha, "urls": len(shard_urls),
+                             "lastmod": max((lm for _, lm in shard_urls), default="")}
+            urls.update(shard_urls)
+            if old_manifest["shards"].get(fname, {}).get("sha") != sha or not (out / fname).exists():
+                written.append(fname)
+                if not dry_run:
+                    out.mkdir(parents=True, exist_ok=True)
+                    _write(out / fname, _gzip(xml))
+    stale = sorted(set(old_manifest["shards"]) - set(shards))
+
+    prev = old_urls or {}
+    diff = {"since": old_manifest.get("built"),
+            "added": sorted(u for u in urls if u not in prev),
+            "removed": sorted(u for u in prev if u not in urls),
+            "updated": sorted(u for u, lm in urls.items() if u in prev and prev[u] != lm)}
+    manifest = {"built": datetime.now(timezone.utc).isoformat(timespec="seconds"), "base_url": base_url,
+                "shards": shards}
+    if not dry_run:
+        for fname in stale:
+            (out / fname).unlink(missing_ok=True)
+        _write(out / "sitemap-index.xml", _index(shards, base_url))
+        _write(out / "urls.tsv", "".join(f"{u}\t{lm}\n" for u, lm in sorted(urls.items())).encode())
+        _write(out / "manifest.json", json.dumps(manifest, indent=2).encode())
+        _write(out / "diff.json", json.dumps(diff, indent=2).encode())
+    manifest["written"], manifest["stale"] = written, stale
+    return manifest, diff
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build sharded sitemaps from the catalogs and diff against the last build")
+    ap.add_argument("--out", type=Path, default=OUT)
+    ap.add_argument("--base-url", default=f"{SITE}/sitemaps", help="where the shards are served (index <loc>s)")
+    ap.add_argument("--inspiration", type=Path, default=DATA / "nano_inspiration.json")
+    ap.add_argument("--dry-run", action="store_true", help="report what would change, write nothing")
+    a = ap.parse_args()
+
+    manifest, diff = build(a.out, a.base_url.rstrip("/"), a.inspiration, a.dry_run)
+    shards = manifest["shards"]
+    print(f"{sum(s['urls'] for s in shards.values()):,} URLs in {len(shards)} shards → {a.out}")
+    for name, s in sorted(shards.items()):
+        mark = "written" if name in manifest["written"] else "unchanged"
+        print(f"  {name:<22} {s['urls']:>7,} URLs  lastmod {s['lastmod'][:10]}  {mark}")
+    for name in manifest["stale"]:
+        print(f"  {name:<22} removed")
+    if diff["since"] is None:
+        print("no previous build — every URL counts as added")
+    print(f"since {diff['since'] or '-'}: +{len(diff['added']):,} added, -{len(diff['removed']):,} removed, "
+          f"{len(diff['updated']):,} lastmod bumped")
+    for u in diff["added"][:10]:
+        print(f"  + {u}")
+    if a.dry_run:
+        print("(dry run — nothing written)")
+
+
+if __name__ == "__main__":
+    main()
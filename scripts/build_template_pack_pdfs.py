@@ -16,14 +16,17 @@ Two image sources:
 Usage:
     python scripts/build_template_pack_pdfs.py            # build everything in PACKS
     python scripts/build_template_pack_pdfs.py <template_id>   # just one template
+    python scripts/build_template_pack_pdfs.py --compact [--quality 70]
+        # vector text + JPEG photos (images_to_pdf compact mode) — much smaller
+        # files for the 50/100 packs; verify a layout change with images_to_pdf --check
 
 Output: raw/template-packs/{template_id}/pack-{size}.pdf  (ready to upload).
 """
-import json, os, sys, glob
+import argparse, json, os, sys, glob
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.join(ROOT, "scripts"))
-from images_to_pdf import build_pdf  # noqa: E402
+from images_to_pdf import JPEG_QUALITY, build_pdf  # noqa: E402
 
 OUT_ROOT = os.path.join(ROOT, "raw", "template-packs")
 NANO_INSP = os.path.join(ROOT, "public", "data", "nano_inspiration.json")
@@ -85,7 +88,7 @@ def resolve_items(pack):
     raise ValueError(kind)
 
 
-def build_one(pack):
+def build_one(pack, compact=False, quality=JPEG_QUALITY):
     items = resolve_items(pack)
     if len(items) < pack["size"]:
         print(f"  SKIP {pack['template_id']} pack-{pack['size']}: only {len(items)} images (need {pack['size']})")
@@ -94,9 +97,11 @@ def build_one(pack):
     out_dir = os.path.join(OUT_ROOT, pack["template_id"])
     os.makedirs(out_dir, exist_ok=True)
     out = os.path.join(out_dir, f"pack-{pack['size']}.pdf")
-    _, pages, size = build_pdf(items, out, subtitle=pack.get("subtitle", SUBTITLE))
+    _, pages, size = build_pdf(items, out, subtitle=pack.get("subtitle", SUBTITLE),
+                               compact=compact, quality=quality)
     mb = os.path.getsize(out) / 1e6
-    print(f"  OK {pack['template_id']} pack-{pack['size']}: {pages}p {size[0]}x{size[1]} {mb:.1f}MB -> {out}")
+    mode = f" compact q{quality}" if compact else ""
+    print(f"  OK {pack['template_id']} pack-{pack['size']}: {pages}p {size[0]}x{size[1]}{mode} {mb:.1f}MB -> {out}")
     return out
 
 
@@ -114,13 +119,17 @@ def load_extra_packs():
 
 
 def main():
-    only = sys.argv[1] if len(sys.argv) > 1 else None
+    ap = argparse.ArgumentParser()
+    ap.add_argument("template_id", nargs="?", help="build only this template's packs")
+    ap.add_argument("--compact", action="store_true", help="vector text + JPEG photos (smaller PDFs)")
+    ap.add_argument("--quality", type=int, default=JPEG_QUALITY, help="JPEG quality for --compact")
+    a = ap.parse_args()
     packs = PACKS + load_extra_packs()
-    if only:
-        packs = [p for p in packs if p["template_id"] == only]
+    if a.template_id:
+        packs = [p for p in packs if p["template_id"] == a.template_id]
     print(f"building {len(packs)} pack(s) -> {OUT_ROOT}")
     for p in packs:
-        build_one(p)
+        build_one(p, compact=a.compact, quality=a.quality)
 
 
 if __name__ == "__main__":
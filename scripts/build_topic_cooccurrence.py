@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Topic × topic co-occurrence → lib/generated/topic_cooccurrence.json (the related-topics
+fill in getFurtherExplorationTopics, lib/topicRegistry.ts).
+
+Each catalog record contributes its set of topic slugs once:
+
+    inspirations   public/data/nano_inspiration.json   topics[] ∪ tags[]
+    templates      public/data/nano_templates.json     topics[]
+    gallery        public/data/nanobanana.json         tags[], mapped to topics through
+                                                       GALLERY_TAG_TO_TOPICS (ts_registry)
+
+Slugs are canonicalised through taxonomy_index. The records become a NumPy COO
+incidence (record, topic); the upper-triangle pair counts come from a vectorised
+self-join per record, so no Python loop runs over pairs. Scores, per pair with
+count c over N records and topic frequencies n_a, n_b:
+
+    lift = c·N / (n_a·n_b)    pmi = log lift    npmi = pmi / -log(c/N)   (default)
+
+then pairs under --min-count are dropped and each topic keeps its --top best.
+Only topics with a localized /topics page (messages/en/topics.json) are written
+— the TS side filters to those anyway.
+
+The counts and each record's slug set are kept in raw/.cache/topic-cooccurrence.npz.
+A later run diffs the catalogs against it by record id and adds / subtracts only
+the changed records' pairs, so a daily drop costs the size of the drop; --full
+recounts from scratch. A catalog missing from disk would read as every one of its
+records deleted, so the JSON and the state are only written when all three are
+present, unless --allow-partial.
+
+    python3 scripts/build_topic_cooccurrence.py                  # incremental, writes the JSON
+    python3 scripts/build_topic_cooccurrence.py --full --score lift --top 12 --dry-run
+    python3 scripts/build_topic_cooccurrence.py --show anatomy
+    python3 scripts/build_topic_cooccurrence.py --allow-partial   # write with a catalog missing
+"""
+import argparse, json, os, time
+from pathlib import Path
+
+import numpy as np
+
+import taxonomy_index
+import ts_registry
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA = ROOT / "public" / "data"
+SOURCES = {
+    "inspirations": DATA / "nano_inspiration.json",
+    "templates":    DATA / "nano_templates.json",
+    "gallery":      DATA / "nanobanana.json",
+}
+OUT = ROOT / "lib" / "generated" / "topic_cooccurrence.json"
+I18N = ROOT / "messages" / "en" / "topics.json"
+STATE = ROOT / "raw" / ".cache" / "topic-cooccurrence.npz"
+STATE_VERSION = 1
+
+
+def records():
+    """{"<source>:<id>": sorted slug tuple} over the catalogs present on disk."""
+    idx = taxonomy_index.load()
+    norm = lambda t: idx.canonical(t) or t.strip().lower()
+    tag_topics = None
+    out = {}
+    for source, path in SOURCES.items():
+        if not path.exists():
+            print(f"  {source}: {path.relative_to(ROOT)} missing — skipped")
+            continue
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, dict):                          # the gallery file is wrapped
+            data = data.get("prompts", [])
+        for i, r in enumerate(data):
+            if source == "gallery":
+                if tag_topics is None:
+                    tag_topics = ts_registry.load().tag_to_topics()
+                slugs = set()
+                for t in r.get("tags") or []:
+                    if isinstance(t, str):
+                        t = t.strip().lower()
+                        slugs.update(tag_topics.get(t, ()))
+                        slugs.add(norm(t))
+            else:
+                raw = [*(r.get("topics") or []), *((r.get("tags") or []) if source == "inspirations" else [])]
+                slugs = {norm(t) for t in raw if isinstance(t, str) and t.strip()}
+            slugs.discard("")
+            if slugs:
+                out[f"{source}:{r.get('id', i)}"] = tuple(sorted(slugs))
+        print(f"  {source}: {len(data):,} records")
+    return out
+
+
+# --- counting --------------------------------------------------------------------
+
+class Counts:
+    """Upper-triangle pair counts (i < j) over a growing slug vocabulary."""
+
+    def __init__(self, vocab=(), n=None, pi=None, pj=None, pc=None, docs=0, recs=None):
+        self.vocab = list(vocab)
+        self.ids = {s: k for k, s in enumerate(self.vocab)}
+        self.n = np.zeros(len(self.vocab), np.int64) if n is None else n
+        self.pi = np.zeros(0, np.int64) if pi is None else pi
+        self.pj = np.zeros(0, np.int64) if pj is None else pj
+        self.pc = np.zeros(0, np.int64) if pc is None else pc
+        self.docs = docs
+        self.recs = {} if recs is None else recs           # record key → slug tuple counted
+
+    def _ids(self, slugs):
+        for s in slugs:
+            if s not in self.ids:
+                self.ids[s] = len(self.vocab)
+                self.vocab.append(s)
+        if len(self.n) < len(self.vocab):
+            self.n = np.concatenate([self.n, np.zeros(len(self.vocab) - len(self.n), np.int64)])
+        return [self.ids[s] for s in slugs]
+
+    def apply(self, slug_sets, sign):
+        """Add (sign=1) or remove (sign=-1) records, each a sorted slug tuple."""
+        if not slug_sets:
+            return
+        sizes = np.fromiter((len(s) for s in slug_sets), np.int64, len(slug_sets))
+        topic = np.fromiter((k for s in slug_sets for k in self._ids(s)), np.int64, int(sizes.sum()))
+        np.add.at(self.n, topic, sign)
+        self.docs += sign * len(slug_sets)
+        # pair every element with the ones after it in the same record
+        after = np.repeat(np.cumsum(sizes), sizes) - np.arange(len(topic)) - 1
+        left = np.repeat(np.arange(len(topic)), after)
+        right = left + 1 + np.arange(int(after.sum())) - np.repeat(np.cumsum(after) - after, after)
+        a, b = topic[left], topic[right]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        self._merge(lo, hi, np.full(len(lo), sign, np.int64))
+
+    def _merge(self, lo, hi, c):
+        v = max(len(self.vocab), 1)
+        code = np.concatenate([self.pi * v + self.pj, lo * v + hi])
+        uniq, inv = np.unique(code, return_inverse=True)
+        count = np.bincount(inv, np.concatenate([self.pc, c]), len(uniq)).astype(np.int64)
+        keep = count > 0
+        self.pi, self.pj, self.pc = uniq[keep] // v, uniq[keep] % v, count[keep]
+
+    def update(self, recs):
+        """Bring the counts in line with `recs`; returns (added, removed) record counts."""
+        gone = [k for k in self.recs if recs.get(k) != self.recs[k]]
+        new = [k for k, s in recs.items() if self.recs.get(k) != s]
+        self.apply([self.recs.pop(k) for k in gone], -1)
+        self.apply([recs[k] for k in new], 1)
+        self.recs.update((k, recs[k]) for k in new)
+        return len(new), len(gone)
+
+    # state file: parallel arrays, record slug sets flattened with offsets
+    def save(self, path=STATE):
+        keys = list(self.recs)
+        flat = [self.ids[s] for k in keys for s in self.recs[k]]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp, version=STATE_VERSION, vocab=np.array(self.vocab, dtype=str), n=self.n,
+                            pi=self.pi, pj=self.pj, pc=self.pc, docs=self.docs,
+                            keys=np.array(keys, dtype=str), flat=np.array(flat, np.int64),
+                            sizes=np.array([len(self.recs[k]) for k in keys], np.int64))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=STATE):
+        try:
+            z = np.load(path)
+        except (OSError, ValueError):
+            return None
+        if int(z["version"]) != STATE_VERSION:
+            return None
+        vocab = z["vocab"].tolist()
+        bounds = np.cumsum(z["sizes"])
+        slug_sets = np.split(z["flat"], bounds[:-1]) if len(bounds) else []
+        recs = {k: tuple(vocab[i] for i in ids) for k, ids in zip(z["keys"].tolist(), slug_sets)}
+        return cls(vocab, z["n"], z["pi"], z["pj"], z["pc"], int(z["docs"]), recs)
+
+
+# --- scoring ---------------------------------------------------------------------
+
+def related(counts, score="npmi", top=12, min_count=2, allowed=None):
+    """{topic: [related topic, …]} — best `top` per topic by `score`."""
+    keep = counts.pc >= min_count
+    i, j, c = counts.pi[keep], counts.pj[keep], counts.pc[keep].astype(float)
+    if allowed is not None:
+        ok = np.array([s in allowed for s in counts.vocab], bool)
+        mask = ok[i] & ok[j]
+        i, j, c = i[mask], j[mask], c[mask]
+    N, n = float(max(counts.docs, 1)), counts.n.astype(float)
+    lift = c * N / (n[i] * n[j])
+    if score == "lift":
+        s = lift
+    elif score == "pmi":
+        s = np.log(lift)
+    else:                                                   # a pair in every record has npmi 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = np.where(c < N, np.log(lift) / -np.log(c / N), 1.0)
+    # both directions, then top-k per row: sort by (row, -score, count desc, slug)
+    rows, cols, sc, cc = np.concatenate([i, j]), np.concatenate([j, i]), np.tile(s, 2), np.tile(c, 2)
+    names = np.array(counts.vocab, dtype=str)
+    order = np.lexsort((names[cols] if len(cols) else cols, -cc, -sc, rows))
+    rows, cols = rows[order], cols[order]
+    first = np.r_[0, np.flatnonzero(np.diff(rows)) + 1] if len(rows) else np.zeros(0, np.int64)
+    rank = np.arange(len(rows)) - np.repeat(first, np.diff(np.r_[first, len(rows)]))
+    rows, cols = rows[rank < top], cols[rank < top]
+    out = {}
+    for r, col in zip(rows.tolist(), cols.tolist()):
+        out.setdefault(counts.vocab[r], []).append(counts.vocab[col])
+    return dict(sorted(out.items()))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build lib/generated/topic_cooccurrence.json")
+    ap.add_argument("--full", action="store_true", help="recount from scratch instead of diffing the cached state")
+    ap.add_argument("--score", choices=("npmi", "pmi", "lift"), default="npmi")
+    ap.add_argument("--top", type=int, default=12, help="related topics kept per topic")
+    ap.add_argument("--min-count", type=int, default=2, help="drop pairs seen in fewer records")
+    ap.add_argument("--all-slugs", action="store_true", help="keep slugs without a localized /topics page")
+    ap.add_argument("--out", type=Path, default=OUT)
+    ap.add_argument("--dry-run", action="store_true", help="print a summary, write nothing")
+    ap.add_argument("--allow-partial", action="store_true",
+                    help="write the JSON and state even when a catalog is missing")
+    ap.add_argument("--show", metavar="TOPIC", help="print one topic's related list with its counts")
+    a = ap.parse_args()
+
+    recs = records()
+    counts = None if a.full else Counts.load()
+    t0 = time.perf_counter()
+    if counts is None:
+        counts = Counts()
+        print("  no usable state — full count" if not a.full else "  full count")
+    added, removed = counts.update(recs)
+    t1 = time.perf_counter()
+    allowed = None if a.all_slugs else set(json.loads(I18N.read_text(encoding="utf-8")).get("topics", {}))
+    rel = related(counts, a.score, a.top, a.min_count, allowed)
+    t2 = time.perf_counter()
+    print(f"{counts.docs:,} records, {len(counts.vocab):,} slugs, {len(counts.pc):,} pairs "
+          f"(+{added:,} / -{removed:,} records, {(t1 - t0) * 1e3:.0f} ms) → {len(rel):,} topics "
+          f"scored by {a.score} in {(t2 - t1) * 1e3:.0f} ms")
+
+    if a.show:
+        k = counts.ids.get(a.show)
+        if k is None:
+            raise SystemExit(f"{a.show}: not in any record")
+        pair = {(int(x), int(y)): int(z) for x, y, z in zip(counts.pi, counts.pj, counts.pc) if k in (x, y)}
+        for other in rel.get(a.show, []):
+            o = counts.ids[other]
+            c = pair[(min(k, o), max(k, o))]
+            print(f"  {other:<28} together {c:>5,}   n={int(counts.n[o]):,}   "
+                  f"lift {c * counts.docs / (counts.n[k] * counts.n[o]):.2f}")
+    if a.dry_run:
+        return
+    missing = [str(p.relative_to(ROOT)) for p in SOURCES.values() if not p.exists()]
+    if missing and not a.allow_partial:
+        raise SystemExit(f"not writing {a.out.name} or the state: {', '.join(missing)} missing "
+                         f"(--allow-partial to write anyway)")
+    counts.save()
+    a.out.parent.mkdir(parents=True, exist_ok=True)
+    a.out.write_text(json.dumps(rel, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"  → {a.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,80 +6,124 @@ distribution per coverage class. The question is not "does it match?" but
 "does confidence SEPARATE gap from direct?" — the shipped 0.60 floor is useless
 if out-of-scope queries score 0.75-0.85.
 
-Usage:  calibrate_abstention.py <label> [endpoint]
+Queries go out through eval_http's keep-alive pool, --concurrency at a time
+(default 8), so a pass costs roughly the slowest N round trips instead of the sum
+of all of them. Rows keep benchmark order and carry per-request latency
+(latency_s, ttfb_s, bytes); --concurrency 1 reproduces the old serial pass.
+The 0.05-step sweep below is a quick read; calibration_analysis.py on the rows
+file gives full ROC/PR curves and bootstrap CIs for the threshold.
+
+Usage:  calibrate_abstention.py <label> [endpoint] [--concurrency N] [--queries F] [--out F]
 Cache warning: searchTemplateMatch keeps a process-local LRU, so restart the
 dev server between prompt changes or you will measure the old prompt.
 """
-import json, sys, time, urllib.request, urllib.error
+import argparse, asyncio, json
 from collections import defaultdict
+from pathlib import Path
+
+from eval_http import Pool, percentiles, run_ordered
 
-LABEL = sys.argv[1] if len(sys.argv) > 1 else "run"
-ENDPOINT = sys.argv[2] if len(sys.argv) > 2 else "http://localhost:3000/api/search-template-match"
+ROOT = Path(__file__).resolve().parent.parent
+ENDPOINT = "http://localhost:3000/api/search-template-match"
 QUERIES = "/Users/qqwjq/curify-studio/dev/jayw/design-agent-v0/eval/tool_intent_queries.jsonl"
-OUT = f"/private/tmp/claude-501/-Users-qqwjq-curify-frontend/4be4d68d-1e1d-499c-82ff-12b1f0014678/scratchpad/calib_{LABEL}.json"
+OUT = str(ROOT / "raw" / "eval" / "calib-{label}.json")
+
+
+def load_queries(path=QUERIES):
+    return [json.loads(l) for l in open(path, encoding="utf-8") if l.strip()]
 
 
-def route(query, tries=2):
-    for a in range(tries):
+async def collect(qs, endpoint=ENDPOINT, concurrency=8, tries=2, log=print):
+    """One row per query that answered, in input order (errors are logged and dropped)."""
+    n = len(qs)
+    landed = [0]
+
+    def progress(i, r):
+        landed[0] += 1
+        if isinstance(r, Exception) or not r.ok:
+            log(f"  {i + 1:3d}/{n} ERROR {qs[i]['id']}")
+        elif landed[0] % 20 == 0:
+            log(f"  {landed[0]:3d}/{n}")
+
+    async with Pool(endpoint, size=concurrency, timeout=90) as pool:
+        res = await run_ordered(qs, lambda q: pool.post_json(endpoint, {"query": q["query"]}, tries=tries),
+                                concurrency, progress)
+
+    rows = []
+    for q, r in zip(qs, res):
+        if isinstance(r, Exception) or not r.ok:
+            continue
         try:
-            req = urllib.request.Request(
-                ENDPOINT, data=json.dumps({"query": query}).encode(),
-                headers={"Content-Type": "application/json"})
-            with urllib.request.urlopen(req, timeout=90) as r:
-                return json.loads(r.read()).get("matches", [])
-        except Exception:
-            if a == tries - 1:
-                return None
-            time.sleep(2)
-    return None
-
-
-rows = []
-qs = [json.loads(l) for l in open(QUERIES, encoding="utf-8") if l.strip()]
-print(f"[{LABEL}] {len(qs)} queries → {ENDPOINT}\n")
-for i, q in enumerate(qs, 1):
-    m = route(q["query"])
-    if m is None:
-        print(f"  {i:3d}/{len(qs)} ERROR {q['id']}")
-        continue
-    top = max((x.get("confidence", 0) for x in m), default=0.0)
-    rows.append({"id": q["id"], "coverage": q.get("coverage"), "n_matches": len(m),
-                 "top_conf": top, "query": q["query"]})
-    if i % 20 == 0:
-        print(f"  {i:3d}/{len(qs)}")
-
-json.dump(rows, open(OUT, "w"), ensure_ascii=False, indent=1)
-
-by = defaultdict(list)
-for r in rows:
-    by[r["coverage"]].append(r)
+            body = r.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            log(f"  ERROR {q['id']}: bad JSON body ({r.size} bytes)")
+            continue
+        m = body.get("matches") or []
+        top = max((x.get("confidence", 0) for x in m), default=0.0)
+        rows.append({"id": q["id"], "coverage": q.get("coverage"), "n_matches": len(m),
+                     "top_conf": top, "query": q["query"],
+                     "latency_s": round(r.elapsed, 4), "ttfb_s": round(r.ttfb, 4), "bytes": r.size})
+    return rows
 
 
 def mean(xs):
     return sum(xs) / len(xs) if xs else 0.0
 
 
-print(f"\n=== {LABEL} — {len(rows)} scored ===")
-print(f"{'coverage':10s} {'n':>3s} {'match%':>7s} {'mean_conf':>10s} {'>=0.60':>7s} {'>=0.75':>7s}")
-for cov in ("direct", "adjacent", "gap"):
-    sub = by.get(cov, [])
-    if not sub:
-        continue
-    print(f"{cov:10s} {len(sub):3d} {100*mean([1 if r['n_matches'] else 0 for r in sub]):6.0f}% "
-          f"{mean([r['top_conf'] for r in sub]):10.2f} "
-          f"{100*mean([1 if r['top_conf'] >= .60 else 0 for r in sub]):6.0f}% "
-          f"{100*mean([1 if r['top_conf'] >= .75 else 0 for r in sub]):6.0f}%")
-
-d, g = [r["top_conf"] for r in by.get("direct", [])], [r["top_conf"] for r in by.get("gap", [])]
-print(f"\nseparation (mean direct - mean gap): {mean(d)-mean(g):+.3f}")
-print("threshold sweep — keep direct, reject gap:")
-best = None
-for t in [x / 100 for x in range(40, 96, 5)]:
-    keep = mean([1 if c >= t else 0 for c in d])
-    rej = mean([1 if c < t else 0 for c in g])
-    score = keep + rej
-    flag = ""
-    if best is None or score > best[0]:
-        best, flag = (score, t), "  <-- best"
-    print(f"  t={t:.2f}  direct kept {100*keep:3.0f}%   gap rejected {100*rej:3.0f}%   sum={score:.2f}{flag}")
-print(f"\nbest threshold ≈ {best[1]:.2f} (sum={best[0]:.2f}; 2.00 = perfect separation)")
+def report(rows, label):
+    by = defaultdict(list)
+    for r in rows:
+        by[r["coverage"]].append(r)
+
+    print(f"\n=== {label} — {len(rows)} scored ===")
+    print(f"{'coverage':10s} {'n':>3s} {'match%':>7s} {'mean_conf':>10s} {'>=0.60':>7s} {'>=0.75':>7s}")
+    for cov in ("direct", "adjacent", "gap"):
+        sub = by.get(cov, [])
+        if not sub:
+            continue
+        print(f"{cov:10s} {len(sub):3d} {100*mean([1 if r['n_matches'] else 0 for r in sub]):6.0f}% "
+              f"{mean([r['top_conf'] for r in sub]):10.2f} "
+              f"{100*mean([1 if r['top_conf'] >= .60 else 0 for r in sub]):6.0f}% "
+              f"{100*mean([1 if r['top_conf'] >= .75 else 0 for r in sub]):6.0f}%")
+
+    d, g = [r["top_conf"] for r in by.get("direct", [])], [r["top_conf"] for r in by.get("gap", [])]
+    print(f"\nseparation (mean direct - mean gap): {mean(d)-mean(g):+.3f}")
+    print("threshold sweep — keep direct, reject gap:")
+    best = None
+    for t in [x / 100 for x in range(40, 96, 5)]:
+        keep = mean([1 if c >= t else 0 for c in d])
+        rej = mean([1 if c < t else 0 for c in g])
+        score = keep + rej
+        flag = ""
+        if best is None or score > best[0]:
+            best, flag = (score, t), "  <-- best"
+        print(f"  t={t:.2f}  direct kept {100*keep:3.0f}%   gap rejected {100*rej:3.0f}%   sum={score:.2f}{flag}")
+    print(f"\nbest threshold ≈ {best[1]:.2f} (sum={best[0]:.2f}; 2.00 = perfect separation)")
+
+    p = percentiles([r["latency_s"] for r in rows])
+    if p:
+        print(f"latency  p50 {p[50]:.2f}s  p95 {p[95]:.2f}s  p99 {p[99]:.2f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("label", nargs="?", default="run")
+    ap.add_argument("endpoint", nargs="?", default=ENDPOINT)
+    ap.add_argument("--concurrency", type=int, default=8, help="requests in flight (1 = serial)")
+    ap.add_argument("--queries", default=QUERIES, help="tool_intent_queries.jsonl")
+    ap.add_argument("--out", help=f"rows JSON (default {OUT})")
+    a = ap.parse_args()
+
+    qs = load_queries(a.queries)
+    print(f"[{a.label}] {len(qs)} queries → {a.endpoint}  (concurrency {a.concurrency})\n")
+    rows = asyncio.run(collect(qs, a.endpoint, a.concurrency))
+    out = Path(a.out or OUT.format(label=a.label))
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(rows, ensure_ascii=False, indent=1), encoding="utf-8")
+    report(rows, a.label)
+
+
+if __name__ == "__main__":
+    main()
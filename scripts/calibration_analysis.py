@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""ROC / PR curves and bootstrap CIs for matcher abstention calibration.
+
+calibrate_abstention.py sweeps 0.40–0.95 in 0.05 steps and picks the best
+`keep + reject`; on ~100 queries one query can flip that choice. This does the
+same analysis properly, vectorised with NumPy so it scales to thousands of
+labelled queries from logs:
+
+- the ROC and PR curves over EVERY distinct confidence value (keep ⇔ conf ≥ t),
+  with ROC-AUC and average precision,
+- the best threshold by Youden's J = TPR − FPR (= keep + reject − 1, the same
+  objective as the sweep),
+- stratified bootstrap CIs (direct and gap resampled separately) for that
+  threshold, its J, the AUC and the direct − gap separation,
+- a verdict on a proposed floor (--floor, default the shipped 0.60): is it
+  inside the threshold CI, and how much J does it give up vs the optimum?
+
+Positives are `direct` rows (should be kept), negatives `gap` rows (should be
+abstained on); `adjacent` is left out unless --adjacent pos|neg.
+
+Inputs (any number, each analysed on its own):
+    calib-<label>.json         rows from calibrate_abstention.py
+    *.jsonl                    logs, one {"top_conf"|"confidence", "coverage"|"label"} per line
+    bench:<run id | label>     the abstention rows of a stored bench.py run
+
+Usage:
+    python3 scripts/calibration_analysis.py raw/eval/calib-v7.json bench:prompt-v6 [--floor 0.6] [--boot 2000]
+    python3 scripts/calibration_analysis.py logs.jsonl --curves raw/eval/curves.json
+"""
+import argparse, json, sqlite3
+from pathlib import Path
+
+import numpy as np
+
+_trapz = getattr(np, "trapezoid", None) or np.trapz    # NumPy < 2.0 only has trapz
+BOOT_CHUNK = 250      # bootstrap replicates per matrix product (bounds memory at ~chunk × thresholds)
+
+
+def load_rows(src):
+    if src.startswith("bench:"):
+        import bench
+        db = sqlite3.connect(bench.DB)
+        run_id = bench.resolve(db, src[len("bench:"):])
+        return [json.loads(d) for (d,) in db.execute(
+            "SELECT data FROM rows WHERE run_id = ? AND suite = 'abstention'", (run_id,))]
+    text = Path(src).read_text(encoding="utf-8")
+    if src.endswith(".jsonl"):
+        return [json.loads(l) for l in text.splitlines() if l.strip()]
+    data = json.loads(text)
+    return data.get("rows", []) if isinstance(data, dict) else data
+
+
+def labelled(rows, adjacent=None):
+    """(scores, labels) arrays: label 1 = direct (keep), 0 = gap (abstain)."""
+    cls = {"direct": 1, "gap": 0}
+    if adjacent:
+        cls["adjacent"] = 1 if adjacent == "pos" else 0
+    s, y = [], []
+    for r in rows:
+        c = cls.get(r.get("coverage", r.get("label")))
+        if c is None:
+            continue
+        s.append(float(r.get("top_conf", r.get("confidence", 0.0)) or 0.0))
+        y.append(c)
+    return np.asarray(s, dtype=float), np.asarray(y, dtype=np.int8)
+
+
+def curves(scores, labels):
+    """ROC / PR at every distinct score, highest threshold first.
+
+    Returns dict of arrays: threshold, tpr, fpr, precision, plus auc and ap."""
+    order = np.argsort(-scores, kind="mergesort")
+    s, y = scores[order], labels[order]
+    last = np.r_[np.flatnonzero(np.diff(s)), len(s) - 1]     # last index of each distinct value
+    tp = np.cumsum(y)[last]
+    fp = (last + 1) - tp
+    P, N = max(int(y.sum()), 1), max(int(len(y) - y.sum()), 1)
+    tpr, fpr = np.r_[0.0, tp / P], np.r_[0.0, fp / N]
+    precision = np.r_[1.0, tp / np.maximum(tp + fp, 1)]
+    return {"threshold": np.r_[np.inf, s[last]], "tpr": tpr, "fpr": fpr, "precision": precision,
+            "auc": float(_trapz(tpr, fpr)),
+            "ap": float(np.sum(np.diff(tpr) * precision[1:]))}
+
+
+def _ge_counts(values, grid, weights):
+    """weights (B, n) multiplicities of `values` → (B, len(grid)) count of values ≥ grid[j]."""
+    idx = np.searchsorted(grid, values, side="right") - 1      # highest grid point each value clears
+    onehot = np.zeros((len(values), len(grid)))
+    onehot[np.arange(len(values)), idx] = 1.0
+    hist = weights @ onehot
+    return np.cumsum(hist[:, ::-1], axis=1)[:, ::-1]
+
+
+def bootstrap(scores, labels, n_boot=2000, floor=0.60, seed=0):
+    """Stratified bootstrap of best threshold, J, AUC, separation and J at `floor`."""
+    rng = np.random.default_rng(seed)
+    pos, neg = scores[labels == 1], scores[labels == 0]
+    grid = np.unique(np.r_[scores, floor])                    # ascending candidate thresholds
+    fi = int(np.searchsorted(grid, floor))
+    out = {k: [] for k in ("threshold", "j", "auc", "separation", "j_floor")}
+    for start in range(0, n_boot, BOOT_CHUNK):
+        b = min(BOOT_CHUNK, n_boot - start)
+        wp = rng.multinomial(len(pos), np.full(len(pos), 1 / len(pos)), size=b).astype(float)
+        wn = rng.multinomial(len(neg), np.full(len(neg), 1 / len(neg)), size=b).astype(float)
+        tpr = _ge_counts(pos, grid, wp) / len(pos)
+        fpr = _ge_counts(neg, grid, wn) / len(neg)
+        j = tpr - fpr
+        best = np.argmax(j, axis=1)
+        out["threshold"].append(grid[best])
+        out["j"].append(j[np.arange(b), best])
+        out["j_floor"].append(j[:, fi])
+        # trace the ROC from the highest threshold down, starting at (0, 0)
+        out["auc"].append(_trapz(np.c_[np.zeros(b), tpr[:, ::-1]], np.c_[np.zeros(b), fpr[:, ::-1]], axis=1))
+        out["separation"].append(wp @ pos / len(pos) - wn @ neg / len(neg))
+    return {k: np.concatenate(v) for k, v in out.items()}
+
+
+def ci(x, level=0.95):
+    lo, hi = np.quantile(x, [(1 - level) / 2, (1 + level) / 2])
+    return float(lo), float(hi)
+
+
+def analyse(src, rows, a):
+    s, y = labelled(rows, a.adjacent)
+    n_pos, n_neg = int(y.sum()), int(len(y) - y.sum())
+    print(f"\n=== {src} — {n_pos} direct / {n_neg} gap ===")
+    if not n_pos or not n_neg:
+        print("  need both direct and gap rows")
+        return None
+    c = curves(s, y)
+    j = c["tpr"] - c["fpr"]
+    k = int(np.argmax(j))
+    t_best = float(c["threshold"][k])
+    sep = float(s[y == 1].mean() - s[y == 0].mean())
+    fl_tpr, fl_fpr = float(np.mean(s[y == 1] >= a.floor)), float(np.mean(s[y == 0] >= a.floor))
+    bs = bootstrap(s, y, a.boot, a.floor, a.seed)
+    t_lo, t_hi = ci(bs["threshold"])
+    dj = bs["j"] - bs["j_floor"]
+
+    print(f"  ROC-AUC {c['auc']:.3f}  [{ci(bs['auc'])[0]:.3f}, {ci(bs['auc'])[1]:.3f}]   AP {c['ap']:.3f}")
+    print(f"  separation (mean direct − mean gap) {sep:+.3f}  [{ci(bs['separation'])[0]:+.3f}, {ci(bs['separation'])[1]:+.3f}]")
+    print(f"  best threshold {t_best:.3f}  [{t_lo:.3f}, {t_hi:.3f}]   J {j[k]:.3f}  [{ci(bs['j'])[0]:.3f}, {ci(bs['j'])[1]:.3f}]"
+          f"   (direct kept {100*c['tpr'][k]:.0f}%, gap rejected {100*(1-c['fpr'][k]):.0f}%)")
+    print(f"  floor {a.floor:.2f}: direct kept {100*fl_tpr:.0f}%, gap rejected {100*(1-fl_fpr):.0f}%, "
+          f"J {fl_tpr-fl_fpr:.3f}; J given up vs optimum {np.mean(dj):.3f}  [{ci(dj)[0]:.3f}, {ci(dj)[1]:.3f}]")
+    inside = t_lo <= a.floor <= t_hi
+    print(f"  → floor {a.floor:.2f} is {'INSIDE' if inside else 'OUTSIDE'} the 95% CI of the best threshold"
+          f"{'' if inside else ' — not supported by this run'}")
+    return {"source": src, "n_direct": n_pos, "n_gap": n_neg, "auc": c["auc"], "ap": c["ap"],
+            "separation": sep, "best_threshold": t_best, "best_threshold_ci": [t_lo, t_hi],
+            "j": float(j[k]), "floor": a.floor, "floor_inside_ci": inside,
+            "curves": {k2: [None if not np.isfinite(v) else round(float(v), 6) for v in c[k2]]
+                       for k2 in ("threshold", "tpr", "fpr", "precision")}}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ROC/PR + bootstrap CIs for abstention calibration runs")
+    ap.add_argument("sources", nargs="+", help="calib JSON, JSONL log, or bench:<run id|label>")
+    ap.add_argument("--floor", type=float, default=0.60, help="threshold to test (default: shipped 0.60)")
+    ap.add_argument("--boot", type=int, default=2000, help="bootstrap replicates")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--adjacent", choices=("pos", "neg"), help="count adjacent rows as direct (pos) or gap (neg)")
+    ap.add_argument("--curves", help="write per-source curves + summary JSON here")
+    a = ap.parse_args()
+
+    results = [r for r in (analyse(src, load_rows(src), a) for src in a.sources) if r]
+    if a.curves:
+        Path(a.curves).parent.mkdir(parents=True, exist_ok=True)
+        Path(a.curves).write_text(json.dumps(results, indent=1), encoding="utf-8")
+        print(f"\ncurves → {a.curves}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Line wrapping for CJK / mixed Chinese-English copy, with 禁则处理.
+
+Lifted out of oneoff_ecommerce_booklet_pdf so other Pillow / vector_pdf layouts can
+share it. Two things make it cheap enough to call on every render:
+
+- widths are measured per TOKEN (one CJK character, or one latin/digit run) and
+  cached per (surface type, font, token); a line's width is accumulated as tokens
+  are added instead of re-measuring the whole growing line, so wrapping is linear
+  in the paragraph length rather than quadratic,
+- the finished line list is memoised per (surface type, font, text, width, mode),
+  so re-rendering an unchanged paragraph is a dict lookup.
+
+Tokens are measured on their own, so kerning ACROSS token boundaries is ignored —
+irrelevant for CJK, and latin words are never split.
+
+Modes:
+    greedy    — fill each line as far as it goes (what the booklet has always done).
+    balanced  — Knuth–Plass-style: choose all breaks of a paragraph together to
+                minimise the squared slack of every line but the last (which is
+                only penalised if it is a stub), so a paragraph does not end up
+                with full lines and a two-character orphan.
+Both honour the same 禁则 rules; balanced falls back to greedy when a paragraph has
+no break sequence that fits (e.g. a single over-long token).
+
+Usage (as a module):
+    from cjk_wrap import wrap
+    lines = wrap(d, text, font, max_w)                 # d: anything with .textlength(s, font=)
+    lines = wrap(d, text, font, max_w, mode="balanced")
+"""
+
+# 禁则处理 — characters that may never START a line (closing punctuation), and
+# characters that may never END one (opening brackets). Without this the greedy
+# wrapper strands a lone 。 or ， at the head of a line, which reads as broken
+# Chinese typesetting to exactly the buyers this booklet is for.
+NO_LINE_START = "。，、；：？！）】》」』”’%…·"
+NO_LINE_END = "（【《「『“‘"
+_LATIN = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+
+LAST_LINE_MIN = 1 / 3   # balanced mode: a last line shorter than this share of the measure is penalised
+
+_widths = {}
+_lines = {}
+
+
+def clear_cache():
+    _widths.clear()
+    _lines.clear()
+
+
+def _font_key(f):
+    path = getattr(f, "path", None)
+    if isinstance(path, str):
+        return (path, getattr(f, "index", 0), getattr(f, "size", None))
+    return id(f)
+
+
+def tokenize(s):
+    """Split into wrap units: "\\n", latin/digit runs (never broken), single chars."""
+    toks, i, n = [], 0, len(s)
+    while i < n:
+        if s[i] in _LATIN:
+            j = i
+            while j < n and s[j] in _LATIN:
+                j += 1
+        else:
+            j = i + 1
+        toks.append(s[i:j])
+        i = j
+    return toks
+
+
+def _measurer(d, f):
+    key = (type(d).__name__, _font_key(f))
+
+    def width(tok):
+        w = _widths.get((key, tok))
+        if w is None:
+            w = _widths[(key, tok)] = d.textlength(tok, font=f)
+        return w
+    return width
+
+
+def _greedy(toks, width, max_w):
+    lines, cur, cur_w = [], [], 0.0
+    for tok in toks:
+        if tok == "\n":
+            lines.append("".join(cur)); cur, cur_w = [], 0.0
+            continue
+        w = width(tok)
+        if cur_w + w <= max_w or not cur:
+            cur.append(tok); cur_w += w
+            continue
+
+        # would overflow -> break, but never leave closing punctuation orphaned
+        if tok[0] in NO_LINE_START:
+            cur.append(tok)     # let this line run slightly long rather than orphan 。
+            lines.append("".join(cur)); cur, cur_w = [], 0.0
+            continue
+        carry = [tok]
+        while cur and cur[-1][-1] in NO_LINE_END:
+            carry.insert(0, cur.pop())
+        lines.append("".join(cur))
+        cur = carry
+        cur_w = sum(width(t) for t in cur)
+    if cur:
+        lines.append("".join(cur))
+    return lines
+
+
+def _balanced_para(toks, width, max_w):
+    """Minimum total squared slack over all legal break sequences."""
+    n = len(toks)
+    if not n:
+        return [""]
+    pre = [0.0]
+    for t in toks:
+        pre.append(pre[-1] + width(t))
+
+    def can_break(j):   # a break BEFORE toks[j]
+        return j == 0 or j == n or (toks[j][0] not in NO_LINE_START and toks[j - 1][-1] not in NO_LINE_END)
+
+    inf = float("inf")
+    best, back = [0.0] + [inf] * n, [0] * (n + 1)
+    for j in range(1, n + 1):
+        if not can_break(j):
+            continue
+        for i in range(j - 1, -1, -1):
+            w = pre[j] - pre[i]
+            if w > max_w and i < j - 1:
+                break
+            if best[i] == inf or not can_break(i):
+                continue
+            if j < n:
+                cost = best[i] + (max_w - w) ** 2
+            else:   # last line: free unless it is a stub shorter than LAST_LINE_MIN
+                cost = best[i] + max(0.0, LAST_LINE_MIN * max_w - w) ** 2
+            if cost < best[j]:
+                best[j], back[j] = cost, i
+    if best[n] == inf:
+        return None
+    cuts, j = [], n
+    while j:
+        cuts.append(j); j = back[j]
+    out, i = [], 0
+    for j in reversed(cuts):
+        out.append("".join(toks[i:j])); i = j
+    return out
+
+
+def wrap(d, s, f, max_w, mode="greedy"):
+    """Wrap `s` to `max_w` (in whatever units d.textlength returns)."""
+    key = (type(d).__name__, _font_key(f), s, max_w, mode)
+    hit = _lines.get(key)
+    if hit is not None:
+        return list(hit)
+    width = _measurer(d, f)
+    toks = tokenize(s)
+    if mode == "greedy":
+        lines = _greedy(toks, width, max_w)
+    elif mode == "balanced":
+        lines, para = [], []
+        for tok in toks + ["\n"]:
+            if tok != "\n":
+                para.append(tok)
+                continue
+            got = _balanced_para(para, width, max_w)
+            lines.extend(got if got is not None else _greedy(para, width, max_w) or [""])
+            para = []
+        if s.endswith("\n") or not s:
+            lines.pop()   # greedy never emits a trailing empty line
+    else:
+        raise ValueError(f"unknown wrap mode: {mode}")
+    _lines[key] = tuple(lines)
+    return lines
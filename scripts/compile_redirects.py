@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Redirect map compiler: merge every redirect source, collapse chains, flag loops / conflicts.
+
+The redirects are spread over files kept by different scripts:
+
+    next.config.ts                     manualRedirects (hand-written)                   live
+    redirects.generated.cjs            migrate_nano_ids_and_redirects_inplace           live
+    redirects.examples.generated.cjs   generate_example_id_redirects                    live
+    redirects.generated.json           the .cjs above, as data                          —
+    redirects.cleaned.json             clean_redirects.cjs (/en + template- stripped)   —
+    example_redirects_from_tsv.json    the migration's GSC audit (from / to)            —
+
+and nothing checks them against each other, so A→B in one file and B→C in
+another cost two round trips, and a cycle only shows up as
+ERR_TOO_MANY_REDIRECTS. Live rules are read in next.config.ts order (first match
+wins, as in Next.js). `:locale(en|zh|…)` params are expanded to one literal rule
+per locale; rules with free params (:slug, :path*) stay patterns. Every literal
+source is then followed to its final destination — through other rules,
+patterns, and next-intl's own /en/x → /x hop (localePrefix "as-needed") — and
+
+    chain     more than one hop: collapsed to the final destination
+    loop      a source that comes back round: left out of the map
+    conflict  one source, different destinations in different rules (first wins)
+
+The map and --check cover the live rules only — that is what the site serves.
+The not-loaded files are then compiled on top of them and whatever they add
+(sources the site doesn't redirect, loops and conflicts involving them) is
+reported as advisory; --live-only skips that pass.
+
+Pages.csv (or any GSC pages export) ranks each list by the traffic still landing
+on the redirected URL — those are the hops Google and users actually pay for.
+
+Output, lib/generated/redirect_map.json:
+    {"exact": {source: final}, "localized": {rest: final rest}, "patterns": [{"re", "to"}], ...}
+A lookup is exact[path]; else localized[path minus its /<locale> prefix], with the
+prefix put back (none for en); else the first pattern whose `re` matches (named
+groups fill the ":name" slots of `to`), then exact[] once more on the result.
+
+Usage:
+    python3 scripts/compile_redirects.py [--pages Pages.csv] [--out lib/generated/redirect_map.json]
+                                         [--live-only] [--top 20] [--check]
+"""
+import argparse, json, os, re, sys
+from collections import defaultdict
+
+from seo_funnel_audit import read_chunks
+from site_routes import LOCALES, SITE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUT = os.path.join(ROOT, "lib", "generated", "redirect_map.json")
+PAGES = os.path.join(ROOT, "Pages.csv")
+MAX_HOPS = 20
+
+_STR = r"(\"(?:[^\"\\]|\\.)*\"|`[^`]*`)"
+_RULE = re.compile(r"\{\s*\"?source\"?\s*:\s*" + _STR + r"\s*,\s*\"?destination\"?\s*:\s*" + _STR +
+                   r"\s*,\s*\"?permanent\"?\s*:\s*(true|false)", re.S)
+_PARAM = re.compile(r":(\w+)(\([^)]*\))?([*+?])?")
+
+
+def _esc(lit):
+    """re.escape minus '-' and '/', so the pattern is valid in Python and JS alike."""
+    return re.sub(r"([.^$*+?{}\[\]\\|()])", r"\\\1", lit)
+
+
+class Rule:
+    __slots__ = ("source", "destination", "permanent", "origin", "live", "regex", "order")
+
+    def __init__(self, source, destination, permanent, origin, live):
+        self.source, self.destination, self.permanent = source, destination, permanent
+        self.origin, self.live = origin, live
+        self.regex = _compile(source) if ":" in source else None
+
+    def apply(self, path):
+        """Destination for `path`, or None when the rule doesn't match it."""
+        if self.regex is None:
+            return self.destination if path == self.source else None
+        m = self.regex.match(path)
+        if not m:
+            return None
+        groups = m.groupdict()
+        out = _PARAM.sub(lambda p: groups.get(p.group(1)) or "", self.destination).replace("//", "/")
+        return out.rstrip("/") or "/"
+
+
+def _compile(source):
+    """path-to-regexp subset used by next.config: :name, :name(alt), :name*."""
+    out, pos = [], 0
+    for m in _PARAM.finditer(source):
+        lit = source[pos:m.start()]
+        name, alt, mod = m.groups()
+        if mod in ("*", "?") and lit.endswith("/"):
+            out.append(_esc(lit[:-1]) + f"(?:/(?P<{name}>{'.*' if mod == '*' else '[^/]+'}))?")
+        else:
+            out.append(_esc(lit) + f"(?P<{name}>{alt[1:-1] if alt else '[^/]+'})")
+        pos = m.end()
+    return re.compile("".join(out) + _esc(source[pos:]) + "$")
+
+
+def _expand(rule):
+    """One literal rule per alternative of a :name(a|b|…) param, when that is its only param."""
+    params = _PARAM.findall(rule.source)
+    if len(params) != 1 or not params[0][1] or params[0][2] or not re.fullmatch(r"\([\w|-]+\)", params[0][1]):
+        return [rule]
+    name, alt, _ = params[0]
+    return [Rule(rule.source.replace(f":{name}{alt}", v), rule.destination.replace(f":{name}", v),
+                 rule.permanent, rule.origin, rule.live) for v in alt[1:-1].split("|")]
+
+
+# --- sources --------------------------------------------------------------------
+
+def _line(src, pos):
+    return src.count("\n", 0, pos) + 1
+
+
+def _js_rules(path, src, env, live):
+    """Rule literals in JS/TS source; `${x}` filled from env (a list value expands the rule)."""
+    rules, spread = [], []
+    for m in _RULE.finditer(src):
+        s, d = (json.loads(v) if v[0] == '"' else v[1:-1] for v in m.group(1, 2))
+        origin = f"{os.path.relpath(path, ROOT)}:{_line(src, m.start())}"
+        names = set(re.findall(r"\$\{(\w+)\}", s + d))
+        scalars = {k: v for k, v in env.items() if k in names and isinstance(v, str)}
+        lists = [k for k in names if isinstance(env.get(k), list)]
+        if names - set(scalars) - set(lists):
+            raise SystemExit(f"{origin}: can't resolve {sorted(names - set(scalars) - set(lists))}")
+        for k, v in scalars.items():
+            s, d = s.replace(f"${{{k}}}", v), d.replace(f"${{{k}}}", v)
+        if lists:                                        # ...spread array: emitted after the literals
+            (k,) = lists
+            spread += [Rule(s.replace(f"${{{k}}}", v), d.replace(f"${{{k}}}", v), m.group(3) == "true", origin, live)
+                       for v in env[k]]
+        else:
+            rules.append(Rule(s, d, m.group(3) == "true", origin, live))
+    return rules + spread
+
+
+def load_rules(live_only=False):
+    """The live rules in the order Next.js would try them, then the not-loaded files' (live=False)."""
+    rules = []
+    cfg = os.path.join(ROOT, "next.config.ts")
+    src = open(cfg, encoding="utf-8").read()
+    start = src.index("const manualRedirects")
+    rules += _js_rules(cfg, src[start:src.index("];", start)], {"LOCALE_RE": "|".join(LOCALES)}, True)
+
+    gen = os.path.join(ROOT, "redirects.generated.cjs")
+    src = open(gen, encoding="utf-8").read()
+    locs = json.loads(re.search(r"SUPPORTED_LOCALES\s*=\s*(\[[^\]]*\])", src).group(1))
+    if re.search(r"\.filter\(\s*l\s*=>\s*l\s*!==\s*\"en\"\s*\)", src):
+        locs = [l for l in locs if l != "en"]
+    rules += _js_rules(gen, src, {"l": locs}, True)
+
+    ex = os.path.join(ROOT, "redirects.examples.generated.cjs")
+    rules += _js_rules(ex, open(ex, encoding="utf-8").read(), {}, True)
+
+    if not live_only:
+        for name, s, d in (("redirects.generated.json", "source", "destination"),
+                           ("redirects.cleaned.json", "source", "destination"),
+                           ("example_redirects_from_tsv.json", "from", "to")):
+            path = os.path.join(ROOT, name)
+            if os.path.exists(path):
+                for i, r in enumerate(json.load(open(path, encoding="utf-8"))):
+                    rules.append(Rule(r[s], r[d], r.get("permanent", True), f"{name}[{i}]", False))
+
+    out = []
+    for r in rules:
+        if r.source != r.destination:                    # next.config's isValid drops self-redirects
+            out.extend(_expand(r))
+    for i, r in enumerate(out):
+        r.order = i
+    return out
+
+
+# --- compile --------------------------------------------------------------------
+
+def compile_map(rules):
+    by_source = defaultdict(list)
+    patterns = [r for r in rules if r.regex is not None]
+    for r in rules:
+        if r.regex is None:
+            by_source[r.source].append(r)
+
+    def step(path):
+        """(rule, destination) of the first rule matching `path`; next-intl's /en hop last."""
+        hit = by_source.get(path)
+        first = hit[0] if hit else None
+        for p in patterns:
+            if first is not None and p.order > first.order:
+                break
+            d = p.apply(path)
+            if d is not None:
+                return p, d
+        if first is not None:
+            return first, first.destination
+        if path == "/en" or path.startswith("/en/"):
+            return None, path[3:] or "/"
+        return None
+
+    exact, chains, loops, conflicts = {}, [], [], []
+    for source, hits in by_source.items():
+        winner = step(source)
+        dests = {}
+        for r in hits:
+            dests.setdefault(r.destination, r)
+        if winner[0] is not hits[0]:                     # an earlier pattern takes the source
+            dests = {winner[1]: winner[0], **dests}
+        if len(dests) > 1:
+            conflicts.append({"source": source, "rules": [{"destination": d, "origin": r.origin, "live": r.live}
+                                                          for d, r in dests.items()]})
+        hops, looped = _follow(source, step)
+        if looped:
+            loops.append({"source": source, "hops": hops})
+            continue
+        exact[source] = hops[-1]
+        if len(hops) > 2:
+            chains.append({"source": source, "hops": hops})
+    return exact, patterns, chains, loops, conflicts
+
+
+def _follow(source, step):
+    """(hops from `source` to its final destination, whether they loop)."""
+    hops, seen = [source], {source}
+    while True:
+        nxt = step(hops[-1])
+        if nxt is None or any(c in nxt[1] for c in ("://", "?", "#")):   # off-site / query: stop there
+            return hops, False
+        hops.append(nxt[1])
+        if nxt[1] in seen or len(hops) > MAX_HOPS:
+            return hops, True
+        seen.add(nxt[1])
+
+
+def _split_locale(path):
+    head, _, rest = path[1:].partition("/")
+    return (head, "/" + rest) if head in LOCALES else (None, path)
+
+
+def fold_locales(exact):
+    """Split `exact` into (per-path entries, locale-agnostic entries).
+
+    A source whose bare form and every /<locale>/ form redirect to the same path
+    under the same locale (en → unprefixed, as next-intl serves it) is stored once
+    as localized[rest] = dest_rest, which is most of the example-ID rules."""
+    variants = defaultdict(dict)
+    for src, dst in exact.items():
+        loc, rest = _split_locale(src)
+        variants[rest][loc] = dst
+    per_path, localized = {}, {}
+    for rest, by_loc in variants.items():
+        d_loc, d_rest = _split_locale(by_loc.get(None, ""))
+        want = {None: d_rest, **{l: (d_rest if l == "en" else f"/{l}{d_rest}".rstrip("/") or "/") for l in LOCALES}}
+        if d_loc is None and by_loc.get(None) and by_loc == want:
+            localized[rest] = d_rest
+        else:
+            for loc, dst in by_loc.items():
+                per_path[rest if loc is None else f"/{loc}{rest}".rstrip("/")] = dst
+    return per_path, localized
+
+
+def _js_pattern(r):
+    return {"re": "^" + r.regex.pattern.replace("(?P<", "(?<"), "to": _PARAM.sub(r":\1", r.destination)}
+
+
+def traffic(path):
+    """{path: (clicks, impressions)} from a GSC pages export."""
+    out = {}
+    if not path or not os.path.exists(path):
+        return out
+    for chunk in read_chunks(path):
+        for url, clicks, impr, _ in chunk:
+            if url.startswith(SITE):
+                p = url[len(SITE):].split("#", 1)[0] or "/"
+                c, n = out.get(p, (0, 0))
+                out[p] = (c + clicks, n + impr)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Merge redirect sources, collapse chains, flag loops / conflicts")
+    ap.add_argument("--pages", default=PAGES, help="GSC pages export for traffic ranking")
+    ap.add_argument("--out", default=OUT)
+    ap.add_argument("--live-only", action="store_true", help="skip the advisory pass over the not-loaded files")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--check", action="store_true", help="write nothing; exit 1 on live loops or conflicts")
+    a = ap.parse_args()
+
+    rules = load_rules(a.live_only)
+    live = [r for r in rules if r.live]
+    exact, patterns, chains, loops, conflicts = compile_map(live)
+    hits = traffic(a.pages)
+    rank = lambda x: hits.get(x["source"], (0, 0))
+
+    advisory = {}
+    if len(live) < len(rules):
+        all_exact, _, _, all_loops, all_conflicts = compile_map(rules)
+        looped = {x["source"] for x in loops}
+        advisory = {
+            "sources only these files redirect":
+                [{"source": s, "hops": [s, d]} for s, d in all_exact.items() if s not in exact and s not in looped],
+            "loops": [x for x in all_loops if x["source"] not in looped],
+            "conflicts": [x for x in all_conflicts if any(not r["live"] for r in x["rules"])],
+        }
+    for lst in (chains, loops, conflicts, *advisory.values()):
+        lst.sort(key=lambda x: (rank(x), -len(x.get("hops", ()))), reverse=True)
+
+    def tally(rs):
+        origins = defaultdict(int)
+        for r in rs:
+            origins[r.origin.split(":")[0].split("[")[0]] += 1
+        return origins
+
+    origins = tally(live)
+    print(f"{len(live):,} live rules ({', '.join(f'{n:,} {o}' for o, n in origins.items())})")
+    if advisory:
+        print(f"{len(rules) - len(live):,} advisory rules "
+              f"({', '.join(f'{n:,} {o}' for o, n in tally(r for r in rules if not r.live).items())})")
+    print(f"→ {len(exact):,} exact sources + {len(patterns)} patterns; "
+          f"{len(chains):,} chains collapsed, {len(loops)} loops, {len(conflicts)} conflicts")
+    redirected = sorted(((hits[s], s) for s in exact if s in hits), reverse=True)
+    print(f"{len(redirected):,} redirected URLs still in {os.path.basename(a.pages)} "
+          f"({sum(c for (c, _), _ in redirected):,} clicks, {sum(n for (_, n), _ in redirected):,} impressions)")
+
+    def show(title, items, fmt):
+        if items:
+            print(f"\n=== {title} ({len(items):,}) ===")
+            for x in items[:a.top]:
+                c, n = rank(x)
+                print(f"  {c:>5} clk {n:>6} impr  {fmt(x)}")
+
+    path = lambda x: " → ".join(x["hops"])
+    rival = lambda x: x["source"] + "".join(f"\n{'':>26}→ {r['destination']}  [{r['origin']}]" for r in x["rules"])
+    show("LOOPS", loops, path)
+    show("CONFLICTS (first wins)", conflicts, rival)
+    show("CHAINS (collapsed)", chains, path)
+    for title, items in advisory.items():
+        show(f"ADVISORY, NOT LOADED — {title}", items, rival if "conflicts" in title else path)
+
+    if a.check:
+        sys.exit(1 if loops or conflicts else 0)
+    per_path, localized = fold_locales(exact)
+    artifact = {"generated_by": "scripts/compile_redirects.py", "sources": dict(origins),
+                "exact": dict(sorted(per_path.items())), "localized": dict(sorted(localized.items())),
+                "patterns": [_js_pattern(r) for r in patterns]}
+    temporary = sorted({r.source for r in live if not r.permanent and r.source in exact})
+    if temporary:
+        artifact["temporary"] = temporary
+    os.makedirs(os.path.dirname(a.out), exist_ok=True)
+    with open(a.out, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"\n→ {os.path.relpath(a.out, ROOT)} ({os.path.getsize(a.out) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
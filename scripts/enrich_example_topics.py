@@ -19,6 +19,10 @@ Two passes, both run from the same `topics` registry vs template boilerplate:
 
 After both passes, build_template_subjects.cjs should be re-run so the
 reverse map picks up the new tier-3 entries.
+
+The same rules are ruleset example-topics-enrich-prune in
+scripts/configs/tag_remap_rules.json (scripts/remap_tags.py); add new
+templates there.
 """
 import json
 import re
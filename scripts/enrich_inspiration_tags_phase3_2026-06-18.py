@@ -29,6 +29,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 
+import taxonomy_index
+
 try:
     from openai import OpenAI
 except ImportError:
@@ -38,50 +40,15 @@ except ImportError:
 ROOT = Path(__file__).resolve().parents[1]
 INS_PATH = ROOT / "public" / "data" / "nano_inspiration.json"
 TMPL_PATH = ROOT / "public" / "data" / "nano_templates.json"
-TAX_PATH = ROOT / "lib" / "taxonomy.json"
 
 MODEL = "gpt-4o-mini"
 
 
-def slugify(s: str) -> str:
-    return s.lower().replace(" ", "-")
-
-
 def load_inputs():
     ins = json.loads(INS_PATH.read_text(encoding="utf-8"))
     tmpls = json.loads(TMPL_PATH.read_text(encoding="utf-8"))
-    tax = json.loads(TAX_PATH.read_text(encoding="utf-8"))
     templates_by_id = {t["id"]: t for t in tmpls}
-    return ins, templates_by_id, tax
-
-
-def build_vocab(tax: dict) -> dict:
-    """Return a compact dict the LLM sees. Group by axis for clarity."""
-    vocab = {}
-    vocab["subject_t1"] = list(tax.get("tier1", []))
-    # T2 — domain subdivisions per T1
-    vocab["subject_t2"] = sorted({s for v in tax.get("tier2", {}).values() for s in v})
-    # T3 — formats / styles / specific subjects per T1 cross-table
-    vocab["subject_t3"] = sorted({s for v in tax.get("tier3", {}).values() for s in v})
-    # T4 — entity vocabulary (use slugified for tag consistency)
-    vocab["entities_t4"] = sorted({slugify(s) for k, v in tax.get("tier4", {}).items() if k != "_note" for s in v})
-    vocab["audience"] = list(tax.get("audience", []))
-    return vocab
-
-
-def build_valid_slug_set(tax: dict) -> set:
-    valid = set()
-    for t in tax.get("tier1", []):
-        valid.add(t.lower()); valid.add(slugify(t))
-    for tier in ("tier2", "tier3", "tier4"):
-        for k, v in tax.get(tier, {}).items():
-            if k == "_note": continue
-            if isinstance(v, list):
-                for x in v:
-                    valid.add(str(x).lower()); valid.add(slugify(str(x)))
-    for a in tax.get("audience", []):
-        valid.add(a.lower()); valid.add(slugify(a))
-    return valid
+    return ins, templates_by_id
 
 
 SYSTEM_PROMPT = """You are a precise taxonomy classifier for visual content cards.
@@ -126,7 +93,7 @@ Record:
 Produce 3-6 granular tags from the vocabulary that describe this card."""
 
 
-def enrich_one(client, record: dict, template: Optional[dict], vocab: dict, valid: set) -> tuple:
+def enrich_one(client, record: dict, template: Optional[dict], vocab: dict, idx) -> tuple:
     """Returns (record_id, new_tags, dropped_invalid)."""
     prompt = build_user_prompt(record, template, vocab)
     try:
@@ -144,20 +111,8 @@ def enrich_one(client, record: dict, template: Optional[dict], vocab: dict, vali
         proposed = parsed.get("tags") or []
         if not isinstance(proposed, list):
             return (record["id"], [], [])
-        # Validate against vocab
-        kept, dropped = [], []
-        for t in proposed:
-            if not isinstance(t, str): continue
-            key = t.strip().lower()
-            if key in valid:
-                kept.append(key)
-            else:
-                # Try slugified
-                k2 = slugify(t)
-                if k2 in valid:
-                    kept.append(k2)
-                else:
-                    dropped.append(t)
+        # Validate against vocab (lib/generated/taxonomy_index.json)
+        kept, dropped = idx.validate(proposed, "inspirations")
         # Merge with existing tags
         existing = record.get("tags") or []
         merged = sorted(set([*existing, *kept]))
@@ -179,9 +134,9 @@ def main() -> None:
         print("OPENAI_API_KEY not set", file=sys.stderr)
         sys.exit(1)
 
-    ins, templates_by_id, tax = load_inputs()
-    vocab = build_vocab(tax)
-    valid = build_valid_slug_set(tax)
+    ins, templates_by_id = load_inputs()
+    idx = taxonomy_index.load()
+    vocab = idx.vocab["inspirations"]
     client = OpenAI(api_key=os.environ["OPENAI_API_KEY"], timeout=60.0)
 
     targets = list(ins)
@@ -204,7 +159,7 @@ def main() -> None:
 
     with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
         futs = {
-            pool.submit(enrich_one, client, r, templates_by_id.get(r["template_id"]), vocab, valid): r["id"]
+            pool.submit(enrich_one, client, r, templates_by_id.get(r["template_id"]), vocab, idx): r["id"]
             for r in targets
         }
         done = 0
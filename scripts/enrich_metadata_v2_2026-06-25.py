@@ -36,6 +36,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Optional
 
+import taxonomy_index
+
 try:
     from openai import OpenAI
 except ImportError:
@@ -48,7 +50,6 @@ PATHS = {
     "templates":    ROOT / "public" / "data" / "nano_templates.json",
     "gallery":      ROOT / "public" / "data" / "nanobanana.json",
 }
-TAX_PATH = ROOT / "lib" / "taxonomy.json"
 MODEL = "gpt-4o-mini"
 
 # Target band: 30-50 tags. Below 30 = too thin for compound-query recall;
@@ -57,68 +58,10 @@ TARGET_MIN_TAGS = 25
 TARGET_MAX_TAGS = 55
 
 
-def slugify(s: str) -> str:
-    return s.lower().replace(" ", "-")
-
-
-def build_vocab(tax: dict) -> dict:
-    return {
-        "subject_t1":   list(tax.get("tier1", [])),
-        "subject_t2":   sorted({s for v in tax.get("tier2", {}).values() for s in v}),
-        "subject_t3":   sorted({s for v in tax.get("tier3", {}).values() for s in v}),
-        "entities_t4":  sorted({slugify(s) for k, v in tax.get("tier4", {}).items() if k != "_note" for s in v}),
-        "audience":     list(tax.get("audience", [])),
-    }
-
-
-def build_valid_set(tax: dict) -> set:
-    valid = set()
-    for t in tax.get("tier1", []):
-        valid.add(t.lower()); valid.add(slugify(t))
-    for tier in ("tier2", "tier3", "tier4"):
-        for k, v in tax.get(tier, {}).items():
-            if k == "_note": continue
-            if isinstance(v, list):
-                for x in v:
-                    valid.add(str(x).lower()); valid.add(slugify(str(x)))
-    for a in tax.get("audience", []):
-        valid.add(a.lower()); valid.add(slugify(a))
-    return valid
-
-
-# Templates-only allow set. EXCLUDES every subject axis. Templates
-# carry boilerplate (Info-Type + Layout + Style + Audience) only;
-# subject tags (anime, naruto, japan, food, character, …) live on the
-# individual inspirations + gallery prompts. Memory:
+# Vocab + allow sets come precompiled from lib/generated/taxonomy_index.json
+# (scripts/taxonomy_index.py). Templates get the narrow allow set: format
+# parents + audience, no subject axis. Memory:
 # feedback_template_topics_should_be_boilerplate.md
-TEMPLATE_FORMAT_PARENTS_TIER3 = ("design", "lifestyle", "product")
-TEMPLATE_FORMAT_PARENTS_TIER2 = ("design", "product")
-
-
-def build_template_allow_set(tax: dict) -> set:
-    """Slugs allowed on template.topics — never tier1, never tier4,
-    never subject-bearing tier2/tier3 parents."""
-    allow = set()
-    for parent in TEMPLATE_FORMAT_PARENTS_TIER2:
-        for x in tax.get("tier2", {}).get(parent, []) or []:
-            allow.add(str(x).lower()); allow.add(slugify(str(x)))
-    for parent in TEMPLATE_FORMAT_PARENTS_TIER3:
-        for x in tax.get("tier3", {}).get(parent, []) or []:
-            allow.add(str(x).lower()); allow.add(slugify(str(x)))
-    for a in tax.get("audience", []):
-        allow.add(a.lower()); allow.add(slugify(a))
-    return allow
-
-
-def build_template_vocab(tax: dict) -> dict:
-    """Vocab surfaced to the LLM for templates — NO subject lists."""
-    return {
-        "style_and_output":   sorted(tax.get("tier3", {}).get("design", []) or []),
-        "mood_and_aesthetic": sorted(tax.get("tier3", {}).get("lifestyle", []) or []),
-        "product_output":     sorted(tax.get("tier3", {}).get("product", []) or []),
-        "design_formats_t2":  sorted(tax.get("tier2", {}).get("design", []) or []),
-        "audience":           list(tax.get("audience", [])),
-    }
 
 
 SYSTEM_PROMPT = """You are a precise multi-axis tagger for visual content cards in an AI image-generation catalog.
@@ -230,10 +173,10 @@ Record ({kind}):
 Produce 30-50 granular tags from the vocabulary across the 9 axes."""
 
 
-def enrich_one(client, record, kind, vocab, valid, ctx_template=None):
+def enrich_one(client, record, kind, vocab, idx, ctx_template=None):
     """Returns (record_id, kept_tags_list, dropped_invalid_list).
-    `valid` is the allowed-slug set (full for inspirations/gallery,
-    narrow for templates — built by build_template_allow_set)."""
+    Tags are validated against idx.allow[kind] (full for inspirations/gallery,
+    narrow for templates) and come back as canonical slugs."""
     rid = record.get("id") or record.get("template_id") or "?"
     sys_prompt = SYSTEM_PROMPT_TEMPLATES if kind == "templates" else SYSTEM_PROMPT
     try:
@@ -252,16 +195,7 @@ def enrich_one(client, record, kind, vocab, valid, ctx_template=None):
         proposed = parsed.get("tags") or []
         if not isinstance(proposed, list):
             return (rid, [], [])
-        kept, dropped = [], []
-        for t in proposed:
-            if not isinstance(t, str): continue
-            slug = t.strip().lower()
-            if slug in valid:
-                kept.append(slug)
-            else:
-                slug2 = slugify(t)
-                if slug2 in valid: kept.append(slug2)
-                else: dropped.append(t)
+        kept, dropped = idx.validate(proposed, kind)
         return (rid, kept, dropped)
     except Exception as e:
         return (rid, [], [f"ERROR: {e}"])
@@ -279,14 +213,11 @@ def main() -> None:
     if not os.environ.get("OPENAI_API_KEY"):
         print("OPENAI_API_KEY not set", file=sys.stderr); sys.exit(1)
 
-    tax = json.loads(TAX_PATH.read_text(encoding="utf-8"))
+    idx = taxonomy_index.load()
+    vocab, valid = idx.vocab[args.kind], idx.allow[args.kind]
     if args.kind == "templates":
-        vocab = build_template_vocab(tax)
-        valid = build_template_allow_set(tax)
         print(f"TEMPLATES vocab (subject-banned): style={len(vocab['style_and_output'])} mood={len(vocab['mood_and_aesthetic'])} product_output={len(vocab['product_output'])} t2_formats={len(vocab['design_formats_t2'])} audience={len(vocab['audience'])} | allow-set={len(valid)}")
     else:
-        vocab = build_vocab(tax)
-        valid = build_valid_set(tax)
         print(f"Vocab: T1={len(vocab['subject_t1'])} T2={len(vocab['subject_t2'])} T3={len(vocab['subject_t3'])} T4={len(vocab['entities_t4'])} audience={len(vocab['audience'])} | valid-slug set={len(valid)}")
 
     path = PATHS[args.kind]
@@ -320,7 +251,7 @@ def main() -> None:
         futs = {}
         for r in targets:
             ctx = ctx_lookup.get(r.get("template_id")) if args.kind == "inspirations" else None
-            futs[pool.submit(enrich_one, client, r, args.kind, vocab, valid, ctx)] = r
+            futs[pool.submit(enrich_one, client, r, args.kind, vocab, idx, ctx)] = r
         done = 0
         for fut in as_completed(futs):
             rid, kept, dropped = fut.result()
@@ -9,12 +9,29 @@ single template. So we score: did the agent choose the right SHAPE of plan?
   gap + a count               -> expect "batch"
   gap + edit wording + image  -> expect "edit"
   direct                      -> expect "single"  (must NOT regress)
+
+Plan latency matters as much as shape, so every request also records wall time,
+time-to-first-byte and payload size, and the run ends with p50/p95/p99 per
+expected shape (gap queries with no lexical expectation report as "unlabeled").
+Gap and direct queries go out together through eval_http's keep-alive pool,
+--concurrency at a time; everything lands in a JSON results file (--out) so two
+runs can be diffed — a routing change that doubles plan latency shows up next to
+the accuracy numbers.
+
+Usage:  eval_deliverable_routing.py [--label L] [--endpoint URL] [--concurrency N]
+                                    [--queries F] [--out F]
 """
-import json, re, sys, time, urllib.request
+import argparse, asyncio, json, re, time
 from collections import defaultdict
+from pathlib import Path
+
+from eval_http import Pool, percentiles, run_ordered
 
+ROOT = Path(__file__).resolve().parent.parent
 PLAN = "http://localhost:3000/api/design-agent/plan"
 Q = "/Users/qqwjq/curify-studio/dev/jayw/design-agent-v0/eval/tool_intent_queries.jsonl"
+OUT = str(ROOT / "raw" / "eval" / "deliverable-routing-{label}.json")
+SHAPES = ("system", "batch", "edit", "single", "unlabeled")
 
 SYSTEM_RE = re.compile(r"完整|整套|全套|系统|视觉识别|品牌视觉|品牌形象|系列|\bvi\b|identity", re.I)
 BATCH_RE = re.compile(r"\d{1,3}\s*(?:个|张|款|种|色|sku)", re.I)
@@ -32,62 +49,130 @@ def expected(q):
     return None  # no strong lexical expectation
 
 
-def plan(query, has_image=False):
-    req = urllib.request.Request(
-        PLAN, data=json.dumps({"query": query, "hasImage": has_image, "locale": "en"}).encode(),
-        headers={"Content-Type": "application/json"})
-    for a in range(2):
-        try:
-            with urllib.request.urlopen(req, timeout=120) as r:
-                return json.loads(r.read())
-        except Exception:
-            if a:
-                return None
-            time.sleep(2)
-    return None
-
-
-qs = [json.loads(l) for l in open(Q, encoding="utf-8") if l.strip()]
-gap = [q for q in qs if q.get("coverage") == "gap"]
-direct = [q for q in qs if q.get("coverage") == "direct"]
-
-print(f"=== {len(gap)} gap queries — did the plan shape change? ===")
-shapes = defaultdict(int)
-multi = 0
-hits = tot = 0
-for q in gap:
-    exp = expected(q)
-    # edits only make sense with a reference image
-    p = plan(q["query"], has_image=(exp == "edit"))
-    if not p:
-        print(f"  ERROR {q['id']}")
-        continue
-    d = (p.get("routing") or {}).get("deliverable") or {}
-    got, nsteps = d.get("type", "?"), len(p.get("steps") or [])
-    shapes[got] += 1
-    if nsteps > 1:
-        multi += 1
-    if exp:
-        tot += 1
-        ok = got == exp
-        hits += ok
-        print(f"  {'OK ' if ok else 'MISS'} {q['id']} exp={exp:9s} got={got:11s} steps={nsteps}  {q['query'][:38]}")
-
-print(f"\nplan shapes on gap: {dict(shapes)}")
-print(f"multi-step plans: {multi}/{len(gap)}  ({100*multi//max(len(gap),1)}%)")
-if tot:
-    print(f"shape accuracy where lexically expected: {hits}/{tot} ({100*hits//tot}%)")
-
-print(f"\n=== {len(direct)} direct queries — regression check ===")
-sing = ok1 = 0
-for q in direct:
-    p = plan(q["query"])
-    if not p:
-        continue
-    d = (p.get("routing") or {}).get("deliverable") or {}
-    if d.get("type") == "single":
-        sing += 1
-    if p.get("steps"):
-        ok1 += 1
-print(f"still routed 'single': {sing}/{len(direct)} ({100*sing//len(direct)}%)")
-print(f"still produced a plan:  {ok1}/{len(direct)} ({100*ok1//len(direct)}%)")
+async def plan_all(qs, endpoint=PLAN, concurrency=4):
+    """POST every query to the planner; one row per query, in input order."""
+    jobs = []
+    for q in qs:
+        exp = "single" if q.get("coverage") == "direct" else expected(q)
+        # edits only make sense with a reference image
+        jobs.append((q, exp, {"query": q["query"], "hasImage": exp == "edit", "locale": "en"}))
+
+    async with Pool(endpoint, size=concurrency, timeout=120) as pool:
+        res = await run_ordered(jobs, lambda j: pool.post_json(endpoint, j[2], tries=2), concurrency)
+
+    rows = []
+    for (q, exp, _), r in zip(jobs, res):
+        row = {"id": q["id"], "coverage": q.get("coverage"), "expected": exp, "query": q["query"]}
+        if isinstance(r, Exception) or not r.ok:
+            row["error"] = type(r).__name__ if isinstance(r, Exception) else f"HTTP {r.status}"
+        else:
+            try:
+                p = r.json()
+            except ValueError:
+                p = None
+            if isinstance(p, dict):
+                d = (p.get("routing") or {}).get("deliverable") or {}
+                row.update(got=d.get("type", "?"), steps=len(p.get("steps") or []))
+            else:
+                row["error"] = "bad JSON"
+        if not isinstance(r, Exception):
+            row.update(latency_s=round(r.elapsed, 4), ttfb_s=round(r.ttfb, 4), bytes=r.size)
+        rows.append(row)
+    return rows
+
+
+def latency_table(rows):
+    """{shape: {n, wall_p50.., ttfb_p50.., bytes_p50..}} over answered requests."""
+    by = defaultdict(list)
+    for r in rows:
+        if "error" not in r:
+            by[r["expected"] or "unlabeled"].append(r)
+    out = {}
+    for shape in SHAPES:
+        sub = by.get(shape)
+        if not sub:
+            continue
+        s = {"n": len(sub)}
+        for key, name in (("latency_s", "wall"), ("ttfb_s", "ttfb"), ("bytes", "bytes")):
+            for p, v in percentiles([r[key] for r in sub]).items():
+                s[f"{name}_p{p}"] = round(v, 4)
+        out[shape] = s
+    return out
+
+
+def report(rows):
+    gap = [r for r in rows if r["coverage"] == "gap"]
+    direct = [r for r in rows if r["coverage"] == "direct"]
+    summary = {}
+
+    print(f"=== {len(gap)} gap queries — did the plan shape change? ===")
+    shapes = defaultdict(int)
+    multi = hits = tot = 0
+    for r in gap:
+        if "error" in r:
+            print(f"  ERROR {r['id']}")
+            continue
+        exp, got, nsteps = r["expected"], r["got"], r["steps"]
+        shapes[got] += 1
+        if nsteps > 1:
+            multi += 1
+        if exp:
+            tot += 1
+            ok = got == exp
+            hits += ok
+            print(f"  {'OK ' if ok else 'MISS'} {r['id']} exp={exp:9s} got={got:11s} steps={nsteps}  {r['query'][:38]}")
+
+    print(f"\nplan shapes on gap: {dict(shapes)}")
+    print(f"multi-step plans: {multi}/{len(gap)}  ({100*multi//max(len(gap),1)}%)")
+    if tot:
+        print(f"shape accuracy where lexically expected: {hits}/{tot} ({100*hits//tot}%)")
+    summary["gap"] = {"n": len(gap), "shapes": dict(shapes), "multi_step": multi,
+                      "shape_hits": hits, "shape_scored": tot}
+
+    print(f"\n=== {len(direct)} direct queries — regression check ===")
+    ok_d = [r for r in direct if "error" not in r]
+    sing = sum(r["got"] == "single" for r in ok_d)
+    ok1 = sum(r["steps"] > 0 for r in ok_d)
+    print(f"still routed 'single': {sing}/{len(direct)} ({100*sing//max(len(direct),1)}%)")
+    print(f"still produced a plan:  {ok1}/{len(direct)} ({100*ok1//max(len(direct),1)}%)")
+    summary["direct"] = {"n": len(direct), "single": sing, "planned": ok1}
+
+    lat = latency_table(rows)
+    print("\n=== latency by expected shape ===")
+    print(f"{'shape':10s} {'n':>3s} {'wall p50':>9s} {'p95':>7s} {'p99':>7s} {'ttfb p50':>9s} {'p95':>7s} {'bytes p50':>10s}")
+    for shape, s in lat.items():
+        print(f"{shape:10s} {s['n']:3d} {s['wall_p50']:8.2f}s {s['wall_p95']:6.2f}s {s['wall_p99']:6.2f}s "
+              f"{s['ttfb_p50']:8.2f}s {s['ttfb_p95']:6.2f}s {s['bytes_p50']:10.0f}")
+    summary["latency"] = lat
+    summary["errors"] = sum("error" in r for r in rows)
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Deliverable-type routing + plan latency on the benchmark")
+    ap.add_argument("--label", default="run")
+    ap.add_argument("--endpoint", default=PLAN)
+    ap.add_argument("--concurrency", type=int, default=4, help="requests in flight (1 = serial)")
+    ap.add_argument("--queries", default=Q, help="tool_intent_queries.jsonl")
+    ap.add_argument("--out", help=f"results JSON (default {OUT})")
+    a = ap.parse_args()
+
+    qs = [json.loads(l) for l in open(a.queries, encoding="utf-8") if l.strip()]
+    qs = [q for q in qs if q.get("coverage") in ("gap", "direct")]
+    t0 = time.time()
+    rows = asyncio.run(plan_all(qs, a.endpoint, a.concurrency))
+    wall = time.time() - t0
+    summary = report(rows)
+    print(f"\n{len(rows)} requests in {wall:.1f}s at concurrency {a.concurrency}")
+
+    out = Path(a.out or OUT.format(label=a.label))
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "label": a.label, "endpoint": a.endpoint, "concurrency": a.concurrency,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t0)), "wall_s": round(wall, 2),
+        "summary": summary, "rows": rows}, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"results → {out}")
+
+
+if __name__ == "__main__":
+    main()
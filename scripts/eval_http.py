@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Shared HTTP plumbing for the eval / benchmark scripts (stdlib only).
+
+calibrate_abstention.py and eval_deliverable_routing.py used to open a fresh
+urllib connection per query and run strictly serially, so a 100-query pass took
+the SUM of every LLM round trip. This module gives them:
+
+- Pool         — an asyncio HTTP/1.1 client that keeps connections alive and caps
+                 how many are open at once (= how many requests are in flight),
+- Response     — status / body plus per-request timing: `ttfb` (request sent →
+                 first response byte) and `elapsed` (→ last byte), in seconds,
+- run_ordered  — fan a list of inputs out over the pool with bounded concurrency
+                 and get the results back IN INPUT ORDER,
+- percentiles  — p50/p95/p99 helper for latency reports.
+
+Usage (as a module):
+    from eval_http import Pool, run_ordered
+    async def main():
+        async with Pool("http://localhost:3000", size=8) as pool:
+            rs = await run_ordered(queries, lambda q: pool.post_json("/api/x", {"query": q}), 8)
+"""
+import asyncio
+import json
+import ssl
+import time
+from urllib.parse import urlsplit
+
+
+class Response:
+    def __init__(self, status, headers, body, ttfb, elapsed):
+        self.status, self.headers, self.body = status, headers, body
+        self.ttfb, self.elapsed = ttfb, elapsed
+
+    @property
+    def size(self):
+        return len(self.body)
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class Pool:
+    """Keep-alive connections to ONE origin. `size` bounds open connections, so it
+    is also the maximum number of requests in flight through this pool."""
+
+    def __init__(self, base_url, size=8, timeout=90.0):
+        u = urlsplit(base_url)
+        self.scheme, self.host = u.scheme or "http", u.hostname
+        self.port = u.port or (443 if self.scheme == "https" else 80)
+        self.base_path = u.path.rstrip("/")
+        self.timeout = timeout
+        self._ssl = ssl.create_default_context() if self.scheme == "https" else None
+        self._idle = []
+        self._sem = asyncio.Semaphore(size)
+        self.opened = 0        # connections opened over the pool's life (reuse check)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            _, w = self._idle.pop()
+            w.close()
+
+    async def _connect(self):
+        if self._idle:
+            return self._idle.pop()
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+
+    def url(self, path):
+        """Request target. Absolute paths ('/api/...') go under the base URL's path; a
+        full URL must name this pool's origin and keeps its path and query."""
+        if path.startswith(("http://", "https://")):
+            u = urlsplit(path)
+            port = u.port or (443 if u.scheme == "https" else 80)
+            if (u.scheme, u.hostname, port) != (self.scheme, self.host, self.port):
+                raise ValueError(f"{path}: not on this pool's origin "
+                                 f"{self.scheme}://{self.host}:{self.port}")
+            return (u.path or "/") + (f"?{u.query}" if u.query else "")
+        return self.base_path + path if path.startswith("/") else (self.base_path or "") + "/" + path
+
+    async def request(self, method, path, body=b"", headers=None, tries=1, backoff=2.0):
+        """One request (retried `tries` times on connection errors / 5xx, sleeping
+        `backoff` s between attempts). Returns a Response; raises on the last failure."""
+        target, tries = self.url(path), max(tries, 1)       # a foreign origin fails before connecting
+        for attempt in range(tries):
+            try:
+                async with self._sem:
+                    resp = await asyncio.wait_for(self._once(method, target, body, headers or {}), self.timeout)
+                if resp.status < 500 or attempt == tries - 1:
+                    return resp
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                if attempt == tries - 1:
+                    raise
+            await asyncio.sleep(backoff)
+
+    async def post_json(self, path, payload, tries=1, backoff=2.0):
+        return await self.request("POST", path, json.dumps(payload).encode(),
+                                  {"Content-Type": "application/json"}, tries, backoff)
+
+    async def _once(self, method, target, body, headers):
+        reader, writer = await self._connect()
+        keep = False
+        try:
+            lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                     "Connection: keep-alive", f"Content-Length: {len(body)}"]
+            lines += [f"{k}: {v}" for k, v in headers.items()]
+            t0 = time.perf_counter()
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            ttfb = time.perf_counter() - t0
+            if not status_line:
+                raise asyncio.IncompleteReadError(b"", None)
+            status = int(status_line.split()[1])
+            hdrs = {}
+            while True:
+                ln = await reader.readline()
+                if ln in (b"\r\n", b"\n", b""):
+                    break
+                k, _, v = ln.decode("latin-1").partition(":")
+                hdrs[k.strip().lower()] = v.strip()
+
+            if hdrs.get("transfer-encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    n = int((await reader.readline()).split(b";")[0], 16)
+                    if n == 0:
+                        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                            pass
+                        break
+                    chunks.append(await reader.readexactly(n))
+                    await reader.readexactly(2)
+                data = b"".join(chunks)
+                keep = True
+            elif "content-length" in hdrs:
+                data = await reader.readexactly(int(hdrs["content-length"]))
+                keep = True
+            else:
+                data = await reader.read()
+            keep = keep and hdrs.get("connection", "").lower() != "close"
+            return Response(status, hdrs, data, ttfb, time.perf_counter() - t0)
+        finally:
+            if keep:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+
+
+async def run_ordered(items, fn, concurrency=8, on_done=None):
+    """await fn(item) for every item with at most `concurrency` in flight.
+    Results come back in input order; an exception is returned in its slot rather
+    than cancelling the rest. `on_done(i, result)` is called as each one lands."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i, item):
+        async with sem:
+            try:
+                r = await fn(item)
+            except Exception as e:       # noqa: BLE001 — reported per item by the caller
+                r = e
+        if on_done:
+            on_done(i, r)
+        return r
+
+    return await asyncio.gather(*(one(i, x) for i, x in enumerate(items)))
+
+
+def percentiles(values, ps=(50, 95, 99)):
+    """{p: value} by linear interpolation between closest ranks; {} for no data."""
+    xs = sorted(values)
+    if not xs:
+        return {}
+    out = {}
+    for p in ps:
+        k = (len(xs) - 1) * p / 100
+        lo = int(k)
+        hi = min(lo + 1, len(xs) - 1)
+        out[p] = xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+    return out
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Record / replay stand-in for the LLM-backed API routes the eval scripts hit.
+
+calibrate_abstention.py and eval_deliverable_routing.py normally talk to a live
+dev server (/api/search-template-match, /api/design-agent/plan), which calls an
+LLM — slow, nondeterministic, network-bound. This gives them a local stand-in:
+
+  record  — a pass-through proxy: forwards every request to --upstream, returns
+            the real response and appends the request→response pair, with its
+            measured TTFB / total time, to the fixture store.
+  serve   — answers from the fixture store only (no upstream), optionally
+            sleeping to reproduce the recorded latency. Unknown requests get a
+            404 {"error": "no fixture"} so a stale store fails loudly.
+
+Fixture store: a directory of JSONL files, one per route
+(raw/eval-fixtures/api_search-template-match.jsonl, ...). A fixture is keyed by
+method + path + canonical JSON body (sorted keys), so argument order and
+whitespace do not matter; re-recording a request replaces its fixture.
+
+Latency modes for serve (--latency):
+    recorded     sleep the recorded TTFB before the headers and the rest before the body
+    none         answer immediately (default — fastest CI run)
+    fixed:S      S seconds per request
+    scale:X      recorded timing × X
+
+Usage:
+    python3 scripts/eval_replay.py record --upstream http://localhost:3000 --port 3100
+    python3 scripts/calibrate_abstention.py base http://localhost:3100/api/search-template-match
+    python3 scripts/eval_replay.py serve --port 3100 [--latency recorded]
+"""
+import argparse, hashlib, json, re, threading, time
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+STORE = str(ROOT / "raw" / "eval-fixtures")
+
+
+def fixture_key(method, path, body):
+    try:
+        canon = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    except ValueError:
+        canon = body.decode("utf-8", "replace")
+    return hashlib.sha256(f"{method} {path}\n{canon}".encode()).hexdigest()[:24]
+
+
+def route_file(store, path):
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", path.split("?")[0].strip("/")) or "root"
+    return Path(store) / f"{slug}.jsonl"
+
+
+class FixtureStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.fixtures = {}
+        for f in sorted(self.root.glob("*.jsonl")):
+            for line in f.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    fx = json.loads(line)
+                    self.fixtures[fx["key"]] = fx     # later lines win
+
+    def get(self, key):
+        return self.fixtures.get(key)
+
+    def add(self, fx):
+        with self._lock:
+            self.fixtures[fx["key"]] = fx
+            f = route_file(self.root, fx["path"])
+            f.parent.mkdir(parents=True, exist_ok=True)
+            with open(f, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(fx, ensure_ascii=False) + "\n")
+
+    def compact(self):
+        """Rewrite each route file with only the newest fixture per key."""
+        by_file = {}
+        for fx in self.fixtures.values():
+            by_file.setdefault(route_file(self.root, fx["path"]), []).append(fx)
+        for f, fxs in by_file.items():
+            f.write_text("".join(json.dumps(x, ensure_ascii=False) + "\n" for x in fxs), encoding="utf-8")
+
+
+def parse_latency(spec):
+    if spec in ("recorded", "none"):
+        return spec, 1.0
+    kind, _, v = spec.partition(":")
+    if kind in ("fixed", "scale") and v:
+        return kind, float(v)
+    raise argparse.ArgumentTypeError(f"bad --latency {spec!r} (recorded | none | fixed:S | scale:X)")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive, so eval_http's pool reuses connections
+    disable_nagle_algorithm = True     # headers and body go out as two writes; no delayed-ACK stall
+    store = None
+    upstream = None
+    latency = ("none", 1.0)
+    quiet = False
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, ctype="application/json", delay=(0.0, 0.0)):
+        time.sleep(delay[0])
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if delay[1]:
+            time.sleep(delay[1])         # headers out now, body after the recorded gap
+        self.wfile.write(body)
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        key = fixture_key(self.command, self.path, body)
+        if self.upstream:
+            return self._record(key, body)
+        fx = self.store.get(key)
+        if fx is None:
+            return self._send(404, json.dumps({"error": "no fixture", "key": key, "path": self.path}).encode())
+        kind, v = self.latency
+        ttfb, total = fx.get("ttfb_s", 0.0), fx.get("elapsed_s", 0.0)
+        delay = {"none": (0.0, 0.0), "recorded": (ttfb, total - ttfb),
+                 "scale": (ttfb * v, (total - ttfb) * v), "fixed": (v, 0.0)}[kind]
+        self._send(fx["status"], fx["response"].encode("utf-8"), fx.get("content_type", "application/json"),
+                   (max(delay[0], 0.0), max(delay[1], 0.0)))
+
+    def _record(self, key, body):
+        u = self.upstream
+        conn = (http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection)(
+            u.hostname, u.port, timeout=180)
+        t0 = time.perf_counter()
+        try:
+            conn.request(self.command, self.path, body=body or None,
+                         headers={"Content-Type": self.headers.get("Content-Type", "application/json")})
+            r = conn.getresponse()
+            ttfb = time.perf_counter() - t0
+            data = r.read()
+            elapsed = time.perf_counter() - t0
+            ctype = r.getheader("Content-Type", "application/json")
+        except OSError as e:
+            return self._send(502, json.dumps({"error": f"upstream: {e}"}).encode())
+        finally:
+            conn.close()
+        if r.status < 500:        # never freeze a transient upstream failure into the store
+            self.store.add({
+                "key": key, "method": self.command, "path": self.path,
+                "request": body.decode("utf-8", "replace"), "status": r.status, "content_type": ctype,
+                "response": data.decode("utf-8", "replace"),
+                "ttfb_s": round(ttfb, 4), "elapsed_s": round(elapsed, 4),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        self._send(r.status, data, ctype)
+
+    do_POST = do_GET = _handle
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128     # the default backlog of 5 drops SYNs under --concurrency 32+
+    daemon_threads = True
+
+
+def make_server(store, port, upstream=None, latency=("none", 1.0), quiet=True, host="127.0.0.1"):
+    handler = type("Handler", (_Handler,), {
+        "store": store, "upstream": urlsplit(upstream) if upstream else None,
+        "latency": latency, "quiet": quiet})
+    return _Server((host, port), handler)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Record / replay stand-in for the eval API routes")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record", help="proxy to --upstream and store every exchange")
+    rec.add_argument("--upstream", default="http://localhost:3000")
+    srv = sub.add_parser("serve", help="answer from the fixture store only")
+    srv.add_argument("--latency", type=parse_latency, default=("none", 1.0),
+                     help="recorded | none | fixed:S | scale:X (default none)")
+    cmp_ = sub.add_parser("compact", help="drop superseded fixtures from the store files")
+    for p in (rec, srv, cmp_):
+        p.add_argument("--store", default=STORE, help=f"fixture directory (default {STORE})")
+    for p in (rec, srv):
+        p.add_argument("--port", type=int, default=3100)
+        p.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    a = ap.parse_args()
+
+    store = FixtureStore(a.store)
+    if a.cmd == "compact":
+        store.compact()
+        print(f"{len(store.fixtures)} fixtures in {a.store}")
+        return
+    server = make_server(store, a.port, a.upstream if a.cmd == "record" else None,
+                         getattr(a, "latency", ("none", 1.0)), quiet=not a.verbose)
+    mode = f"recording {a.upstream}" if a.cmd == "record" else f"replaying (latency {a.latency[0]})"
+    print(f"{mode} — {len(store.fixtures)} fixtures in {a.store} — http://127.0.0.1:{a.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
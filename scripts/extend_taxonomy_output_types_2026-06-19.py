@@ -15,6 +15,8 @@ to fill the 8 non-EN locales (de/es/fr/hi/ja/ko/ru/tr).
 import json
 from pathlib import Path
 
+import taxonomy_index
+
 ROOT = Path(__file__).resolve().parents[1]
 TAX = ROOT / "lib" / "taxonomy.json"
 TOPICS_EN = ROOT / "messages" / "en" / "topics.json"
@@ -118,6 +120,10 @@ def main() -> None:
         path.write_text(json.dumps(d, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
         print(f"  +{added_i18n} {locale} displayNames")
 
+    index = taxonomy_index.build()                       # after the EN write: has_i18n reads it
+    taxonomy_index.write(index)
+    print(f"  {taxonomy_index.INDEX.relative_to(ROOT)} rebuilt ({len(index['slugs'])} slugs)")
+
 
 if __name__ == "__main__":
     main()
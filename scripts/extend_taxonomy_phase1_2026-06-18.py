@@ -11,6 +11,8 @@ Safety: only ADDs to taxonomy.json. Never removes existing entries.
 import json
 from pathlib import Path
 
+import taxonomy_index
+
 ROOT = Path(__file__).resolve().parents[1]
 TAX_PATH = ROOT / "lib" / "taxonomy.json"
 
@@ -148,6 +150,10 @@ def main() -> None:
     print(f"  +audience axis entries: {audience_added}")
     print(f"  taxonomy.json updated")
 
+    index = taxonomy_index.build()
+    taxonomy_index.write(index)
+    print(f"  {taxonomy_index.INDEX.relative_to(ROOT)} rebuilt ({len(index['slugs'])} slugs)")
+
 
 if __name__ == "__main__":
     main()
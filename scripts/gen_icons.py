@@ -1,51 +1,168 @@
-"""Regenerate the icon set from public/curify_logo_1024.png.
-
-Run whenever the master logo changes:
-    python3 scripts/gen_icons.py
-
-Emits:
-    app/icon.png          — 512×512, used for the browser tab / <link rel=icon> at auto-detected sizes
-    app/apple-icon.png    — 180×180, iOS home-screen icon
-    app/favicon.ico       — multi-size .ico (16–256), the /favicon.ico older browsers + crawlers
-                            (e.g. TikTok app-review) fetch. MUST be regenerated with the rest or it
-                            drifts to a stale logo — that mismatch failed a 2026-07-08 TikTok review.
-    public/icon-192.png   — 192×192, PWA manifest
-    public/icon-512.png   — 512×512, PWA manifest (any + maskable)
-
-Next.js 15 App Router auto-detects app/icon.png and app/apple-icon.png
-from the filesystem; app/manifest.ts references the public/icon-{192,512}.png
-for PWA installability.
+"""Regenerate the brand icon set from the master logo(s).
+
+Run whenever a master logo changes:
+    python3 scripts/gen_icons.py [--master curify] [--dry-run]
+
+Targets live in scripts/configs/brand_assets.json — one entry per master, each
+with a list of outputs:
+
+    png        square icon             app/icon.png 512, app/apple-icon.png 180,
+                                       public/icon-{192,512}.png (PWA "any")
+    ico        multi-frame favicon     app/favicon.ico 16–256 — the /favicon.ico older
+                                       browsers + crawlers (e.g. TikTok app-review) fetch.
+                                       MUST be regenerated with the rest or it drifts to a
+                                       stale logo — that mismatch failed a 2026-07-08 TikTok review.
+    maskable   PWA maskable icon       logo scaled into the central safe zone on an opaque
+                                       background, so launcher masks never clip it
+                                       (public/icon-maskable-{192,512}.png)
+    og         logo card  W×H          logo centred on a background card (social previews):
+                                       public/og-cover.jpg 1200×630, the homepage og:image
+
+Each master is decoded once into a resampling pyramid: successive 2× box
+reductions (cheap and alias-free), and every target takes ONE final LANCZOS pass
+from the smallest level that is still at least twice its size — instead of a
+full-resolution LANCZOS per target (and again for the ICO). Masters are
+processed in parallel. An output is only rewritten when its pixels change, so an
+unchanged brand leaves the tree (and git) untouched.
+
+Next.js 15 App Router auto-detects app/icon.png and app/apple-icon.png from the
+filesystem; app/manifest.ts references public/icon-{192,512}.png and the
+maskable variants for PWA installability.
 """
+import argparse
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from PIL import Image
+from PIL import Image, ImageChops
+
+REPO = Path(__file__).resolve().parent.parent
+CONFIG = REPO / "scripts" / "configs" / "brand_assets.json"
+
+
+class Pyramid:
+    """2× box-reduced levels of one master; `resize` does the final high-quality pass."""
+
+    def __init__(self, master):
+        self.levels = [master]
+        while min(self.levels[-1].size) >= 64:
+            self.levels.append(self.levels[-1].reduce(2))
+
+    def resize(self, size):
+        w, h = size
+        src = self.levels[0]
+        for lvl in self.levels:
+            if lvl.width >= 2 * w and lvl.height >= 2 * h:
+                src = lvl
+        return src if src.size == size else src.resize(size, Image.LANCZOS)
+
+
+def _fit(pyr, box_w, box_h):
+    mw, mh = pyr.levels[0].size
+    s = min(box_w / mw, box_h / mh)
+    return pyr.resize((max(1, round(mw * s)), max(1, round(mh * s))))
+
 
-REPO = Path(__file__).parent.parent
-SRC = REPO / "public" / "curify_logo_1024.png"
-TARGETS = {
-    REPO / "app" / "icon.png": 512,
-    REPO / "app" / "apple-icon.png": 180,
-    REPO / "public" / "icon-192.png": 192,
-    REPO / "public" / "icon-512.png": 512,
-}
+def _card(pyr, w, h, logo_w, logo_h, background):
+    card = Image.new("RGBA", (w, h), background)
+    logo = _fit(pyr, logo_w, logo_h)
+    card.alpha_composite(logo, ((w - logo.width) // 2, (h - logo.height) // 2))
+    return card
+
+
+def render(pyr, t):
+    """[frames] for one target (a single image except for ico)."""
+    kind = t["kind"]
+    if kind == "png":
+        return [pyr.resize((t["size"], t["size"]))]
+    if kind == "ico":
+        return [pyr.resize((s, s)) for s in sorted(t["sizes"], reverse=True)]
+    if kind == "maskable":
+        s, inner = t["size"], round(t["size"] * t.get("safe_zone", 0.8))
+        return [_card(pyr, s, s, inner, inner, t.get("background", "#FFFFFF"))]
+    if kind == "og":
+        w, h = t["size"]
+        return [_card(pyr, w, h, round(w * t.get("logo", 0.5)), round(h * t.get("logo", 0.5)),
+                      t.get("background", "#FFFFFF"))]
+    raise ValueError(f"unknown target kind: {kind}")
+
+
+def _same(a, b):
+    if a.size != b.size:
+        return False
+    diff = ImageChops.difference(a.convert("RGBA"), b.convert("RGBA"))
+    return diff.getbbox(alpha_only=False) is None     # default bbox looks at alpha only
+
+
+def _lossy(path):
+    return path.suffix.lower() in (".jpg", ".jpeg")
+
+
+def unchanged(path, frames, kind):
+    if not path.exists():
+        return False
+    if _lossy(path):                                  # a re-encode never round-trips the pixels
+        return path.read_bytes() == encode(frames, kind, path)
+    try:
+        old = Image.open(path)
+        if kind == "ico":
+            sizes = sorted(old.ico.sizes(), reverse=True)
+            return sizes == [f.size for f in frames] and all(
+                _same(old.ico.getimage(s), f) for s, f in zip(sizes, frames))
+        return _same(old, frames[0])
+    except (OSError, SyntaxError):
+        return False
+
+
+def encode(frames, kind, path):
+    buf = io.BytesIO()
+    if _lossy(path):
+        frames[0].convert("RGB").save(buf, "JPEG", quality=90, optimize=True)
+    elif kind == "ico":
+        # largest frame first; append_images supplies the pre-resampled smaller frames
+        frames[0].save(buf, format="ICO", sizes=[f.size for f in frames], append_images=frames[1:])
+    else:
+        frames[0].save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def build_master(m, dry_run=False):
+    src = REPO / m["src"]
+    if not src.exists():
+        return m["name"], [f"master missing: {src}"]
+    master = Image.open(src).convert("RGBA")
+    pyr = Pyramid(master)
+    log = [f"source: {m['src']} {master.size}"]
+    for t in m["targets"]:
+        path = REPO / t["path"]
+        frames = render(pyr, t)
+        label = f"{t['kind']:8s} {'/'.join(str(f.width) for f in frames):>22s} → {t['path']}"
+        if unchanged(path, frames, t["kind"]):
+            log.append(f"  = {label}")
+            continue
+        if not dry_run:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(encode(frames, t["kind"], path))
+        log.append(f"  {'~' if dry_run else '+'} {label}")
+    return m["name"], log
 
 
 def main() -> None:
-    if not SRC.exists():
-        raise SystemExit(f"master missing: {SRC}")
-    src = Image.open(SRC)
-    print(f"source: {src.size} mode={src.mode}")
-    for path, size in TARGETS.items():
-        resized = src.resize((size, size), Image.LANCZOS)
-        resized.save(path, "PNG", optimize=True)
-        print(f"  {size}×{size} → {path.relative_to(REPO)}")
-
-    # favicon.ico — multi-size so the browser tab matches the rest of the brand.
-    ico_path = REPO / "app" / "favicon.ico"
-    ico_sizes = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-    base = src.resize((256, 256), Image.LANCZOS)
-    base.save(ico_path, format="ICO", sizes=ico_sizes)
-    print(f"  ico {ico_sizes[0][0]}–{ico_sizes[-1][0]} → {ico_path.relative_to(REPO)}")
+    ap = argparse.ArgumentParser(description="Regenerate brand icons from the master logo(s)")
+    ap.add_argument("--config", type=Path, default=CONFIG)
+    ap.add_argument("--master", action="append", help="only these master names (repeatable)")
+    ap.add_argument("--dry-run", action="store_true", help="report what would change, write nothing")
+    a = ap.parse_args()
+
+    masters = json.loads(a.config.read_text(encoding="utf-8"))["masters"]
+    if a.master:
+        masters = [m for m in masters if m["name"] in a.master]
+    with ProcessPoolExecutor(max_workers=max(1, len(masters))) as pool:
+        for name, log in pool.map(build_master, masters, [a.dry_run] * len(masters)):
+            print(f"[{name}]")
+            print("\n".join(log))
+    print("(= unchanged, + written" + (", ~ would change)" if a.dry_run else ")"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Bot-pattern classifier for GSC search queries.
+
+AI answer engines gathering sources fire long multi-country "world cup 2026
+predictions brazil argentina france …" queries at Google; they show up in GSC
+as impressions that never click and drag blended CTR down (see
+docs/seo-funnel-audit-2026-06-26.md and docs/search-ctr-bot-pollution-2026-07-09.md).
+A query matches the pattern when it has
+
+    ≥ MIN_WORDS words  AND  ≥ MIN_COUNTRIES distinct country names  AND  a time marker
+
+(substring matches on the lower-cased query; callers add "AND 0 clicks").
+
+Each vocabulary is compiled into one trie-shaped regex (an automaton over the
+names' shared prefixes), so a query is lower-cased once and scanned once per
+vocabulary instead of once per name. `label` does a whole column, classifying
+each distinct query string once. Labels can be persisted across runs in
+raw/.cache/gsc-bot-labels-<signature>.npz (query hash → flag; the signature
+covers the vocabularies and thresholds, so editing a list starts a fresh file).
+
+    from gsc_bot_filter import is_bot_pattern, label
+    is_bot_pattern("brazil vs argentina vs france world cup 2026 predictions")   # True
+    flags = label(queries)                  # np.ndarray[bool], one per query
+    flags = label(queries, cache=True)      # + the on-disk label cache
+
+CLI (summary of a GSC queries export, optionally writing the flagged rows):
+    python3 scripts/gsc_bot_filter.py raw/gsc-audit-2026-06-26/Queries-all.csv [--out flagged.csv]
+"""
+import argparse, csv, hashlib, os, re
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT, "raw", ".cache")
+
+COUNTRIES = ["argentina", "brazil", "france", "portugal", "spain", "italy", "germany", "england", "mexico",
+             "colombia", "japan", "korea", "china", "india", "usa", "america", "canada", "netherlands",
+             "belgium", "croatia", "morocco", "uruguay", "ecuador", "peru", "chile", "poland", "denmark",
+             "sweden", "switzerland", "austria", "cameroon", "senegal", "ghana", "nigeria", "egypt", "tunisia",
+             "algeria", "ivory", "saudi", "iran", "qatar", "panama"]
+TIME_MARKERS = ["2026", "2027", "world cup", "wc 2026", "tournament", "group stage", "predictions",
+                "contenders", "favorites", "comparison", " vs ", "versus", "top 10", "top 5", "best of"]
+MIN_WORDS = 5
+MIN_COUNTRIES = 3
+
+
+def _trie_pattern(words):
+    """Regex for `words` factored into a prefix trie, so the matcher walks one
+    branch per character instead of trying every word at every position."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        alts = [re.escape(ch) + emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else f"(?:{'|'.join(alts)})"
+        return f"(?:{body})?" if "" in node else body         # greedy: longest word wins
+
+    return emit(trie)
+
+
+def _overlaps(words):
+    """Every "ab" where a suffix of word a is a prefix of word b (peru+usa → "perusa")."""
+    return sorted({a + b[k:] for a in words for b in words
+                   for k in range(1, min(len(a), len(b))) if a.endswith(b[:k])})
+
+
+_COUNTRY_RE = re.compile(_trie_pattern(COUNTRIES))
+_MARKER_RE = re.compile(_trie_pattern(TIME_MARKERS))
+# A left-to-right scan can't see two names that share letters; only then (never in
+# practice — it needs them jammed together) fall back to one substring test per name.
+# No name contains another, so otherwise the scan's distinct-name count is exact.
+_OVERLAP_RE = re.compile(_trie_pattern(_overlaps(COUNTRIES)))
+SIGNATURE = hashlib.sha256(repr((COUNTRIES, TIME_MARKERS, MIN_WORDS, MIN_COUNTRIES)).encode()).hexdigest()[:12]
+
+
+def is_bot_pattern(q):
+    """True when `q` looks like AI source-gathering (the 0-clicks check is the caller's)."""
+    if len(q.split()) < MIN_WORDS:
+        return False
+    q = q.lower()
+    hits = set(_COUNTRY_RE.findall(q))
+    if 0 < len(hits) < MIN_COUNTRIES and _OVERLAP_RE.search(q):
+        hits = {c for c in COUNTRIES if c in q}
+    return len(hits) >= MIN_COUNTRIES and _MARKER_RE.search(q) is not None
+
+
+def _label(queries):
+    """One flag per query; each distinct query string is classified once."""
+    seen = {}
+    return np.fromiter((seen[q] if q in seen else seen.setdefault(q, is_bot_pattern(q)) for q in queries),
+                       dtype=bool, count=len(queries))
+
+
+def _keys(queries):
+    return np.fromiter((int.from_bytes(hashlib.blake2b(q.encode(), digest_size=8).digest(), "little")
+                        for q in queries), dtype=np.uint64, count=len(queries))
+
+
+def label(queries, cache=False, cache_dir=CACHE_DIR):
+    """Bot-pattern flag for every query in the column (np.ndarray[bool]).
+
+    With `cache`, labels persist in <cache_dir>/gsc-bot-labels-<SIGNATURE>.npz as
+    sorted 64-bit query hashes + flags; known queries are resolved with one
+    searchsorted and only the rest are classified (and added)."""
+    queries = list(queries)
+    if not cache:
+        return _label(queries)
+    path = os.path.join(cache_dir, f"gsc-bot-labels-{SIGNATURE}.npz")
+    keys = _keys(queries)
+    if os.path.exists(path):
+        with np.load(path) as z:
+            known_k, known_b = z["keys"], z["bot"]
+    else:
+        known_k, known_b = np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+    pos = np.minimum(np.searchsorted(known_k, keys), max(len(known_k) - 1, 0))
+    hit = known_k[pos] == keys if len(known_k) else np.zeros(len(keys), dtype=bool)
+    out = np.zeros(len(queries), dtype=bool)
+    out[hit] = known_b[pos[hit]]
+    miss = np.flatnonzero(~hit)
+    if miss.size:
+        out[miss] = _label([queries[i] for i in miss])
+        new_k, first = np.unique(keys[miss], return_index=True)
+        all_k = np.concatenate([known_k, new_k])
+        order = np.argsort(all_k, kind="stable")
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, keys=all_k[order], bot=np.concatenate([known_b, out[miss][first]])[order])
+        os.replace(tmp, path)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Flag bot-pattern queries in a GSC queries export")
+    ap.add_argument("csv", help="GSC queries export (Query/Top queries, Clicks, Impressions, …)")
+    ap.add_argument("--out", help="write the flagged rows (0 clicks) here")
+    ap.add_argument("--cache", action="store_true", help="reuse / extend the label cache under raw/.cache")
+    a = ap.parse_args()
+
+    with open(a.csv, newline="", encoding="utf-8-sig") as f:
+        r = csv.reader(f)
+        header = next(r)
+        rows = [row for row in r if row]
+    qi = next(i for i, h in enumerate(header) if h in ("Query", "Top queries"))
+    ci, ii = header.index("Clicks"), header.index("Impressions")
+    flags = label([row[qi] for row in rows], cache=a.cache)
+    flagged = [row for row, b in zip(rows, flags) if b and int(row[ci]) == 0]
+    impr = sum(int(row[ii]) for row in rows)
+    bot_impr = sum(int(row[ii]) for row in flagged)
+    print(f"{len(rows):,} queries, {len(flagged):,} bot-pattern with 0 clicks "
+          f"→ {bot_impr:,} of {impr:,} impressions ({100 * bot_impr / max(impr, 1):.1f}%)")
+    if a.out:
+        with open(a.out, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            w.writerows(flagged)
+        print(f"flagged rows → {a.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Local store for dated GSC exports — ingest once, query every period in SQL.
+
+Every audit used to re-parse the CSVs, and comparing two pulls meant diffing
+printouts. This ingests each snapshot into raw/gsc/store.sqlite:
+
+    snapshots  (date, source)              e.g. 2026-06-26 / gsc-audit
+    files      one per snapshot × dimension (page, query, country, device, date),
+               with the source file's sha256 — re-ingesting an unchanged file is a
+               no-op, a changed one replaces that dimension's rows
+    keys       dictionary-encoded page / query / … strings, with the route family
+               + locale of pages (site_routes.classify) and the bot-pattern
+               flag of queries (gsc_bot_filter) precomputed at ingest
+    facts      (snapshot, key) → clicks, impressions, position; indexed both ways,
+               so a per-page time series and a per-snapshot funnel are index scans
+
+A snapshot directory is any folder of GSC CSVs with the date in its name
+(raw/gsc-audit-2026-06-26, raw/curify-ai.com-Performance-on-Search-2026-06-26);
+its Filters.csv, if present, supplies the period. A loose CSV (the repo-root
+Pages.csv) needs --date, or takes the date of its last git commit.
+
+Usage:
+    python3 scripts/gsc_store.py ingest [PATH ...] [--date 2026-07-03] [--source weekly]
+    python3 scripts/gsc_store.py list
+    python3 scripts/gsc_store.py series page https://www.curify-ai.com/blog/portugal-soccer-poster-prompts
+    python3 scripts/gsc_store.py diff 2026-06-26/gsc-audit 2026-07-03 [--top 15]
+
+With no PATH, ingest picks up every dated directory under raw/ plus Pages.csv.
+A snapshot is referenced by id, by date (when only one source has it) or as
+date/source.
+"""
+import argparse, csv, hashlib, os, re, sqlite3, subprocess, time
+from pathlib import Path
+
+from gsc_bot_filter import label as bot_labels
+from site_routes import SITE, classify_many
+
+ROOT = Path(__file__).resolve().parent.parent
+DB = ROOT / "raw" / "gsc" / "store.sqlite"
+DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+# first header cell → dimension (UI exports say "Top pages", the API pull "Page")
+DIMS = {"Page": "page", "Top pages": "page", "Query": "query", "Top queries": "query",
+        "Country": "country", "Device": "device", "Date": "date"}
+FUNNEL = (("top20", "position <= 20"), ("top10", "position <= 10"), ("top3", "position <= 3"),
+          ("clicked", "clicks > 0"), ("clicked_5plus", "clicks >= 5"))
+
+
+def connect(path=DB):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY, date TEXT, source TEXT, period TEXT, UNIQUE (date, source));
+        CREATE TABLE IF NOT EXISTS files (
+            snapshot_id INTEGER, dim TEXT, path TEXT, sha TEXT, rows INTEGER, ingested TEXT,
+            PRIMARY KEY (snapshot_id, dim));
+        CREATE TABLE IF NOT EXISTS keys (
+            id INTEGER PRIMARY KEY, dim TEXT, key TEXT, family TEXT, locale TEXT, bot INTEGER,
+            UNIQUE (dim, key));
+        CREATE TABLE IF NOT EXISTS facts (
+            snapshot_id INTEGER, dim TEXT, key_id INTEGER, clicks INTEGER, impressions INTEGER, position REAL,
+            PRIMARY KEY (snapshot_id, dim, key_id)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS facts_by_key ON facts (key_id, snapshot_id);
+    """)
+    return db
+
+
+# --- ingest --------------------------------------------------------------------
+
+def _sha(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _git_date(path):
+    out = subprocess.run(["git", "log", "-1", "--format=%cs", "--", str(path)], cwd=ROOT,
+                         capture_output=True, text=True).stdout.strip()
+    return out or None
+
+
+def _dim(path):
+    """page / query / … from the header, None for non-metric CSVs (Filters.csv)."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    dim = DIMS.get(header[0]) if header else None
+    return dim if dim and {"Clicks", "Impressions", "Position"} <= set(header) else None
+
+
+def _read(path):
+    """[(key, clicks, impressions, position)]"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        r = csv.reader(f)
+        header = next(r)
+        c, n, p = (header.index(h) for h in ("Clicks", "Impressions", "Position"))
+        return [(row[0], int(row[c]), int(row[n]), float(row[p])) for row in r if row]
+
+
+def _key_ids(db, dim, keys):
+    """Dictionary-encode `keys`, adding the new ones (with family / locale / bot)."""
+    have = {}
+    for i in range(0, len(keys), 900):
+        batch = keys[i:i + 900]
+        have.update(db.execute(f"SELECT key, id FROM keys WHERE dim = ? AND key IN ({','.join('?' * len(batch))})",
+                               [dim, *batch]).fetchall())
+    new = [k for k in dict.fromkeys(keys) if k not in have]
+    if new:
+        if dim == "page":
+            attrs = [(fam, loc, None) for fam, loc in zip(*classify_many(new))]
+        elif dim == "query":
+            attrs = [(None, None, int(b)) for b in bot_labels(new).tolist()]
+        else:
+            attrs = [(None, None, None)] * len(new)
+        db.executemany("INSERT INTO keys (dim, key, family, locale, bot) VALUES (?,?,?,?,?)",
+                       [(dim, k, *a) for k, a in zip(new, attrs)])
+        for i in range(0, len(new), 900):
+            batch = new[i:i + 900]
+            have.update(db.execute(f"SELECT key, id FROM keys WHERE dim = ? AND key IN ({','.join('?' * len(batch))})",
+                                   [dim, *batch]).fetchall())
+    return have
+
+
+def _period(folder):
+    f = folder / "Filters.csv"
+    if f.exists():
+        for row in csv.reader(open(f, encoding="utf-8-sig")):
+            if row and row[0] == "Date":
+                return row[1]
+    return None
+
+
+def ingest(db, path, date=None, source=None):
+    """Ingest a snapshot directory or one CSV. Returns [(file, dim, status, rows)]."""
+    path = Path(path).resolve()
+    folder = path if path.is_dir() else path.parent
+    files = sorted(path.glob("*.csv")) if path.is_dir() else [path]
+    m = DATE_RE.search(path.name) or (DATE_RE.search(folder.name) if folder != ROOT else None)
+    if not date and not m:
+        date = _git_date(path)
+        if not date:
+            raise SystemExit(f"{path}: no date in the name — pass --date")
+        print(f"  note: {path.name} is undated; using its last commit date {date} (override with --date)")
+    date = date or m.group(1)
+    if source is None:
+        stem = path.name if path.is_dir() else (folder.name if folder != ROOT else path.stem)
+        source = DATE_RE.sub("", stem).strip("-_ ") or "export"
+    db.execute("INSERT OR IGNORE INTO snapshots (date, source, period) VALUES (?,?,?)", (date, source, _period(folder)))
+    sid = db.execute("SELECT id FROM snapshots WHERE date = ? AND source = ?", (date, source)).fetchone()[0]
+
+    out = []
+    for f in files:
+        dim = _dim(f)
+        if dim is None:
+            continue
+        sha = _sha(f)
+        old = db.execute("SELECT sha, path FROM files WHERE snapshot_id = ? AND dim = ?", (sid, dim)).fetchone()
+        if old and old[0] == sha:
+            out.append((f, dim, "unchanged", None))
+            continue
+        if old and old[1] != str(f):
+            print(f"  note: {f.name} replaces {Path(old[1]).name} as {date}/{source} {dim}")
+        rows = _read(f)
+        ids = _key_ids(db, dim, [r[0] for r in rows])
+        db.execute("DELETE FROM facts WHERE snapshot_id = ? AND dim = ?", (sid, dim))
+        # GSC never repeats a key within one export; if a hand-edited file does, the last row wins
+        db.executemany("INSERT OR REPLACE INTO facts VALUES (?,?,?,?,?,?)",
+                       [(sid, dim, ids[k], c, n, p) for k, c, n, p in rows])
+        db.execute("INSERT OR REPLACE INTO files VALUES (?,?,?,?,?,?)",
+                   (sid, dim, str(f), sha, len(rows), time.strftime("%Y-%m-%dT%H:%M:%S")))
+        out.append((f, dim, "replaced" if old else "added", len(rows)))
+    db.commit()
+    return out
+
+
+def discover():
+    dirs = [p for p in sorted((ROOT / "raw").iterdir()) if p.is_dir() and DATE_RE.search(p.name) and any(p.glob("*.csv"))]
+    loose = [ROOT / "Pages.csv"] if (ROOT / "Pages.csv").exists() else []
+    return dirs + loose
+
+
+# --- query ---------------------------------------------------------------------
+
+def resolve(db, ref):
+    """Snapshot id from an id, a date, or date/source."""
+    ref = str(ref)
+    if ref.isdigit():
+        rows = db.execute("SELECT id FROM snapshots WHERE id = ?", (int(ref),)).fetchall()
+    elif "/" in ref:
+        date, source = ref.split("/", 1)
+        rows = db.execute("SELECT id FROM snapshots WHERE date = ? AND source = ?", (date, source)).fetchall()
+    else:
+        rows = db.execute("SELECT id FROM snapshots WHERE date = ?", (ref,)).fetchall()
+    if len(rows) != 1:
+        have = [f"{d}/{s}" for d, s in db.execute("SELECT date, source FROM snapshots WHERE date = ? ORDER BY source",
+                                                   (ref.split("/")[0],))]
+        raise SystemExit(f"{'ambiguous' if rows else 'no'} snapshot {ref!r}" + (f" (have: {', '.join(have)})" if have else ""))
+    return rows[0][0]
+
+
+def label_of(db, sid):
+    return "{}/{}".format(*db.execute("SELECT date, source FROM snapshots WHERE id = ?", (sid,)).fetchone())
+
+
+def series(db, dim, key):
+    """[(date, source, clicks, impressions, position)] for one page / query / …, oldest first."""
+    return db.execute("""
+        SELECT s.date, s.source, f.clicks, f.impressions, f.position
+        FROM keys k JOIN facts f ON f.key_id = k.id JOIN snapshots s ON s.id = f.snapshot_id
+        WHERE k.dim = ? AND k.key = ? ORDER BY s.date, s.source""", (dim, key)).fetchall()
+
+
+def funnel(db, sid, dim="page"):
+    """Totals + position / click buckets for one snapshot (bot-pattern share for queries)."""
+    cols = ", ".join(f"SUM({cond})" for _, cond in FUNNEL)
+    row = db.execute(f"SELECT COUNT(*), SUM(clicks), SUM(impressions), {cols} FROM facts "
+                     f"WHERE snapshot_id = ? AND dim = ?", (sid, dim)).fetchone()
+    out = dict(zip(["rows", "clicks", "impressions", *(k for k, _ in FUNNEL)], (v or 0 for v in row)))
+    if dim == "query":
+        bot = db.execute("SELECT COUNT(*), SUM(f.impressions) FROM facts f JOIN keys k ON k.id = f.key_id "
+                         "WHERE f.snapshot_id = ? AND f.dim = 'query' AND k.bot = 1 AND f.clicks = 0", (sid,)).fetchone()
+        out["bot_queries"], out["bot_impressions"] = bot[0], bot[1] or 0
+    return out
+
+
+def families(db, sid):
+    """{family: {pages, clicks, impressions, top20}} for one snapshot's page export."""
+    return {fam: {"pages": n, "clicks": c, "impressions": i, "top20": t}
+            for fam, n, c, i, t in db.execute("""
+                SELECT k.family, COUNT(*), SUM(f.clicks), SUM(f.impressions), SUM(f.position <= 20)
+                FROM facts f JOIN keys k ON k.id = f.key_id
+                WHERE f.snapshot_id = ? AND f.dim = 'page' GROUP BY k.family""", (sid,))}
+
+
+def movers(db, base, new, dim="page", top=15):
+    """Keys with the biggest click change between two snapshots (absent = 0)."""
+    return db.execute("""
+        SELECT k.key, m.c0, m.c1, m.p0, m.p1, m.c1 - m.c0 AS d
+        FROM (SELECT key_id,
+                     COALESCE(SUM(CASE WHEN snapshot_id = :a THEN clicks END), 0) AS c0,
+                     COALESCE(SUM(CASE WHEN snapshot_id = :b THEN clicks END), 0) AS c1,
+                     MAX(CASE WHEN snapshot_id = :a THEN position END) AS p0,
+                     MAX(CASE WHEN snapshot_id = :b THEN position END) AS p1
+              FROM facts WHERE snapshot_id IN (:a, :b) AND dim = :dim GROUP BY key_id) m
+        JOIN keys k ON k.id = m.key_id
+        ORDER BY ABS(d) DESC, k.key LIMIT :top""", {"a": base, "b": new, "dim": dim, "top": top}).fetchall()
+
+
+# --- CLI -----------------------------------------------------------------------
+
+def cmd_ingest(a):
+    db = connect(a.db)
+    paths = a.paths or discover()
+    if (a.date or a.source) and len(paths) > 1:
+        raise SystemExit("--date / --source apply to a single PATH")
+    t0 = time.time()
+    for p in paths:
+        for f, dim, status, n in ingest(db, p, a.date, a.source):
+            print(f"  {status:9s} {dim:8s} {'' if n is None else f'{n:>8,}'}  {os.path.relpath(f, ROOT)}")
+    print(f"{time.time() - t0:.2f}s → {os.path.relpath(a.db, ROOT)}")
+
+
+def cmd_list(a):
+    db = connect(a.db)
+    for sid, date, source, period in db.execute("SELECT id, date, source, period FROM snapshots ORDER BY date, source"):
+        dims = ", ".join(f"{d} {n:,}" for d, n in db.execute(
+            "SELECT dim, rows FROM files WHERE snapshot_id = ? ORDER BY dim", (sid,)))
+        print(f"#{sid:<3d} {date} {source:40s} {period or '':24s} {dims}")
+
+
+def cmd_series(a):
+    db = connect(a.db)
+    rows = series(db, a.dim, a.key)
+    if not rows:
+        raise SystemExit(f"no {a.dim} {a.key!r} in any snapshot")
+    print(f"  {'date':10s} {'source':36s} {'clicks':>7s} {'impr':>9s} {'CTR':>6s} {'pos':>6s}")
+    for date, source, c, n, p in rows:
+        print(f"  {date:10s} {source[:36]:36s} {c:>7,} {n:>9,} {100 * c / max(n, 1):>5.2f}% {p:>6.1f}")
+
+
+def _delta_line(name, x, y):
+    d = y - x
+    pct = f"{100 * d / x:+6.1f}%" if x else "      "
+    return f"  {name:18s} {x:>10,} → {y:>10,}  {d:>+9,} {pct}"
+
+
+def cmd_diff(a):
+    db = connect(a.db)
+    t0 = time.perf_counter()
+    base, new = resolve(db, a.base), resolve(db, a.new)
+    print(f"{label_of(db, base)} → {label_of(db, new)}  [{a.dim}]")
+    fb, fn = funnel(db, base, a.dim), funnel(db, new, a.dim)
+    for k in fn:
+        print(_delta_line(k, fb[k], fn[k]))
+    if a.dim == "page":
+        ga, gb = families(db, base), families(db, new)
+        print(f"\n  {'family':26s} {'clicks':>19s} {'impressions':>23s} {'top20':>15s}")
+        for fam in sorted(set(ga) | set(gb), key=lambda f: -(gb.get(f) or ga[f])["clicks"]):
+            x, y = ga.get(fam, {}), gb.get(fam, {})
+            print(f"  {fam:26s}" + "".join(f" {x.get(m, 0):>8,}→{y.get(m, 0):<8,}" + " " * (4 if m == 'impressions' else 0)
+                                           for m in ("clicks", "impressions", "top20")))
+    print(f"\n  top {a.top} movers by clicks:")
+    for key, c0, c1, p0, p1, d in movers(db, base, new, a.dim, a.top):
+        pos = f"{p0 or 0:5.1f}→{p1 or 0:5.1f}" if p0 and p1 else ("  new      " if p1 else "  gone     ")
+        print(f"  {d:>+7,}  {c0:>6,}→{c1:<6,} {pos}  {key.replace(SITE, '')[:70]}")
+    print(f"\n({1000 * (time.perf_counter() - t0):.0f} ms)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Dated GSC exports → SQLite store with time-series / diff queries")
+    ap.add_argument("--db", type=Path, default=DB)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    i = sub.add_parser("ingest", help="add / refresh snapshots (idempotent)")
+    i.add_argument("paths", nargs="*", type=Path, help="snapshot dirs or CSVs (default: dated dirs under raw/ + Pages.csv)")
+    i.add_argument("--date", help="snapshot date for an undated PATH")
+    i.add_argument("--source", help="source name (default: the dir / file name without its date)")
+    i.set_defaults(fn=cmd_ingest)
+    sub.add_parser("list", help="stored snapshots").set_defaults(fn=cmd_list)
+    s = sub.add_parser("series", help="one key across snapshots")
+    s.add_argument("dim", choices=sorted(set(DIMS.values())))
+    s.add_argument("key")
+    s.set_defaults(fn=cmd_series)
+    d = sub.add_parser("diff", help="funnel / family / mover deltas between two snapshots")
+    d.add_argument("base")
+    d.add_argument("new")
+    d.add_argument("--dim", default="page", choices=["page", "query", "country", "device"])
+    d.add_argument("--top", type=int, default=15)
+    d.set_defaults(fn=cmd_diff)
+    a = ap.parse_args()
+    a.fn(a)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""On-disk cache of decoded + resampled source images for the layout builders.
+
+images_to_pdf, the booklet, text_overlay_no_prompt_engineering and
+build_ip_merch_video all start from the same few source images and do
+"open → convert(mode) → fit/cover/resize to W×H with method M" on every run.
+Decoding a 4K PNG and a LANCZOS pass over it cost far more than the layout
+itself, so iterating on a layout spent most of its time re-doing that work.
+
+    import image_cache
+    im = image_cache.load(path, "RGB")                       # decoded, converted
+    im = image_cache.resize(path, (w, h), "RGBA")            # exact size
+    im = image_cache.fit(path, (box_w, box_h))               # contain: inside the box
+    im = image_cache.cover(path, (w, h))                     # center-crop to the box aspect, then resize
+    w, h = image_cache.size(path)                            # header only, no decode
+
+Entries live under raw/.cache/images/ (override with $IMAGE_CACHE_DIR), keyed by
+the SHA-256 of the source bytes + op + size + mode + resampling method, so an
+edited source misses and a moved/renamed one still hits. Pixels are stored raw
+(no PNG/JPEG round-trip): a hit is a file read, and returns exactly the pixels
+the miss computed. The directory is capped at $IMAGE_CACHE_MAX_MB (default 2048);
+least-recently-used entries are evicted first (a hit bumps the entry's mtime).
+
+Maintenance:
+    python3 scripts/image_cache.py stats
+    python3 scripts/image_cache.py prune [--max-mb 512]
+    python3 scripts/image_cache.py clear
+"""
+import argparse, hashlib, os, time
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get("IMAGE_CACHE_DIR") or ROOT / "raw" / ".cache" / "images")
+MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_MB", "2048")) << 20
+RAW_MODES = {"1", "L", "LA", "RGB", "RGBA", "RGBX", "CMYK", "I", "F"}
+
+_sha = {}                  # (path, mtime_ns, size) → source hash, per process
+_usage = None              # bytes on disk as last seen by this process
+
+
+def source_sha(path):
+    st = os.stat(path)
+    k = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if k not in _sha:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _sha[k] = h.hexdigest()
+    return _sha[k]
+
+
+def size(path):
+    with Image.open(path) as im:
+        return im.size
+
+
+def _fit_size(w, h, box_w, box_h):
+    s = min(box_w / w, box_h / h)
+    return int(w * s), int(h * s)
+
+
+def _compute(path, op, dims, mode, method):
+    im = Image.open(path).convert(mode)
+    if op == "load":
+        return im
+    if op == "resize":
+        return im if im.size == dims else im.resize(dims, method)
+    if op == "fit":
+        return im.resize(_fit_size(im.width, im.height, *dims), method)
+    if op == "cover":
+        w, h = dims
+        if im.width / im.height > w / h:
+            nw = int(im.height * w / h)
+            im = im.crop(((im.width - nw) // 2, 0, (im.width + nw) // 2, im.height))
+        else:
+            nh = int(im.width * h / w)
+            im = im.crop((0, (im.height - nh) // 2, im.width, (im.height + nh) // 2))
+        return im.resize((w, h), method)
+    raise ValueError(f"unknown op: {op}")
+
+
+def _entry(path, op, dims, mode, method):
+    spec = f"{op}:{dims[0]}x{dims[1]}:{mode}:{int(method)}" if dims else f"{op}:{mode}"
+    key = hashlib.sha256(f"{source_sha(path)}|{spec}".encode()).hexdigest()
+    return CACHE_DIR / key[:2] / f"{key}.raw"
+
+
+def _read(p):
+    with open(p, "rb") as f:
+        mode, w, h = f.readline().decode().split()
+        im = Image.frombytes(mode, (int(w), int(h)), f.read())
+    os.utime(p)                                      # LRU: a hit counts as a use
+    return im
+
+
+def _write(p, im):
+    global _usage
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(f"{im.mode} {im.width} {im.height}\n".encode())
+        f.write(im.tobytes())
+    os.replace(tmp, p)
+    if _usage is None:
+        _usage = sum(e.stat().st_size for e in _entries())
+    else:
+        _usage += p.stat().st_size
+    if _usage > MAX_BYTES:
+        _usage = prune(MAX_BYTES * 3 // 4)           # evict in batches, not once per write
+
+
+def _get(path, op, dims=None, mode="RGB", method=Image.LANCZOS):
+    if mode not in RAW_MODES:
+        return _compute(path, op, dims, mode, method)
+    p = _entry(path, op, dims, mode, method)
+    try:
+        return _read(p)
+    except (OSError, ValueError):                    # miss, or a torn/foreign file
+        pass
+    im = _compute(path, op, dims, mode, method)
+    try:
+        _write(p, im)
+    except OSError as e:                             # a full/readonly disk must not break a build
+        print(f"  (image cache: {type(e).__name__}: {e})")
+    return im
+
+
+def load(path, mode="RGB"):
+    return _get(path, "load", None, mode)
+
+
+def resize(path, dims, mode="RGB", method=Image.LANCZOS):
+    return _get(path, "resize", tuple(dims), mode, method)
+
+
+def fit(path, box, mode="RGB", method=Image.LANCZOS):
+    return _get(path, "fit", tuple(box), mode, method)
+
+
+def cover(path, dims, mode="RGB", method=Image.LANCZOS):
+    return _get(path, "cover", tuple(dims), mode, method)
+
+
+# --- maintenance ----------------------------------------------------------------
+
+def _entries():
+    return CACHE_DIR.glob("*/*.raw") if CACHE_DIR.exists() else []
+
+
+def prune(max_bytes):
+    """Delete least-recently-used entries until the cache fits; returns bytes kept."""
+    files = []
+    for e in _entries():
+        try:
+            st = e.stat()
+        except FileNotFoundError:                    # another process evicted it
+            continue
+        files.append((st.st_mtime, st.st_size, e))
+    files.sort(key=lambda f: f[0])
+    total = sum(f[1] for f in files)
+    for _, n, e in files:
+        if total <= max_bytes:
+            break
+        e.unlink(missing_ok=True)
+        total -= n
+    return total
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect / trim the decoded-image cache")
+    ap.add_argument("cmd", choices=["stats", "prune", "clear"])
+    ap.add_argument("--max-mb", type=int, default=MAX_BYTES >> 20, help="prune: target size")
+    a = ap.parse_args()
+
+    if a.cmd == "stats":
+        files = [e.stat() for e in _entries()]
+        if not files:
+            print(f"{CACHE_DIR}: empty")
+            return
+        total = sum(s.st_size for s in files)
+        oldest = min(s.st_mtime for s in files)
+        print(f"{CACHE_DIR}: {len(files)} entries, {total / 2**20:.1f} MB of {MAX_BYTES >> 20} MB, "
+              f"least recent use {(time.time() - oldest) / 86400:.1f} days ago")
+    elif a.cmd == "prune":
+        print(f"kept {prune(a.max_mb << 20) / 2**20:.1f} MB")
+    else:
+        print(f"kept {prune(0) / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Perceptual-hash index + duplicate / near-duplicate clusters for example images.
+
+We keep shipping visually identical images under different ids — wasted storage
+and CDN bytes, and thin-content SEO pages. This hashes every image referenced by
+
+    public/data/nano_inspiration.json   asset.image_url / asset.preview_image_url
+    public/data/nanobanana.json         imageURL (gallery prompts)
+
+with a 63-bit pHash (DCT of a 32×32 luma thumbnail) and a 64-bit dHash (9×8
+gradient), persists them in raw/image-hash-index.json, and groups images whose
+hashes are within a Hamming radius using a BK-tree (so a lookup touches a small
+fraction of the index instead of all N² pairs). A pair counts as duplicate when
+pHash distance ≤ --phash AND dHash distance ≤ --dhash; clusters are the
+connected components.
+
+Incremental: the index is keyed by image URL. A re-run after a drop only hashes
+URLs it has not seen (local files are also re-hashed when their bytes change);
+--refresh re-hashes everything.
+
+Images resolve to public/<url> when present locally, otherwise are fetched from
+--cdn (default $NEXT_PUBLIC_CDN_URL) — public/images is synced from GCS and is
+usually not on disk.
+
+Usage:
+    python3 scripts/image_dupes.py [--phash 6] [--dhash 10] [--workers 16] [--report raw/image-dupes.json]
+"""
+import argparse, hashlib, io, json, os, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+REPO = Path(__file__).resolve().parent.parent
+PUBLIC = REPO / "public"
+INSP = PUBLIC / "data" / "nano_inspiration.json"
+GALLERY = PUBLIC / "data" / "nanobanana.json"
+INDEX = REPO / "raw" / "image-hash-index.json"
+
+_N = 32
+_DCT = np.cos(np.pi * np.outer(np.arange(_N), 2 * np.arange(_N) + 1) / (2 * _N))   # DCT-II basis
+
+
+# --- references ---------------------------------------------------------------
+
+def normalize_url(raw):
+    """Same rules as the prompt page's normalizeImageUrl."""
+    if not raw:
+        return None
+    if "static/images/" in raw:
+        return raw.replace("/static/images/", "/images/")
+    if raw.startswith("//"):
+        return "https:" + raw
+    if raw.startswith(("/", "http://", "https://")):
+        return raw
+    return "/" + raw
+
+
+def collect_refs(insp=INSP, gallery=GALLERY):
+    """{url: [ref, ...]} where ref = "insp:<id>" / "insp-preview:<id>" / "gallery:<id>"."""
+    refs = {}
+
+    def add(url, ref):
+        url = normalize_url(url)
+        if url:
+            refs.setdefault(url, []).append(ref)
+
+    if insp.exists():
+        for r in json.loads(insp.read_text(encoding="utf-8")):
+            a = r.get("asset") or {}
+            add(a.get("image_url"), f"insp:{r.get('id')}")
+            add(a.get("preview_image_url"), f"insp-preview:{r.get('id')}")
+    else:
+        print(f"  (missing {insp.relative_to(REPO)})")
+    if gallery.exists():
+        data = json.loads(gallery.read_text(encoding="utf-8"))
+        for p in data["prompts"] if isinstance(data, dict) else data:
+            add(p.get("imageURL"), f"gallery:{p.get('id')}")
+    else:
+        print(f"  (missing {gallery.relative_to(REPO)})")
+    return refs
+
+
+# --- hashing ------------------------------------------------------------------
+
+def fetch(url, cdn):
+    local = PUBLIC / url.lstrip("/") if url.startswith("/") else None
+    if local and local.exists():
+        return local.read_bytes()
+    if url.startswith("/"):
+        if not cdn:
+            raise FileNotFoundError(f"{url} not on disk and no --cdn")
+        url = cdn.rstrip("/") + url
+    with urllib.request.urlopen(url, timeout=60) as r:
+        return r.read()
+
+
+def phash_dhash(data):
+    im = Image.open(io.BytesIO(data))
+    im.draft("L", (4 * _N, 4 * _N))       # JPEG: decode at 1/2–1/8 scale, far cheaper than full size
+    g = im.convert("L")
+    p = np.asarray(g.resize((_N, _N), Image.LANCZOS), dtype=np.float64)
+    coef = (_DCT @ p @ _DCT.T)[:8, :8].ravel()
+    bits_p = coef[1:] > np.median(coef[1:])                  # skip DC; 63 bits
+    d = np.asarray(g.resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    bits_d = (d[:, 1:] > d[:, :-1]).ravel()                  # 64 bits
+    to_int = lambda bits: int("".join("1" if b else "0" for b in bits), 2)
+    return to_int(bits_p), to_int(bits_d)
+
+
+def hash_one(url, cdn):
+    try:
+        data = fetch(url, cdn)
+        ph, dh = phash_dhash(data)
+        return url, {"sha": hashlib.sha256(data).hexdigest()[:16], "phash": f"{ph:016x}",
+                     "dhash": f"{dh:016x}", "bytes": len(data)}, None
+    except Exception as e:     # noqa: BLE001 — reported, not fatal
+        return url, None, f"{type(e).__name__}: {e}"
+
+
+def stale(url, entry):
+    """Local file whose bytes changed since it was indexed."""
+    if not url.startswith("/"):
+        return False
+    local = PUBLIC / url.lstrip("/")
+    return local.exists() and (local.stat().st_size != entry.get("bytes")
+                               or hashlib.sha256(local.read_bytes()).hexdigest()[:16] != entry.get("sha"))
+
+
+# --- search -------------------------------------------------------------------
+
+class BKTree:
+    """Metric tree over Hamming distance: a radius query only descends into
+    children whose edge distance is within [d - r, d + r]."""
+
+    def __init__(self):
+        self.root = None           # [value, key, {dist: child}]
+
+    def add(self, value, key):
+        if self.root is None:
+            self.root = [value, key, {}]
+            return
+        node = self.root
+        while True:
+            d = (value ^ node[0]).bit_count()
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, key, {}]
+                return
+            node = child
+
+    def within(self, value, r):
+        out, stack = [], [self.root] if self.root else []
+        while stack:
+            v, key, kids = stack.pop()
+            d = (value ^ v).bit_count()
+            if d <= r:
+                out.append((d, key))
+            stack.extend(c for dist, c in kids.items() if d - r <= dist <= d + r)
+        return out
+
+
+def clusters(index, urls, r_phash, r_dhash):
+    """Connected components of the near-duplicate graph over `urls`."""
+    urls = [u for u in urls if u in index]
+    ph = {u: int(index[u]["phash"], 16) for u in urls}
+    dh = {u: int(index[u]["dhash"], 16) for u in urls}
+    parent = {u: u for u in urls}
+
+    def find(u):
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        return u
+
+    tree = BKTree()
+    for u in urls:
+        for _, v in tree.within(ph[u], r_phash):
+            if (dh[u] ^ dh[v]).bit_count() <= r_dhash:
+                parent[find(u)] = find(v)
+        tree.add(ph[u], u)
+    groups = {}
+    for u in urls:
+        groups.setdefault(find(u), []).append(u)
+    return sorted((g for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="pHash/dHash duplicate index over inspiration + gallery images")
+    ap.add_argument("--phash", type=int, default=6, help="max pHash Hamming distance (of 63 bits)")
+    ap.add_argument("--dhash", type=int, default=10, help="max dHash Hamming distance (of 64 bits)")
+    ap.add_argument("--cdn", default=os.environ.get("NEXT_PUBLIC_CDN_URL", ""), help="origin for /images/... not on disk")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--refresh", action="store_true", help="re-hash every URL")
+    ap.add_argument("--index", type=Path, default=INDEX)
+    ap.add_argument("--report", type=Path, help="write clusters JSON here")
+    a = ap.parse_args()
+
+    refs = collect_refs()
+    index = {} if a.refresh or not a.index.exists() else json.loads(a.index.read_text(encoding="utf-8"))
+    todo = [u for u in refs if u not in index or stale(u, index[u])]
+    print(f"{len(refs)} referenced images, {len(index)} indexed, {len(todo)} to hash")
+
+    t0, errors = time.time(), 0
+    with ThreadPoolExecutor(max_workers=a.workers) as pool:
+        for i, (url, entry, err) in enumerate(pool.map(lambda u: hash_one(u, a.cdn), todo), 1):
+            if err:
+                errors += 1
+                if errors <= 20:
+                    print(f"  ERROR {url}: {err}")
+            else:
+                index[url] = entry
+            if i % 500 == 0:
+                print(f"  {i}/{len(todo)}")
+    if len(todo) > errors:
+        a.index.parent.mkdir(parents=True, exist_ok=True)
+        a.index.write_text(json.dumps(dict(sorted(index.items())), indent=0) + "\n", encoding="utf-8")
+        print(f"hashed {len(todo) - errors} ({errors} errors) in {time.time() - t0:.1f}s → {a.index.relative_to(REPO)}")
+
+    t1 = time.time()
+    groups = clusters(index, refs, a.phash, a.dhash)
+    dup_imgs = sum(len(g) - 1 for g in groups)
+    wasted = sum(index[u].get("bytes", 0) for g in groups for u in g[1:])
+    print(f"\n{len(groups)} clusters, {dup_imgs} redundant images (~{wasted / 1e6:.1f} MB) "
+          f"[pHash ≤ {a.phash}, dHash ≤ {a.dhash}; {time.time() - t1:.2f}s]")
+    for g in groups[:25]:
+        exact = len({index[u]["sha"] for u in g}) == 1
+        print(f"\n  {len(g)} images{' (byte-identical)' if exact else ''}")
+        for u in g[:6]:
+            print(f"    {u}  ← {', '.join(refs[u][:3])}{' …' if len(refs[u]) > 3 else ''}")
+        if len(g) > 6:
+            print(f"    … +{len(g) - 6}")
+
+    if a.report:
+        a.report.parent.mkdir(parents=True, exist_ok=True)
+        a.report.write_text(json.dumps(
+            [{"size": len(g), "byte_identical": len({index[u]['sha'] for u in g}) == 1,
+              "images": [{"url": u, "refs": refs[u], "phash": index[u]["phash"]} for u in g]} for g in groups],
+            ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"\nreport → {a.report}")
+
+
+if __name__ == "__main__":
+    main()
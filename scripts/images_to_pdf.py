@@ -9,12 +9,28 @@
 Reusable: pass a list of (image_path, caption) pairs. (We can consolidate this with
 the /template-packs pack flow later.)
 
+Two output modes:
+- raster (default): every page is one flat Pillow image, exactly as before.
+- compact (`compact=True` / `--compact`): same layout written through vector_pdf —
+  header, captions and hairlines are vector text/paths in a subset-embedded font,
+  the photo is a JPEG XObject at `quality` (capped at IMAGE_DPI; a JPEG source that
+  already fits is embedded byte-for-byte) and the logo is stored once per file.
+  This is the mode for packs that get uploaded and downloaded. Raster pages are
+  already JPEG (Pillow's default quality), so the saving is the photo bytes: on
+  generated 768-832 px cards, 50 pages go 11.7 MB → 5.3 MB at the defaults.
+
+`--check` builds both and rasterises the compact PDF back (PyMuPDF) to diff it
+page-by-page against the raster pages — run it after touching the layout.
+
 Usage (as a module):
     from images_to_pdf import build_pdf
     build_pdf([(img1, "title1"), (img2, "title2")], "out.pdf", subtitle="HSK 2 · 拼音 + 汉字 · curify-ai.com")
+    build_pdf(items, "out.pdf", subtitle=..., compact=True, quality=70)
 """
 import os
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageStat
+
+import image_cache
 
 DPI = 200
 # US Letter @ DPI
@@ -23,16 +39,31 @@ MARGIN = int(0.5 * DPI)                                # 0.5" safe print margin
 HEADER_H = int(0.6 * DPI)                              # logo band inside the printable area
 FOOTER_H = int(0.42 * DPI)                             # caption band
 GAP = int(0.12 * DPI)
+IMAGE_DPI = 150                                       # compact mode: photo resolution cap
+JPEG_QUALITY = 70                                     # compact mode: photo JPEG quality
 INK = (34, 34, 34); GRAY = (120, 120, 120); LINE = (228, 228, 228)
 LOGO_PATH = os.path.join(os.path.dirname(__file__), "..", "public", "curify_logo_1024.png")
+FONTS_DIR = os.path.join(os.path.dirname(__file__), "..", "public", "fonts")
+CJK_FONTS = ["/System/Library/Fonts/STHeiti Medium.ttc",                      # macOS
+             "/System/Library/Fonts/Hiragino Sans GB.ttc",
+             "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",        # Debian/Ubuntu fonts-noto-cjk
+             "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",             # Fedora / Arch
+             "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+             "C:/Windows/Fonts/msyh.ttc"]
+LATIN_FONTS = {False: ["/System/Library/Fonts/Supplemental/Arial.ttf",
+                       "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+                       "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+                       "C:/Windows/Fonts/arial.ttf"],
+               True:  ["/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+                       os.path.join(FONTS_DIR, "Inter-Bold.ttf"),                # bundled
+                       "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+                       "C:/Windows/Fonts/arialbd.ttf"]}
 
 
 def _font(size, cjk=False, bold=False):
-    cands = (["/System/Library/Fonts/STHeiti Medium.ttc",
-              "/System/Library/Fonts/Hiragino Sans GB.ttc"] if cjk else
-             ["/System/Library/Fonts/Supplemental/Arial Bold.ttf"] if bold else
-             ["/System/Library/Fonts/Supplemental/Arial.ttf"])
-    cands += ["/System/Library/Fonts/STHeiti Medium.ttc"]  # CJK fallback
+    """A file-backed TrueType font (vector_pdf embeds it by path). Falls back to the
+    CJK fonts, then the bundled Inter, before Pillow's bitmap default."""
+    cands = (CJK_FONTS if cjk else LATIN_FONTS[bold]) + CJK_FONTS + LATIN_FONTS[True]
     for p in cands:
         if os.path.exists(p):
             try:
@@ -42,9 +73,29 @@ def _font(size, cjk=False, bold=False):
     return ImageFont.load_default()
 
 
-def _make_page(img_path, caption, subtitle, logo):
-    page = Image.new("RGB", (PAGE_W, PAGE_H), "white")
-    d = ImageDraw.Draw(page)
+def _needs_cjk(texts):
+    return any(ord(ch) >= 0x2E80 for t in texts for ch in t or "")
+
+
+def _check_fonts(norm, subtitle):
+    """Fail before rendering rather than on page N: compact pages need file-backed
+    fonts, and CJK captions need a CJK font (a Latin fallback would print tofu)."""
+    if not isinstance(getattr(_font(12, bold=True), "path", None), str):
+        raise SystemExit("compact PDF needs a TrueType font file; none of the candidates in "
+                         "images_to_pdf.LATIN_FONTS exists (public/fonts/Inter-Bold.ttf missing?)")
+    if _needs_cjk([c for _, c in norm] + [subtitle]) and not any(os.path.exists(p) for p in CJK_FONTS):
+        raise SystemExit("captions contain CJK text but no CJK font was found — install Noto Sans CJK "
+                         "(apt install fonts-noto-cjk) or add its path to images_to_pdf.CJK_FONTS")
+
+
+def _make_page(img_path, caption, subtitle, logo, doc=None, quality=JPEG_QUALITY):
+    """One page. With `doc` (a vector_pdf.VectorPDF) the same layout is drawn as a
+    vector page instead of a raster; `d` and `page` are then the same object."""
+    if doc is None:
+        page = Image.new("RGB", (PAGE_W, PAGE_H), "white")
+        d = ImageDraw.Draw(page)
+    else:
+        page = d = doc.new_page(PAGE_W, PAGE_H, unit=72 / DPI, bg="white")
 
     # ---- header band (top margin zone): centered logo + "Curify" ----
     lh = int(0.34 * DPI)
@@ -61,13 +112,15 @@ def _make_page(img_path, caption, subtitle, logo):
     box_x0, box_y0 = MARGIN, MARGIN + HEADER_H + GAP
     box_x1, box_y1 = PAGE_W - MARGIN, PAGE_H - MARGIN - FOOTER_H - GAP
     bw_, bh_ = box_x1 - box_x0, box_y1 - box_y0
-    im = Image.open(img_path).convert("RGB")
-    scale = min(bw_ / im.width, bh_ / im.height)
-    nw, nh = int(im.width * scale), int(im.height * scale)
-    im = im.resize((nw, nh), Image.LANCZOS)
+    iw, ih = image_cache.size(img_path)
+    scale = min(bw_ / iw, bh_ / ih)
+    nw, nh = int(iw * scale), int(ih * scale)
     ix = box_x0 + (bw_ - nw) // 2
     iy = box_y0 + (bh_ - nh) // 2
-    page.paste(im, (ix, iy))
+    if doc is None:
+        page.paste(image_cache.resize(img_path, (nw, nh)), (ix, iy))
+    else:
+        _place_photo(page, img_path, (ix, iy, ix + nw, iy + nh), quality)
     d.rectangle([ix - 1, iy - 1, ix + nw, iy + nh], outline=(220, 220, 220), width=1)
 
     # ---- footer band (bottom margin zone): caption + subtitle ----
@@ -81,18 +134,84 @@ def _make_page(img_path, caption, subtitle, logo):
     return page
 
 
-def build_pdf(items, out_path, subtitle=""):
-    """items: list of (image_path, caption) or bare image_path strings."""
+def _place_photo(page, img_path, box, quality):
+    """Compact mode: the photo at no more than IMAGE_DPI. A JPEG that already fits
+    goes in untouched — re-encoding it would only add a second round of artefacts."""
+    x0, y0, x1, y1 = box
+    cap_w = int((x1 - x0) * IMAGE_DPI / DPI)
+    cap_h = int((y1 - y0) * IMAGE_DPI / DPI)
+    with Image.open(img_path) as im:
+        fmt, mode, width = im.format, im.mode, im.width
+    if fmt == "JPEG" and mode in ("RGB", "L") and width <= cap_w * 1.1:
+        page.image(img_path, box)
+        return
+    if width > cap_w:
+        page.image(image_cache.resize(img_path, (cap_w, cap_h)), box, quality=quality)
+    else:
+        page.image(image_cache.load(img_path), box, quality=quality)
+
+
+def build_pdf(items, out_path, subtitle="", compact=False, quality=JPEG_QUALITY):
+    """items: list of (image_path, caption) or bare image_path strings.
+    compact: write vector text + JPEG photos (see module docstring) instead of raster pages."""
     logo = Image.open(LOGO_PATH).convert("RGBA")
     norm = [(x, "") if isinstance(x, str) else x for x in items]
+    if compact:
+        from vector_pdf import VectorPDF
+        _check_fonts(norm, subtitle)
+        doc = VectorPDF(jpeg_quality=quality)
+        for p, c in norm:
+            _make_page(p, c, subtitle, logo, doc=doc, quality=quality)
+        doc.save(out_path)
+        return out_path, len(norm), (PAGE_W, PAGE_H)
     pages = [_make_page(p, c, subtitle, logo) for p, c in norm]
     pages[0].save(out_path, save_all=True, append_images=pages[1:], resolution=float(DPI))
     return out_path, len(pages), pages[0].size
 
 
+def check_parity(items, compact_path, subtitle="", max_mean=6.0):
+    """Rasterise the compact PDF at DPI and diff each page against the raster layout.
+    Returns [(page_no, mean_abs_diff, max_channel_diff)]; raises if any page's mean
+    difference exceeds `max_mean` (0–255 scale). Needs PyMuPDF (`pip install pymupdf`)."""
+    try:
+        import fitz
+    except ImportError:
+        raise SystemExit("check_parity needs PyMuPDF: pip install pymupdf")
+    logo = Image.open(LOGO_PATH).convert("RGBA")
+    norm = [(x, "") if isinstance(x, str) else x for x in items]
+    pdf = fitz.open(compact_path)
+    if len(norm) != len(pdf):
+        raise AssertionError(f"compact PDF has {len(pdf)} pages, the raster layout has {len(norm)}")
+    out = []
+    for i, ((p, c), pg) in enumerate(zip(norm, pdf), 1):
+        ref = _make_page(p, c, subtitle, logo)
+        pix = pg.get_pixmap(dpi=DPI, alpha=False)
+        got = Image.frombytes("RGB", (pix.width, pix.height), pix.samples).resize(ref.size)
+        diff = ImageChops.difference(ref, got)
+        mean = sum(ImageStat.Stat(diff).mean) / 3
+        out.append((i, mean, max(hi for _, hi in diff.getextrema())))
+    bad = [r for r in out if r[1] > max_mean]
+    if bad:
+        raise AssertionError(f"compact PDF drifts from the raster layout on pages {[r[0] for r in bad]}: {bad}")
+    return out
+
+
 if __name__ == "__main__":
-    import sys, json
-    # driver: python images_to_pdf.py manifest.json out.pdf "subtitle"
-    manifest = json.load(open(sys.argv[1]))
-    out, n, size = build_pdf(manifest, sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "")
-    print(f"saved {n}-page PDF -> {out} ({size[0]}x{size[1]}px @ {DPI}dpi)")
+    import argparse, json
+    # driver: python images_to_pdf.py manifest.json out.pdf "subtitle" [--compact [--quality Q]] [--check]
+    ap = argparse.ArgumentParser()
+    ap.add_argument("manifest")
+    ap.add_argument("out")
+    ap.add_argument("subtitle", nargs="?", default="")
+    ap.add_argument("--compact", action="store_true", help="vector text + JPEG photos")
+    ap.add_argument("--quality", type=int, default=JPEG_QUALITY, help="JPEG quality for --compact photos")
+    ap.add_argument("--check", action="store_true", help="diff the compact PDF against the raster pages")
+    a = ap.parse_args()
+    manifest = json.load(open(a.manifest))
+    out, n, size = build_pdf(manifest, a.out, a.subtitle, compact=a.compact or a.check, quality=a.quality)
+    mode = f"compact q{a.quality}" if a.compact or a.check else f"{size[0]}x{size[1]}px @ {DPI}dpi"
+    print(f"saved {n}-page PDF -> {out} ({mode}, {os.path.getsize(out) / 1e6:.2f}MB)")
+    if a.check:
+        for i, mean, hi in check_parity(manifest, out, a.subtitle):
+            print(f"  page {i:3d}: mean |diff| {mean:5.2f}  max {hi}")
+        print("parity OK")
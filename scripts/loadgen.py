@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Load generator for the local search / plan API routes.
+
+The eval scripts measure correctness one query at a time; this measures how a
+route behaves under concurrent users, to size instances before traffic spikes
+(World Cup drops). Queries come from tool_intent_queries.jsonl and/or
+scripts/configs/search_eval_set.json and are replayed in one of two shapes:
+
+  open loop    --qps R     requests START at R per second (Poisson arrivals, or
+                           evenly spaced with --steady) whether or not earlier
+                           ones have finished — how real traffic arrives.
+                           Reports response time from the SCHEDULED start, so
+                           client-side queueing is not hidden.
+  closed loop  --users N   N users each send, wait for the answer, think
+                           (--think s), send again — a fixed concurrency.
+
+Cache warm vs cold (--cache-compare): searchTemplateMatch keeps a process-local
+LRU (256 entries, keyed by the lower-cased query, only non-empty results are
+stored). The compare run sends every unique query once (cold — true only right
+after a dev-server restart), then the same set again (warm), at the same load
+shape, and reports the two side by side.
+
+Usage:
+    python3 scripts/loadgen.py --qps 5 --duration 60
+    python3 scripts/loadgen.py --users 16 --duration 60 --path /api/design-agent/plan
+    python3 scripts/loadgen.py --users 8 --cache-compare --out raw/eval/load-8u.json
+"""
+import argparse, asyncio, json, random, time
+from collections import Counter
+from pathlib import Path
+
+from eval_http import Pool, percentiles
+
+ROOT = Path(__file__).resolve().parent.parent
+BASE = "http://localhost:3000"
+PATH = "/api/search-template-match"
+TOOL_QUERIES = "/Users/qqwjq/curify-studio/dev/jayw/design-agent-v0/eval/tool_intent_queries.jsonl"
+SEARCH_EVAL = ROOT / "scripts" / "configs" / "search_eval_set.json"
+MATCHER_CACHE_MAX = 256       # CACHE_MAX in lib/searchTemplateMatch.ts
+PCTS = (50, 90, 95, 99)
+
+
+def load_queries(sources, tool_path=TOOL_QUERIES):
+    qs = []
+    if "tool" in sources:
+        if Path(tool_path).exists():
+            qs += [json.loads(l)["query"] for l in open(tool_path, encoding="utf-8") if l.strip()]
+        else:
+            print(f"  (skipping tool queries: {tool_path} not found)")
+    if "search-eval" in sources:
+        qs += [q["query"] for q in json.loads(SEARCH_EVAL.read_text(encoding="utf-8"))["queries"]]
+    return qs
+
+
+def payload_for(path):
+    if "plan" in path:
+        return lambda q: {"query": q, "hasImage": False, "locale": "en"}
+    return lambda q: {"query": q}
+
+
+class Recorder:
+    def __init__(self):
+        self.results = []          # (ok, error, service_s, response_s, ttfb_s, bytes)
+        self.t0 = self.t1 = None
+
+    async def send(self, pool, path, body, scheduled=None):
+        start = time.perf_counter()
+        try:
+            r = await pool.post_json(path, body)
+            err = None if r.ok else f"HTTP {r.status}"
+            svc, ttfb, size = r.elapsed, r.ttfb, r.size
+        except Exception as e:      # noqa: BLE001 — counted in the error breakdown
+            err, svc, ttfb, size = type(e).__name__, time.perf_counter() - start, None, 0
+        end = time.perf_counter()
+        self.results.append((err is None, err, svc, end - (scheduled or start), ttfb, size))
+
+    def summary(self):
+        ok = [r for r in self.results if r[0]]
+        wall = (self.t1 or time.perf_counter()) - self.t0
+        out = {"requests": len(self.results), "ok": len(ok), "errors": len(self.results) - len(ok),
+               "error_rate": (len(self.results) - len(ok)) / len(self.results) if self.results else 0.0,
+               "error_kinds": dict(Counter(r[1] for r in self.results if r[1])),
+               "wall_s": round(wall, 3), "throughput_rps": round(len(ok) / wall, 3) if wall else 0.0}
+        for name, i in (("service", 2), ("response", 3), ("ttfb", 4)):
+            p = percentiles([r[i] for r in ok if r[i] is not None], PCTS)
+            out[name] = {f"p{k}": round(v, 4) for k, v in p.items()}
+            if p:
+                out[name]["max"] = round(max(r[i] for r in ok if r[i] is not None), 4)
+        out["bytes_mean"] = round(sum(r[5] for r in ok) / len(ok)) if ok else 0
+        return out
+
+
+async def open_loop(pool, path, make, queries, qps, duration, steady=False, seed=0, cycle=True):
+    """Start requests on a fixed schedule; don't wait for earlier ones to finish."""
+    rng, rec, tasks = random.Random(seed), Recorder(), []
+    rec.t0 = time.perf_counter()
+    t, i = 0.0, 0
+    while (t < duration if cycle else i < len(queries)):
+        delay = rec.t0 + t - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        q = queries[i % len(queries)]
+        tasks.append(asyncio.create_task(rec.send(pool, path, make(q), scheduled=rec.t0 + t)))
+        i += 1
+        t += 1 / qps if steady else rng.expovariate(qps)
+    await asyncio.gather(*tasks)
+    rec.t1 = time.perf_counter()
+    return rec
+
+
+async def closed_loop(pool, path, make, queries, users, duration, think=0.0, cycle=True):
+    """`users` workers, each send → wait → think → send, until time (or queries) run out."""
+    rec, nxt = Recorder(), [0]
+    rec.t0 = time.perf_counter()
+    deadline = rec.t0 + duration
+
+    async def user():
+        while time.perf_counter() < deadline if cycle else nxt[0] < len(queries):
+            q = queries[nxt[0] % len(queries)]
+            nxt[0] += 1
+            await rec.send(pool, path, make(q))
+            if think:
+                await asyncio.sleep(think)
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    rec.t1 = time.perf_counter()
+    return rec
+
+
+async def run(a, queries):
+    make = payload_for(a.path)
+    size = a.users or a.max_inflight
+
+    async def phase(qs, cycle):
+        async with Pool(a.base, size=size, timeout=a.timeout) as pool:
+            if a.users:
+                rec = await closed_loop(pool, a.path, make, qs, a.users, a.duration, a.think, cycle)
+            else:
+                rec = await open_loop(pool, a.path, make, qs, a.qps, a.duration, a.steady, a.seed, cycle)
+            s = rec.summary()
+            s["connections_opened"] = pool.opened
+            return s
+
+    if not a.cache_compare:
+        return {"load": await phase(queries, cycle=True)}
+    uniq = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+    if len({q.lower() for q in uniq}) > MATCHER_CACHE_MAX:
+        print(f"  note: {len(uniq)} unique queries > matcher LRU ({MATCHER_CACHE_MAX}); the warm pass will churn")
+    cold = await phase(uniq, cycle=False)
+    warm = await phase(uniq, cycle=False)
+    return {"cold": cold, "warm": warm}
+
+
+def show(name, s):
+    print(f"\n[{name}] {s['requests']} requests, {s['ok']} ok, {s['errors']} errors "
+          f"({100*s['error_rate']:.1f}%) in {s['wall_s']:.1f}s → {s['throughput_rps']:.2f} req/s "
+          f"over {s['connections_opened']} connection(s)")
+    if s["error_kinds"]:
+        print(f"  errors: {s['error_kinds']}")
+    for key in ("service", "response", "ttfb"):
+        p = s[key]
+        if p:
+            print(f"  {key:9s}" + "".join(f"  p{k} {p[f'p{k}']:6.3f}s" for k in PCTS) + f"  max {p['max']:6.3f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Open/closed-loop load generator for the local API routes")
+    shape = ap.add_mutually_exclusive_group(required=True)
+    shape.add_argument("--qps", type=float, help="open loop: target arrival rate")
+    shape.add_argument("--users", type=int, help="closed loop: concurrent users")
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds (ignored by --cache-compare passes)")
+    ap.add_argument("--think", type=float, default=0.0, help="closed loop: pause between a user's requests")
+    ap.add_argument("--steady", action="store_true", help="open loop: even spacing instead of Poisson arrivals")
+    ap.add_argument("--max-inflight", type=int, default=256, help="open loop: connection cap (queueing beyond it is measured)")
+    ap.add_argument("--base", default=BASE)
+    ap.add_argument("--path", default=PATH, help="route to load (default the template matcher)")
+    ap.add_argument("--source", default="tool,search-eval", help="comma list of tool, search-eval")
+    ap.add_argument("--tool-queries", default=TOOL_QUERIES)
+    ap.add_argument("--shuffle", action="store_true", help="shuffle the query order (with --seed)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--cache-compare", action="store_true", help="cold pass over unique queries, then the same pass warm")
+    ap.add_argument("--out", help="write the summary JSON here")
+    a = ap.parse_args()
+
+    queries = load_queries(a.source.split(","), a.tool_queries)
+    if not queries:
+        raise SystemExit("no queries")
+    if a.shuffle:
+        random.Random(a.seed).shuffle(queries)
+    how = f"{a.qps} qps open loop" if a.qps else f"{a.users} users closed loop"
+    print(f"{len(queries)} queries → {a.base}{a.path}  ({how}{', cache compare' if a.cache_compare else f', {a.duration:.0f}s'})")
+
+    res = asyncio.run(run(a, queries))
+    for name, s in res.items():
+        show(name, s)
+    if "warm" in res and res["cold"]["service"] and res["warm"]["service"]:
+        c, w = res["cold"]["service"]["p50"], res["warm"]["service"]["p50"]
+        print(f"\nwarm/cold p50 {w / c:.2f}×" + ("  (cold pass looks warm — restart the dev server first?)" if w > 0.8 * c else ""))
+    if a.out:
+        Path(a.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(a.out).write_text(json.dumps({"base": a.base, "path": a.path, "shape": how, **res}, indent=1), encoding="utf-8")
+        print(f"summary → {a.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,7 +33,12 @@ the merch booklet on the "same contact info" instruction. It is very likely the
 destination for an e-commerce prospect. Regenerate it if a better landing page exists.
 
 Usage:
-    python3 scripts/oneoff_ecommerce_booklet_pdf_2026-08-12.py [--assets DIR] [--out FILE]
+    python3 scripts/oneoff_ecommerce_booklet_pdf_2026-08-12.py [--assets DIR] [--out FILE] [--vector]
+
+`--vector` writes the same layout through scripts/vector_pdf.py: headings, body copy
+and vertical text become real PDF text in subset-embedded Hiragino/Avenir, boxes and
+rules become paths, and only the photos (and QR codes, losslessly) stay raster. It is
+opt-in until the QR codes have been re-verified out of a vector build (see above).
 
 `--assets` must contain the pre-cropped source images (see `prepare_assets.sh`
 alongside this file, or regenerate with the crop block in the session notes).
@@ -42,6 +47,9 @@ import argparse
 import os
 from PIL import Image, ImageDraw, ImageFont
 
+import cjk_wrap
+import image_cache
+
 # ── canvas ────────────────────────────────────────────────────────────────
 # Layout is authored in LOGICAL units (1240×1754 = A4 @150dpi, matching the sibling
 # portfolios) and rendered onto an S× canvas. Everything below — coordinates, font
@@ -51,9 +59,14 @@ from PIL import Image, ImageDraw, ImageFont
 # and broke up at print size / on zoom (the whole page is one flat image in the PDF,
 # so there is no vector text to fall back on). S=2 puts the page at 300 dpi, which
 # is the floor for print-quality type.
+#
+# With --vector the text no longer depends on S at all; S then only sets the
+# resolution photos are resampled to (still 300 dpi).
 W, H = 1240, 1754
 S = 2
 PAGE_DPI = 150 * S
+A4_PT = 595.276        # A4 width in PDF points; one logical unit = A4_PT / W pt
+VECTOR = None          # a vector_pdf.VectorPDF while building with --vector
 
 # ── palette (sampled from curify_merch.pdf) ───────────────────────────────
 NAVY      = (8, 20, 78)
@@ -145,14 +158,33 @@ class ScaledDraw:
 
 
 def new_page(bg):
-    """An S× page plus a logical-unit drawing surface for it."""
+    """An S× page plus a logical-unit drawing surface for it.
+
+    In --vector mode the page is a vector_pdf.Page laid out in the same logical
+    units; it takes device-pixel pastes (px=1/S) and S×-built fonts (font_scale=1/S)
+    so nothing below needs to know which backend it is drawing on.
+    """
+    if VECTOR is not None:
+        page = VECTOR.new_page(W, H, unit=A4_PT / W, px=1 / S, font_scale=1 / S, bg=bg)
+        return page, page
     page = Image.new("RGB", (W * S, H * S), bg)
     return page, ScaledDraw(ImageDraw.Draw(page))
 
 
+def surface(page):
+    """Logical-unit drawing surface for an existing page, whichever backend."""
+    if isinstance(page, Image.Image):
+        return ScaledDraw(ImageDraw.Draw(page))
+    return page
+
+
 def paste(page, im, xy):
-    """Paste at a LOGICAL coordinate (the image itself must already be S×-sized)."""
-    page.paste(im, (int(xy[0] * S), int(xy[1] * S)))
+    """Paste at a LOGICAL coordinate (the image itself must already be S×-sized).
+    Only the QR codes come through here, so the vector page keeps them lossless."""
+    if isinstance(page, Image.Image):
+        page.paste(im, (int(xy[0] * S), int(xy[1] * S)))
+    else:
+        page.paste(im, (int(xy[0] * S), int(xy[1] * S)), lossless=True)
 
 
 # ── primitives ────────────────────────────────────────────────────────────
@@ -172,54 +204,14 @@ def text(d, xy, s, f, fill, anchor="la", spacing=0):
         x += d.textlength(ch, font=f) + spacing
 
 
-# 禁则处理 — characters that may never START a line (closing punctuation), and
-# characters that may never END one (opening brackets). Without this the greedy
-# wrapper strands a lone 。 or ， at the head of a line, which reads as broken
-# Chinese typesetting to exactly the buyers this booklet is for.
-NO_LINE_START = "。，、；：？！）】》」』”’%…·"
-NO_LINE_END = "（【《「『“‘"
-_LATIN = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+# 禁则处理 (NO_LINE_START / NO_LINE_END) and the wrapping itself live in cjk_wrap:
+# per-token cached widths, memoised line lists, optional balanced breaking.
+WRAP_MODE = "greedy"   # or "balanced" (--wrap balanced)
 
 
 def wrap_cjk(d, s, f, max_w):
-    """Greedy wrap for CJK / mixed text, with 禁则处理 and no mid-word latin breaks."""
-    lines, cur = [], ""
-    i, n = 0, len(s)
-    while i < n:
-        ch = s[i]
-        if ch == "\n":
-            lines.append(cur); cur = ""; i += 1; continue
-
-        # keep a run of latin/digits together so "banner" never splits as "banne r"
-        if ch in _LATIN:
-            j = i
-            while j < n and s[j] in _LATIN:
-                j += 1
-            tok = s[i:j]
-        else:
-            tok = ch
-            j = i + 1
-
-        if d.textlength(cur + tok, font=f) <= max_w or not cur:
-            cur += tok
-            i = j
-            continue
-
-        # would overflow -> break, but never leave closing punctuation orphaned
-        if tok and tok[0] in NO_LINE_START and cur:
-            cur += tok          # let this line run slightly long rather than orphan 。
-            i = j
-            lines.append(cur); cur = ""
-            continue
-        while cur and cur[-1] in NO_LINE_END:
-            tok = cur[-1] + tok
-            cur = cur[:-1]
-        lines.append(cur)
-        cur = tok
-        i = j
-    if cur:
-        lines.append(cur)
-    return lines
+    """Wrap CJK / mixed text with 禁则处理 and no mid-word latin breaks."""
+    return cjk_wrap.wrap(d, s, f, max_w, mode=WRAP_MODE)
 
 
 def para(d, xy, s, f, fill, max_w, lh):
@@ -244,35 +236,22 @@ def rounded(d, box, r, fill=None, outline=None, width=1):
     d.rounded_rectangle(box, radius=r, fill=fill, outline=outline, width=width)
 
 
-def fit_cover(im, w, h):
-    """Center-crop to exactly w×h."""
-    src_r, dst_r = im.width / im.height, w / h
-    if src_r > dst_r:
-        nw = int(im.height * dst_r)
-        im = im.crop(((im.width - nw) // 2, 0, (im.width + nw) // 2, im.height))
-    else:
-        nh = int(im.width / dst_r)
-        im = im.crop((0, (im.height - nh) // 2, im.width, (im.height + nh) // 2))
-    return im.resize((w, h), Image.LANCZOS)
-
-
 def paste_card(page, path, box, radius=10, border=None):
     """Paste an image center-cropped into a LOGICAL box, with rounded corners.
 
     The source is resampled straight to device pixels (box × S) so photography keeps
-    the full resolution the higher-DPI page can carry.
+    the full resolution the higher-DPI page can carry. The crop + resample is
+    memoized on disk (scripts/image_cache.py), so a re-run only pays for layout.
     """
     x0, y0, x1, y1 = (int(v * S) for v in box)
     w, h = x1 - x0, y1 - y0
-    im = fit_cover(Image.open(path).convert("RGB"), w, h)
+    im = image_cache.cover(path, (w, h))
     r = int(radius * S)
     mask = Image.new("L", (w, h), 0)
     ImageDraw.Draw(mask).rounded_rectangle((0, 0, w - 1, h - 1), radius=r, fill=255)
     page.paste(im, (x0, y0), mask)
     if border:
-        ImageDraw.Draw(page).rounded_rectangle(
-            (x0, y0, x1, y1), radius=r, outline=border, width=2 * S
-        )
+        surface(page).rounded_rectangle(box, radius=radius, outline=border, width=2)
 
 
 def logo(page, xy, height=42, dark=True):
@@ -280,19 +259,19 @@ def logo(page, xy, height=42, dark=True):
     p = os.path.join(os.path.dirname(__file__), "..", "public", "curify_logo_1024.png")
     if not os.path.exists(p):
         return
-    im = Image.open(p).convert("RGBA")
+    iw, ih = image_cache.size(p)
     dev_h = int(height * S)
-    dev_w = int(im.width * dev_h / im.height)
-    im = im.resize((dev_w, dev_h), Image.LANCZOS)
+    dev_w = int(iw * dev_h / ih)
+    im = image_cache.resize(p, (dev_w, dev_h), "RGBA")
     page.paste(im, (int(xy[0] * S), int(xy[1] * S)), im)
-    d = ScaledDraw(ImageDraw.Draw(page))
+    d = surface(page)
     d.text((xy[0] + dev_w / S + 12, xy[1] + height / 2), "Curify",
            font=en_b(int(height * 0.82)), fill=WHITE if not dark else NAVY, anchor="lm")
 
 
 def header_block(page, cn, en, kicker=None, h=180):
     """Navy banner with gold kicker + cream CN title + letterspaced EN — merch deck device."""
-    d = ScaledDraw(ImageDraw.Draw(page))
+    d = surface(page)
     d.rectangle((0, 0, W, h), fill=NAVY)
     # gold sweep at the bottom edge
     d.rectangle((0, h - 5, W, h), fill=GOLD)
@@ -307,7 +286,7 @@ def header_block(page, cn, en, kicker=None, h=180):
 
 def side_panel(page, cn_vertical, x=1055, y0=210, y1=1600, width=125, note=None):
     """Right-hand navy panel with vertical Chinese — the merch deck's signature."""
-    d = ScaledDraw(ImageDraw.Draw(page))
+    d = surface(page)
     d.rectangle((x, y0, x + width, y1), fill=NAVY)
     d.rectangle((x, y0, x + width, y0 + 4), fill=GOLD)
     cx = x + width // 2
@@ -321,7 +300,7 @@ def side_panel(page, cn_vertical, x=1055, y0=210, y1=1600, width=125, note=None)
 
 
 def footer(page, dark=False, page_no=None):
-    d = ScaledDraw(ImageDraw.Draw(page))
+    d = surface(page)
     y = H - 96
     if page_no:
         d.text((W - 78, y + 22), page_no, font=en_r(20),
@@ -625,9 +604,7 @@ def page_contact(A, cfg):
     qs = 210
     for i, (p, cn, en) in enumerate(cfg["contact_qr"]):
         qx = W - 110 - (len(cfg["contact_qr"]) - i) * (qs + 40) + 40
-        im = Image.open(os.path.join(A, p)).convert("RGB").resize(
-            (qs * S, qs * S), Image.LANCZOS
-        )
+        im = image_cache.resize(os.path.join(A, p), (qs * S, qs * S))
         paste(page, im, (qx, qy))
         d.rectangle((qx - 1, qy - 1, qx + qs, qy + qs), outline=(226, 220, 206), width=1)
         d.text((qx + qs // 2, qy + qs + 18), cn, font=cjk_b(22), fill=NAVY, anchor="ma")
@@ -637,9 +614,9 @@ def page_contact(A, cfg):
     # here; we have no ecommerce mascot, so the mark carries the same job.
     mark = os.path.join(os.path.dirname(__file__), "..", "public", "curify_logo_1024.png")
     if os.path.exists(mark):
-        m = Image.open(mark).convert("RGBA")
+        mw, mh = image_cache.size(mark)
         side = 560
-        m = m.resize((side * S, int(m.height * side * S / m.width)), Image.LANCZOS)
+        m = image_cache.resize(mark, (side * S, int(mh * side * S / mw)), "RGBA")
         alpha = m.split()[3].point(lambda v: int(v * 0.07))
         m.putalpha(alpha)
         page.paste(m, ((W - side - 60) * S, int(H * 0.30 * S)), m)
@@ -785,12 +762,22 @@ CONFIG = {
 
 
 def main():
+    global VECTOR, WRAP_MODE
     ap = argparse.ArgumentParser()
     here = os.path.dirname(os.path.abspath(__file__))
     ap.add_argument("--assets", default=os.path.join(here, "_ecommerce_booklet_assets"))
     ap.add_argument("--out", default=os.path.join(here, "..", "curify_ecommerce.pdf"))
+    ap.add_argument("--vector", action="store_true",
+                    help="vector text + raster photos via vector_pdf (see module docstring)")
+    ap.add_argument("--wrap", choices=("greedy", "balanced"), default=WRAP_MODE,
+                    help="line breaking for paragraphs (cjk_wrap)")
     a = ap.parse_args()
 
+    WRAP_MODE = a.wrap
+    if a.vector:
+        from vector_pdf import VectorPDF
+        VECTOR = VectorPDF(jpeg_quality=90)
+
     A = a.assets
     pages = [
         page_cover(A, CONFIG),
@@ -801,6 +788,10 @@ def main():
         page_contact(A, CONFIG),
     ]
     out = os.path.abspath(a.out)
+    if VECTOR is not None:
+        VECTOR.save(out)
+        print(f"wrote {out}  ({len(pages)} pages, vector)")
+        return
     # Pillow encodes PDF pages as JPEG at quality=75 by default, which rings around
     # every glyph edge — a real part of why the first build read as soft, on top of
     # the resolution. quality=95 with subsampling=0 (4:4:4) keeps the chroma at full
@@ -12,6 +12,10 @@ Three operations per record:
 Then dedupe + sort.
 
 Output: rewrites nano_inspiration.json + prints stats.
+
+These rules are ruleset inspiration-tags-phase2-2026-06-18 in
+scripts/configs/tag_remap_rules.json; new remaps go there and run
+through scripts/remap_tags.py.
 """
 import json
 from pathlib import Path
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Declarative tag / topic remaps across the three catalogs, from scripts/configs/tag_remap_rules.json.
+
+A ruleset names the catalogs and the field it rewrites and carries any of
+
+    rename    {value: slug}            1:1
+    expand    {value: [slug, …]}       1:N, results go back through rename
+    drop      [value, …]
+    enrich    {below, templates: {template_id: {param, rules: [[regex, [slug, …]], …]}}}
+    prune     {min}                    drop values the parent template already has
+
+rename / expand / drop compile into one lookup table per ruleset (drop beats
+expand beats rename, on the trimmed lowercased value). Each template's enrich
+regexes compile into one pattern of optional lookaheads, so a single match()
+reports every rule that fires on the param value. Every record of every catalog
+goes through every applicable ruleset in one pass, templates first so prune sees
+the rewritten parent topics.
+
+The report counts hits per rule and lists the rules that never fired, and audits
+the touched fields against taxonomy_index for values no rule or taxonomy entry covers.
+
+    python3 scripts/remap_tags.py --dry-run                  # report only
+    python3 scripts/remap_tags.py --only inspiration-tags-phase2-2026-06-18
+    python3 scripts/remap_tags.py --rules my_rules.json --unused
+    python3 scripts/remap_tags.py --parity                   # ported rulesets == the original scripts
+"""
+import argparse, json, re
+from collections import Counter
+from pathlib import Path
+
+import taxonomy_index
+
+ROOT = Path(__file__).resolve().parent.parent
+RULES = ROOT / "scripts" / "configs" / "tag_remap_rules.json"
+CATALOGS = {                                            # processing order: parents first
+    "templates":    ROOT / "public" / "data" / "nano_templates.json",
+    "inspirations": ROOT / "public" / "data" / "nano_inspiration.json",
+    "gallery":      ROOT / "public" / "data" / "nanobanana.json",
+}
+RULES_VERSION = 1
+
+
+class Ruleset:
+    def __init__(self, spec):
+        self.id = spec["id"]
+        self.catalogs = set(spec.get("catalogs") or CATALOGS)
+        unknown = self.catalogs - set(CATALOGS)
+        if unknown:
+            raise ValueError(f"{self.id}: unknown catalogs {sorted(unknown)}")
+        self.field = spec.get("field", "tags")
+        self.normalize = spec.get("normalize", False)     # unmapped values → lowercased, spaces → hyphens
+        self.sort = spec.get("sort", False)               # dedupe + sort the field afterwards
+
+        rename = {k.lower(): v for k, v in (spec.get("rename") or {}).items()}
+        expand = {k.lower(): tuple(rename.get(s.lower(), s) for s in v) for k, v in (spec.get("expand") or {}).items()}
+        drop = {k.lower() for k in spec.get("drop") or []}
+        self.ops, self.shadowed = {}, []                  # value → (replacement slugs, rule label)
+        for kind, table in (("rename", {k: (v,) for k, v in rename.items()}), ("expand", expand),
+                            ("drop", dict.fromkeys(drop, ()))):
+            for k, v in table.items():
+                if k in self.ops:
+                    self.shadowed.append(self.ops[k][1])
+                self.ops[k] = (v, f"{kind} {k}")
+
+        enrich = spec.get("enrich") or {}
+        self.enrich_below = enrich.get("below", 3)
+        self.enrich = {}                                  # template id → (param, pattern, [(label, slugs)])
+        for tid, t in (enrich.get("templates") or {}).items():
+            rules = t["rules"]
+            pattern = re.compile("".join(f"(?=(?P<r{i}>[\\s\\S]*?(?:{pat}))?)" for i, (pat, _) in enumerate(rules)),
+                                 re.IGNORECASE)
+            self.enrich[tid] = (t["param"], pattern, [(f"enrich {tid} #{i} → {','.join(slugs)}", slugs)
+                                                     for i, (_, slugs) in enumerate(rules)])
+        self.prune_min = (spec.get("prune") or {}).get("min")
+
+    def labels(self):
+        out = [label for _, label in self.ops.values()]
+        out += [label for _, _, rules in self.enrich.values() for label, _ in rules]
+        return out + (["prune"] if self.prune_min is not None else [])
+
+    def apply(self, rec, parents, hits):
+        """Rewrite rec[self.field] in place; True when it changed."""
+        before = rec.get(self.field)
+        if before is None and self.enrich:
+            before = []                                   # missing topics: the records enrich is for
+        elif not isinstance(before, list):
+            return False
+        values = before
+        if self.ops or self.normalize:
+            values = []
+            for v in before:
+                if not isinstance(v, str):
+                    values.append(v)
+                    continue
+                key = v.strip().lower()
+                op = self.ops.get(key)
+                if op is None:
+                    values.append(key.replace(" ", "-") if self.normalize else v)
+                else:
+                    hits[op[1]] += 1
+                    values.extend(op[0])
+        if self.enrich and len(values) < self.enrich_below and rec.get("template_id") in self.enrich:
+            param, pattern, rules = self.enrich[rec["template_id"]]
+            value = (rec.get("params") or {}).get(param)
+            if value and isinstance(value, str):
+                fired = pattern.match(value).groupdict()
+                added = []
+                for i, (label, slugs) in enumerate(rules):
+                    if fired[f"r{i}"] is not None:
+                        new = [s for s in slugs if s not in values and s not in added]
+                        if new:
+                            hits[label] += 1
+                            added += new
+                values = values + added
+        if self.prune_min is not None and len(values) >= self.prune_min:
+            parent = set(parents.get(rec.get("template_id"), ()))
+            kept = [v for v in values if not (isinstance(v, str) and v in parent)]
+            if parent and kept and len(kept) < len(values):    # never prune a record down to nothing
+                hits["prune"] += 1
+                values = kept
+        if self.sort:
+            values = sorted(set(values))
+        if values != before:                              # an unenriched missing field stays missing
+            rec[self.field] = values
+            return True
+        return False
+
+
+def load_rules(path=RULES, only=None):
+    cfg = json.loads(Path(path).read_text(encoding="utf-8"))
+    if cfg.get("version") != RULES_VERSION:
+        raise SystemExit(f"{path}: rules version {cfg.get('version')!r}, expected {RULES_VERSION}")
+    specs = [s for s in cfg["rulesets"] if not only or s["id"] in only]
+    missing = set(only or ()) - {s["id"] for s in specs}
+    if missing:
+        raise SystemExit(f"{path}: no ruleset {', '.join(sorted(missing))}")
+    return [Ruleset(s) for s in specs]
+
+
+def run(rulesets, catalogs=CATALOGS):
+    """Apply every ruleset to every record; returns ({catalog: (data, records, changed)}, {ruleset id: Counter})."""
+    hits = {rs.id: Counter() for rs in rulesets}
+    needs_parents = any(rs.prune_min is not None for rs in rulesets)
+    out, parents = {}, {}
+    for name, path in catalogs.items():
+        mine = [rs for rs in rulesets if name in rs.catalogs]
+        if not (mine or (name == "templates" and needs_parents)):
+            continue
+        if not path.exists():
+            print(f"  {name}: {path.relative_to(ROOT)} missing — skipped")
+            continue
+        data = json.loads(path.read_text(encoding="utf-8"))
+        records = data.get("prompts", []) if isinstance(data, dict) else data     # gallery is wrapped
+        changed = 0
+        for rec in records:
+            touched = False
+            for rs in mine:
+                touched |= rs.apply(rec, parents, hits[rs.id])
+            changed += touched
+        if name == "templates":
+            parents = {t.get("id"): t.get("topics") or [] for t in records}
+        out[name] = (data, records, changed)
+    return out, hits
+
+
+# --- parity with the scripts the first two rulesets were ported from --------------
+
+PARITY_SAMPLE = ROOT / "public" / "data" / "inspiration_index.json"     # same record shape, checked in
+
+
+def parity(path=None):
+    """Run the ported rulesets and the original scripts over the same inspirations and
+    return the ids whose result differs. Records whose topics are missing / null are
+    appended for every enrich template — the original enricher treats them as []."""
+    import copy, importlib.util
+
+    def legacy(name):
+        spec = importlib.util.spec_from_file_location(name.replace("-", "_"), ROOT / "scripts" / name)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    phase2 = legacy("remap_inspiration_tags_phase2_2026-06-18.py")
+    examples = legacy("enrich_example_topics.py")
+    path = path or (CATALOGS["inspirations"] if CATALOGS["inspirations"].exists() else PARITY_SAMPLE)
+    recs = json.loads(Path(path).read_text(encoding="utf-8"))
+    for tid, (param, _) in examples.ENRICH_RULES.items():
+        for n, missing in enumerate(("absent", None)):
+            rec = {"id": f"parity-{tid}-{n}", "template_id": tid, "params": {param: "fruit tokyo beijing opera"}}
+            if missing is None:
+                rec["topics"] = None
+            recs.append(rec)
+    templates = json.loads(CATALOGS["templates"].read_text(encoding="utf-8"))
+
+    old = copy.deepcopy(recs)
+    for e in old:
+        tags = e.get("tags") or []
+        if tags:
+            new = sorted({s for t in tags for s in phase2.remap_one(t)})
+            if new != tags:
+                e["tags"] = new
+    by_id = {t["id"]: t for t in templates}
+    examples.enrich(old, by_id)
+    examples.prune(old, by_id)
+
+    rulesets = [Ruleset(s) for s in json.loads(RULES.read_text(encoding="utf-8"))["rulesets"]
+                if s["id"] in ("inspiration-tags-phase2-2026-06-18", "example-topics-enrich-prune")]
+    parents = {t.get("id"): t.get("topics") or [] for t in templates}
+    hits = Counter()
+    for rec in recs:
+        for rs in rulesets:
+            rs.apply(rec, parents, hits)
+    return path, len(recs), [a.get("id") for a, b in zip(old, recs) if a != b]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply scripts/configs/tag_remap_rules.json to the catalogs")
+    ap.add_argument("--rules", type=Path, default=RULES)
+    ap.add_argument("--only", nargs="+", metavar="ID", help="ruleset ids to apply (default: all)")
+    ap.add_argument("--dry-run", action="store_true", help="report, write nothing")
+    ap.add_argument("--unused", action="store_true", help="list every rule that never fired")
+    ap.add_argument("--audit", type=int, default=20, help="show this many off-taxonomy values per field")
+    ap.add_argument("--parity", action="store_true",
+                    help="check the ported rulesets against the scripts they replace, write nothing")
+    a = ap.parse_args()
+
+    if a.parity:
+        path, n, diff = parity()
+        print(f"  parity on {Path(path).relative_to(ROOT)} + regression records: {n:,} records, {len(diff)} differ")
+        for rid in diff[:20]:
+            print(f"    {rid}")
+        raise SystemExit(1 if diff else 0)
+
+    rulesets = load_rules(a.rules, a.only)
+    result, hits = run(rulesets)
+
+    for name, (_, records, changed) in result.items():
+        print(f"  {name}: {changed:,} / {len(records):,} records changed")
+    for rs in rulesets:
+        h = hits[rs.id]
+        labels = rs.labels()
+        print(f"\n{rs.id} → {'/'.join(sorted(rs.catalogs))}.{rs.field}: "
+              f"{sum(h.values()):,} hits, {sum(1 for l in labels if not h[l])}/{len(labels)} rules unused")
+        for label, n in h.most_common():
+            print(f"  {n:>6,}  {label}")
+        for label in rs.shadowed:
+            print(f"  {'':>6}  {label}  (shadowed by a later op on the same value)")
+        if a.unused:
+            for label in labels:
+                if not h[label]:
+                    print(f"  {'-':>6}  {label}")
+
+    idx = taxonomy_index.load()
+    for field, cat in sorted({(rs.field, c) for rs in rulesets for c in rs.catalogs}):
+        if cat not in result:
+            continue
+        off = Counter(v for rec in result[cat][1] for v in rec.get(field) or []
+                      if isinstance(v, str) and idx.canonical(v) is None)
+        if off and a.audit:
+            print(f"\n{cat}.{field}: {len(off)} off-taxonomy values ({sum(off.values()):,} uses)")
+            for v, n in off.most_common(a.audit):
+                print(f"  {n:>6,}  {v}")
+
+    if a.dry_run:
+        return
+    for name, (data, _, changed) in result.items():
+        if changed:
+            CATALOGS[name].write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+            print(f"  wrote {CATALOGS[name].relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
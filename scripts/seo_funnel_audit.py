@@ -1,229 +1,321 @@
 """SEO funnel audit: sitemap → GSC impressions → top-20 → clicks
-+ bot-pattern subtraction + breakdown by route family."""
++ bot-pattern subtraction + breakdown by route family.
+
+Streaming: each input is read once, in chunks of --chunk rows, and every funnel
+bucket, route-family, locale and bot-pattern metric is accumulated in that one
+pass (bot labels come a chunk at a time from gsc_bot_filter.py); the top-N
+lists are bounded heaps. Memory is constant in the number of GSC rows — only
+the sitemap is held, as 8-byte URL hashes for the ∩ / missing counts (so it
+must be fed before the pages export).
+
+Usage:
+    python3 scripts/seo_funnel_audit.py [--sitemap raw/sitemaps/urls.tsv] [--pages Pages-all.csv]
+                                        [--queries Queries-all.csv] [--days 28] [--json out.json]
+
+As a module:
+    from seo_funnel_audit import audit, report
+    res = audit(sitemap=..., pages=..., queries=...)      # plain dict, JSON-serialisable
+"""
+import argparse
 import csv
-import re
+import hashlib
+import heapq
+import json
+import os
 from collections import Counter, defaultdict
 
-SITEMAP = "/tmp/curify_sitemap_audit/all_urls.txt"
-PAGES_CSV = "/Users/qqwjq/curify-frontend/raw/gsc-audit-2026-06-26/Pages-all.csv"
-QUERIES_CSV = "/Users/qqwjq/curify-frontend/raw/gsc-audit-2026-06-26/Queries-all.csv"
-
-# Load sitemap URLs and classify by route family + locale
-def classify(url):
-    path = url.replace("https://www.curify-ai.com", "")
-    m = re.match(r"^/([a-z]{2})/", path)
-    locale = m.group(1) if m else "en"
-    rest = path[3:] if m else path
-    if rest.startswith("/nano-template/"):
-        if "/example/" in rest:
-            return "nano_template_example", locale
-        if "/carousel/" in rest:
-            return "nano_template_carousel", locale
-        return "nano_template_index", locale
-    if rest.startswith("/nano-banana-pro-prompts/"):
-        return "nano_banana_prompt", locale
-    if rest.startswith("/topics/"):
-        return "topic_hub", locale
-    if rest.startswith("/blog/"):
-        return "blog", locale
-    if rest.startswith("/tools/"):
-        return "tool", locale
-    if rest.startswith("/use-cases/"):
-        return "use_case", locale
-    if rest in ("", "/"):
-        return "home", locale
-    return "other", locale
-
-
-sitemap_urls = set()
-sitemap_buckets = Counter()
-sitemap_by_locale = Counter()
-with open(SITEMAP) as f:
-    for line in f:
-        url = line.strip()
-        if not url:
-            continue
-        sitemap_urls.add(url)
-        bucket, locale = classify(url)
-        sitemap_buckets[bucket] += 1
-        sitemap_by_locale[locale] += 1
-
-print(f"=== SITEMAP ===")
-print(f"  total sitemap URLs: {len(sitemap_urls):,}")
-print(f"  by route family:")
-for k, n in sitemap_buckets.most_common():
-    print(f"    {n:>8,}  {k}")
-print()
-
-# Load GSC pages
-gsc_pages = []
-with open(PAGES_CSV) as f:
-    r = csv.DictReader(f)
-    for row in r:
-        gsc_pages.append({
-            "page": row["Page"],
-            "clicks": int(row["Clicks"]),
-            "impressions": int(row["Impressions"]),
-            "position": float(row["Position"]),
-        })
-
-total_clicks = sum(p["clicks"] for p in gsc_pages)
-total_impr = sum(p["impressions"] for p in gsc_pages)
-print(f"=== GSC PAGES (28d: 2026-05-26 → 2026-06-23) ===")
-print(f"  pages with impressions:    {len(gsc_pages):,}")
-print(f"  total clicks:              {total_clicks:,}    ({total_clicks/28:.0f}/day)")
-print(f"  total impressions:         {total_impr:,}    ({total_impr/28:.0f}/day)")
-print(f"  blended CTR:               {100*total_clicks/total_impr:.2f}%")
-print()
-
-# Funnel: sitemap → in-GSC → top-20-pos → top-10-pos → got-clicks
-gsc_pages_set = set(p["page"] for p in gsc_pages)
-in_gsc = len(gsc_pages_set & sitemap_urls)
-not_in_gsc = len(sitemap_urls - gsc_pages_set)
-gsc_pages_not_in_sitemap = len(gsc_pages_set - sitemap_urls)
-
-top20 = [p for p in gsc_pages if p["position"] <= 20]
-top10 = [p for p in gsc_pages if p["position"] <= 10]
-top3 = [p for p in gsc_pages if p["position"] <= 3]
-clicked = [p for p in gsc_pages if p["clicks"] > 0]
-clicked_5plus = [p for p in gsc_pages if p["clicks"] >= 5]
-
-print(f"=== FUNNEL ===")
-print(f"  sitemap URLs:                {len(sitemap_urls):>8,}      100%")
-print(f"  sitemap ∩ GSC (any impr):    {in_gsc:>8,}       {100*in_gsc/len(sitemap_urls):>5.1f}%")
-print(f"  any GSC impr (incl non-sm):  {len(gsc_pages):>8,}")
-print(f"  avg position ≤ 20:           {len(top20):>8,}       {100*len(top20)/len(sitemap_urls):>5.1f}%  of sitemap")
-print(f"  avg position ≤ 10:           {len(top10):>8,}       {100*len(top10)/len(sitemap_urls):>5.1f}%  of sitemap")
-print(f"  avg position ≤ 3:            {len(top3):>8,}       {100*len(top3)/len(sitemap_urls):>5.1f}%  of sitemap")
-print(f"  got ≥1 click:                {len(clicked):>8,}       {100*len(clicked)/len(sitemap_urls):>5.1f}%  of sitemap")
-print(f"  got ≥5 clicks (28d):         {len(clicked_5plus):>8,}       {100*len(clicked_5plus)/len(sitemap_urls):>5.1f}%  of sitemap")
-print(f"  sitemap URLs MISSING from GSC: {not_in_gsc:>6,}    ({100*not_in_gsc/len(sitemap_urls):.1f}%)")
-print(f"  GSC pages NOT in sitemap:    {gsc_pages_not_in_sitemap:>8,}")
-print()
-
-# Group by route family — where are clicks concentrated?
-def route_of(url):
-    bucket, _ = classify(url) if url.startswith("https://www.curify-ai.com") else (("external", "en") if "://" in url else (classify(url) if url.startswith("/") else ("external", "en")))
-    return bucket
-
-family_stats = defaultdict(lambda: {"pages": 0, "clicks": 0, "impr": 0, "pos_sum": 0, "ranking_pages": 0})
-for p in gsc_pages:
-    if p["page"].startswith("https://www.curify-ai.com"):
-        bucket, _ = classify(p["page"])
+from gsc_bot_filter import is_bot_pattern, label as bot_labels   # noqa: F401 — is_bot_pattern re-exported
+from site_routes import SITE, classify
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITEMAP = os.path.join(ROOT, "raw", "sitemaps", "urls.tsv")        # build_sitemaps.py
+PAGES_CSV = os.path.join(ROOT, "raw", "gsc-audit-2026-06-26", "Pages-all.csv")
+QUERIES_CSV = os.path.join(ROOT, "raw", "gsc-audit-2026-06-26", "Queries-all.csv")
+CHUNK = 50_000
+# GSC UI exports say "Top pages"/"Top queries"; the API pull (audit_gsc_full.cjs) says Page/Query
+KEY_COLUMNS = ("Page", "Top pages", "Query", "Top queries")
+
+
+def url_key(url):
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
+
+
+def read_chunks(path, chunk=CHUNK):
+    """Yield lists of (key, clicks, impressions, position), `chunk` rows at a time."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        r = csv.reader(f)
+        header = next(r)
+        try:
+            k = next(i for i, h in enumerate(header) if h in KEY_COLUMNS)
+            c, n, p = (header.index(h) for h in ("Clicks", "Impressions", "Position"))
+        except (StopIteration, ValueError):
+            raise SystemExit(f"{path}: unexpected header {header}")
+        buf = []
+        for row in r:
+            if row:
+                buf.append((row[k], int(row[c]), int(row[n]), float(row[p])))
+                if len(buf) >= chunk:
+                    yield buf
+                    buf = []
+        if buf:
+            yield buf
+
+
+def period_of(path):
+    """The export's date range from the Filters.csv next to it, if there is one."""
+    f = os.path.join(os.path.dirname(path), "Filters.csv")
+    if os.path.exists(f):
+        for row in csv.reader(open(f, encoding="utf-8-sig")):
+            if row and row[0] == "Date":
+                return row[1]
+    return None
+
+
+class TopN:
+    """The n largest items by score; ties keep input order (like a stable sort)."""
+
+    def __init__(self, n):
+        self.n, self.heap, self.seq = n, [], 0
+
+    def add(self, score, item):
+        self.seq += 1
+        entry = (score, -self.seq, item)
+        if len(self.heap) < self.n:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self):
+        return [e[2] for e in sorted(self.heap, reverse=True)]
+
+
+class FunnelAudit:
+    """Single-pass accumulator; feed add_sitemap, then add_pages / add_queries chunks."""
+
+    def __init__(self, top_pages=25, top_queries=15, bot_cache=False):
+        self.bot_cache = bot_cache
+        self.sitemap = set()
+        self.sitemap_families = Counter()
+        self.sitemap_locales = Counter()
+        self.pages = Counter()
+        self.families = defaultdict(lambda: {"pages": 0, "clicks": 0, "impr": 0, "pos_sum": 0.0, "ranking_pages": 0})
+        self.locales = defaultdict(lambda: {"clicks": 0, "pages": 0})
+        self.top_pages = TopN(top_pages)
+        self.queries = Counter()
+        self.top_clicked = TopN(top_queries)
+        self.low_ctr = TopN(top_queries)
+
+    def add_sitemap(self, urls):
+        for url in urls:
+            url = url.split("\t", 1)[0].strip()             # urls.tsv: URL<TAB>lastmod
+            if not url:
+                continue
+            k = url_key(url)
+            if k in self.sitemap:
+                continue
+            self.sitemap.add(k)
+            bucket, locale = classify(url)
+            self.sitemap_families[bucket] += 1
+            self.sitemap_locales[locale] += 1
+
+    def add_pages(self, rows):
+        s, sm = self.pages, self.sitemap
+        for page, clicks, impr, pos in rows:
+            s["rows"] += 1
+            s["clicks"] += clicks
+            s["impressions"] += impr
+            s["in_sitemap"] += url_key(page) in sm
+            s["top20"] += pos <= 20
+            s["top10"] += pos <= 10
+            s["top3"] += pos <= 3
+            s["clicked"] += clicks > 0
+            s["clicked_5plus"] += clicks >= 5
+            bucket, locale = classify(page)
+            fs = self.families[bucket]
+            fs["pages"] += 1
+            fs["clicks"] += clicks
+            fs["impr"] += impr
+            fs["pos_sum"] += pos
+            fs["ranking_pages"] += pos <= 20
+            if locale:
+                self.locales[locale]["clicks"] += clicks
+                self.locales[locale]["pages"] += 1
+            self.top_pages.add(clicks, {"page": page, "clicks": clicks, "impressions": impr, "position": pos})
+
+    def add_queries(self, rows):
+        s = self.queries
+        flags = bot_labels([r[0] for r in rows], cache=self.bot_cache).tolist()
+        for (query, clicks, impr, pos), bot in zip(rows, flags):
+            s["rows"] += 1
+            s["clicks"] += clicks
+            s["impressions"] += impr
+            if bot and clicks == 0:
+                s["bot_queries"] += 1
+                s["bot_impressions"] += impr
+            row = {"query": query, "clicks": clicks, "impressions": impr, "position": pos}
+            self.top_clicked.add(clicks, row)
+            if impr >= 500 and clicks <= 1:
+                self.low_ctr.add(impr, {**row, "bot": bot})
+
+    def result(self):
+        fams = {b: {**fs, "sitemap": self.sitemap_families.get(b, 0)}
+                for b, fs in sorted(self.families.items(), key=lambda x: -x[1]["clicks"])}
+        pages = dict(self.pages)
+        if self.sitemap:
+            pages["not_in_sitemap"] = pages.get("rows", 0) - pages.get("in_sitemap", 0)
+        return {
+            "sitemap": {"urls": len(self.sitemap),
+                        "families": dict(self.sitemap_families.most_common()),
+                        "locales": dict(self.sitemap_locales.most_common())} if self.sitemap else None,
+            "pages": {**pages, "families": fams,
+                      "locales": dict(sorted(self.locales.items(), key=lambda x: -x[1]["clicks"])),
+                      "top": self.top_pages.items(), "top_n": self.top_pages.n} if self.pages else None,
+            "queries": {**self.queries, "top_clicked": self.top_clicked.items(),
+                        "high_impr_low_ctr": self.low_ctr.items(), "top_n": self.top_clicked.n} if self.queries else None,
+        }
+
+
+def audit(sitemap=SITEMAP, pages=PAGES_CSV, queries=QUERIES_CSV, chunk=CHUNK, top_pages=25, top_queries=15,
+          bot_cache=False):
+    """Run the whole audit; a missing/None input just leaves its sections out."""
+    fa = FunnelAudit(top_pages, top_queries, bot_cache)
+    if sitemap and os.path.exists(sitemap):
+        with open(sitemap, encoding="utf-8") as f:
+            fa.add_sitemap(f)
+    for path, add in ((pages, fa.add_pages), (queries, fa.add_queries)):
+        if path and os.path.exists(path):
+            for rows in read_chunks(path, chunk):
+                add(rows)
+    res = fa.result()
+    res["period"] = period_of(pages) if pages else None
+    return res
+
+
+def _pct(n, d):
+    return 100 * n / d if d else 0.0
+
+
+def report(res, days=28, period=None):
+    sm, pg, qs = res["sitemap"], res["pages"], res["queries"]
+    n_sm = sm["urls"] if sm else 0
+    if sm:
+        print(f"=== SITEMAP ===")
+        print(f"  total sitemap URLs: {n_sm:,}")
+        print(f"  by route family:")
+        for k, n in sm["families"].items():
+            print(f"    {n:>8,}  {k}")
+        print()
     else:
-        bucket = "external"
-    fs = family_stats[bucket]
-    fs["pages"] += 1
-    fs["clicks"] += p["clicks"]
-    fs["impr"] += p["impressions"]
-    fs["pos_sum"] += p["position"]
-    if p["position"] <= 20:
-        fs["ranking_pages"] += 1
-
-print(f"=== CLICKS + IMPRESSIONS BY ROUTE FAMILY ===")
-rows = []
-for bucket, fs in sorted(family_stats.items(), key=lambda x: -x[1]["clicks"]):
-    sitemap_n = sitemap_buckets.get(bucket, 0) or 1
-    ctr = 100 * fs["clicks"] / max(fs["impr"], 1)
-    avg_pos = fs["pos_sum"] / max(fs["pages"], 1)
-    coverage = 100 * fs["pages"] / sitemap_n if sitemap_n else 0
-    rows.append((bucket, sitemap_n, fs["pages"], coverage, fs["ranking_pages"], fs["clicks"], fs["impr"], ctr, avg_pos))
-
-print(f"  {'family':<26} {'sitemap':>8} {'inGSC':>7} {'cov%':>6} {'top20':>6} {'clicks':>7} {'impr':>9} {'CTR%':>6} {'avgPos':>7}")
-for r in rows:
-    print(f"  {r[0]:<26} {r[1]:>8,} {r[2]:>7,} {r[3]:>5.1f}% {r[4]:>6,} {r[5]:>7,} {r[6]:>9,} {r[7]:>5.2f}% {r[8]:>6.1f}")
-print()
-
-# Now: bot-pattern subtraction on queries
-def is_bot_pattern(q):
-    """5+ words AND 3+ country names AND time marker AND 0 clicks → AI bot source-gathering."""
-    countries = ["argentina","brazil","france","portugal","spain","italy","germany","england","mexico","colombia",
-                 "japan","korea","china","india","usa","america","canada","netherlands","belgium","croatia","morocco",
-                 "uruguay","ecuador","peru","chile","poland","denmark","sweden","switzerland","austria","cameroon",
-                 "senegal","ghana","nigeria","egypt","tunisia","algeria","ivory","saudi","iran","qatar","panama"]
-    time_markers = ["2026","2027","world cup","wc 2026","tournament","group stage","predictions","contenders","favorites","comparison"," vs ","versus","top 10","top 5","best of"]
-    words = q.lower().split()
-    if len(words) < 5:
-        return False
-    country_hits = sum(1 for c in countries if c in q.lower())
-    if country_hits < 3:
-        return False
-    if not any(t in q.lower() for t in time_markers):
-        return False
-    return True
-
-queries_data = []
-with open(QUERIES_CSV) as f:
-    r = csv.DictReader(f)
-    for row in r:
-        queries_data.append({
-            "query": row["Query"],
-            "clicks": int(row["Clicks"]),
-            "impressions": int(row["Impressions"]),
-            "position": float(row["Position"]),
-        })
-
-total_q_impr = sum(q["impressions"] for q in queries_data)
-total_q_clicks = sum(q["clicks"] for q in queries_data)
-bot_queries = [q for q in queries_data if is_bot_pattern(q["query"]) and q["clicks"] == 0]
-bot_impr = sum(q["impressions"] for q in bot_queries)
-
-print(f"=== BOT-PATTERN IMPRESSION SUBTRACTION (per feedback_gsc_bot_pattern_exclusion.md) ===")
-print(f"  total queries:               {len(queries_data):,}")
-print(f"  total impressions:           {total_q_impr:,}")
-print(f"  total clicks:                {total_q_clicks:,}")
-print(f"  bot-pattern queries flagged: {len(bot_queries):,}  (5+ words, 3+ countries, time marker, 0 clicks)")
-print(f"  bot-pattern impressions:     {bot_impr:,}  ({100*bot_impr/total_q_impr:.1f}% of total)")
-print(f"  REAL human impressions ≈    {total_q_impr - bot_impr:,}")
-print(f"  REAL blended CTR ≈          {100*total_q_clicks/(total_q_impr - bot_impr):.2f}%")
-print()
-
-# Top clicked queries
-top_clicked = sorted(queries_data, key=lambda x: -x["clicks"])[:15]
-print(f"=== TOP 15 CLICKED QUERIES ===")
-print(f"  {'clicks':>6} {'impr':>7} {'pos':>5}  query")
-for q in top_clicked:
-    print(f"  {q['clicks']:>6,} {q['impressions']:>7,} {q['position']:>5.1f}  {q['query'][:60]}")
-print()
-
-# Top impression queries that don't convert
-high_impr_low_ctr = sorted(
-    [q for q in queries_data if q["impressions"] >= 500 and q["clicks"] <= 1],
-    key=lambda x: -x["impressions"]
-)[:15]
-print(f"=== TOP 15 HIGH-IMPR / ≤1-CLICK QUERIES (CTR opportunity, after bot subtraction) ===")
-print(f"  {'impr':>7} {'clicks':>6} {'pos':>5}  query")
-for q in high_impr_low_ctr:
-    botted = "BOT?" if is_bot_pattern(q["query"]) else "    "
-    print(f"  {q['impressions']:>7,} {q['clicks']:>6,} {q['position']:>5.1f}  {botted} {q['query'][:60]}")
-print()
-
-# Top 25 pages by clicks (where is the click revenue actually concentrated?)
-top_pages = sorted(gsc_pages, key=lambda x: -x["clicks"])[:25]
-print(f"=== TOP 25 PAGES BY CLICKS ===")
-print(f"  {'clicks':>6} {'impr':>7} {'CTR':>6} {'pos':>5}  page")
-cumul = 0
-for p in top_pages:
-    cumul += p["clicks"]
-    ctr = 100 * p["clicks"] / max(p["impressions"], 1)
-    short = p["page"].replace("https://www.curify-ai.com", "")[:75]
-    print(f"  {p['clicks']:>6,} {p['impressions']:>7,} {ctr:>5.1f}% {p['position']:>5.1f}  {short}")
-print(f"  Top 25 pages = {cumul:,} clicks = {100*cumul/total_clicks:.1f}% of all clicks")
-print()
-
-# Locale split of clicks
-locale_clicks = Counter()
-locale_pages = Counter()
-for p in gsc_pages:
-    if not p["page"].startswith("https://www.curify-ai.com"):
-        continue
-    pathp = p["page"].replace("https://www.curify-ai.com", "")
-    m = re.match(r"^/([a-z]{2})/", pathp)
-    locale = m.group(1) if m else "en"
-    locale_clicks[locale] += p["clicks"]
-    locale_pages[locale] += 1
-
-print(f"=== LOCALE SPLIT ===")
-print(f"  {'locale':<6} {'clicks':>8} {'pages':>7}")
-for loc, n in locale_clicks.most_common():
-    print(f"  {loc:<6} {n:>8,} {locale_pages[loc]:>7,}")
+        print("(no sitemap — funnel percentages and coverage skipped)\n")
+
+    if pg:
+        total_clicks, total_impr = pg["clicks"], pg["impressions"]
+        period = period or res.get("period")
+        print(f"=== GSC PAGES ({days}d{': ' + period if period else ''}) ===")
+        print(f"  pages with impressions:    {pg['rows']:,}")
+        print(f"  total clicks:              {total_clicks:,}    ({total_clicks/days:.0f}/day)")
+        print(f"  total impressions:         {total_impr:,}    ({total_impr/days:.0f}/day)")
+        print(f"  blended CTR:               {_pct(total_clicks, total_impr):.2f}%")
+        print()
+
+        # Funnel: sitemap → in-GSC → top-20-pos → top-10-pos → got-clicks
+        if sm:
+            in_gsc, missing = pg["in_sitemap"], n_sm - pg["in_sitemap"]
+            print(f"=== FUNNEL ===")
+            print(f"  sitemap URLs:                {n_sm:>8,}      100%")
+            print(f"  sitemap ∩ GSC (any impr):    {in_gsc:>8,}       {_pct(in_gsc, n_sm):>5.1f}%")
+            print(f"  any GSC impr (incl non-sm):  {pg['rows']:>8,}")
+            for key, label in (("top20", "avg position ≤ 20:  "), ("top10", "avg position ≤ 10:  "),
+                               ("top3", "avg position ≤ 3:   "), ("clicked", "got ≥1 click:       "),
+                               ("clicked_5plus", f"got ≥5 clicks ({days}d):")):
+                print(f"  {label:<29}{pg[key]:>8,}       {_pct(pg[key], n_sm):>5.1f}%  of sitemap")
+            print(f"  sitemap URLs MISSING from GSC: {missing:>6,}    ({_pct(missing, n_sm):.1f}%)")
+            print(f"  GSC pages NOT in sitemap:    {pg['not_in_sitemap']:>8,}")
+            print()
+
+        # Group by route family — where are clicks concentrated?
+        print(f"=== CLICKS + IMPRESSIONS BY ROUTE FAMILY ===")
+        cov_head = f" {'sitemap':>8} {'inGSC':>7} {'cov%':>6}" if sm else f" {'inGSC':>7}"
+        print(f"  {'family':<26}{cov_head} {'top20':>6} {'clicks':>7} {'impr':>9} {'CTR%':>6} {'avgPos':>7}")
+        for bucket, fs in pg["families"].items():
+            if not sm:
+                cov = f" {fs['pages']:>7,}"
+            elif fs["sitemap"]:
+                cov = f" {fs['sitemap']:>8,} {fs['pages']:>7,} {_pct(fs['pages'], fs['sitemap']):>5.1f}%"
+            else:                                          # family absent from the sitemap
+                cov = f" {'-':>8} {fs['pages']:>7,} {'-':>6}"
+            print(f"  {bucket:<26}{cov} "
+                  f"{fs['ranking_pages']:>6,} {fs['clicks']:>7,} {fs['impr']:>9,} "
+                  f"{100 * fs['clicks'] / max(fs['impr'], 1):>5.2f}% {fs['pos_sum'] / max(fs['pages'], 1):>6.1f}")
+        print()
+
+    if qs:
+        total_q_impr, total_q_clicks, bot_impr = qs["impressions"], qs["clicks"], qs.get("bot_impressions", 0)
+        print(f"=== BOT-PATTERN IMPRESSION SUBTRACTION (per feedback_gsc_bot_pattern_exclusion.md) ===")
+        print(f"  total queries:               {qs['rows']:,}")
+        print(f"  total impressions:           {total_q_impr:,}")
+        print(f"  total clicks:                {total_q_clicks:,}")
+        print(f"  bot-pattern queries flagged: {qs.get('bot_queries', 0):,}  (5+ words, 3+ countries, time marker, 0 clicks)")
+        print(f"  bot-pattern impressions:     {bot_impr:,}  ({_pct(bot_impr, total_q_impr):.1f}% of total)")
+        print(f"  REAL human impressions ≈    {total_q_impr - bot_impr:,}")
+        print(f"  REAL blended CTR ≈          {_pct(total_q_clicks, total_q_impr - bot_impr):.2f}%")
+        print()
+
+        print(f"=== TOP {qs['top_n']} CLICKED QUERIES ===")
+        print(f"  {'clicks':>6} {'impr':>7} {'pos':>5}  query")
+        for q in qs["top_clicked"]:
+            print(f"  {q['clicks']:>6,} {q['impressions']:>7,} {q['position']:>5.1f}  {q['query'][:60]}")
+        print()
+
+        # Top impression queries that don't convert
+        print(f"=== TOP {qs['top_n']} HIGH-IMPR / ≤1-CLICK QUERIES (CTR opportunity, after bot subtraction) ===")
+        print(f"  {'impr':>7} {'clicks':>6} {'pos':>5}  query")
+        for q in qs["high_impr_low_ctr"]:
+            botted = "BOT?" if q["bot"] else "    "
+            print(f"  {q['impressions']:>7,} {q['clicks']:>6,} {q['position']:>5.1f}  {botted} {q['query'][:60]}")
+        print()
+
+    if pg:
+        # Top pages by clicks (where is the click revenue actually concentrated?)
+        print(f"=== TOP {pg['top_n']} PAGES BY CLICKS ===")
+        print(f"  {'clicks':>6} {'impr':>7} {'CTR':>6} {'pos':>5}  page")
+        cumul = 0
+        for p in pg["top"]:
+            cumul += p["clicks"]
+            ctr = 100 * p["clicks"] / max(p["impressions"], 1)
+            short = p["page"].replace(SITE, "")[:75]
+            print(f"  {p['clicks']:>6,} {p['impressions']:>7,} {ctr:>5.1f}% {p['position']:>5.1f}  {short}")
+        print(f"  Top {pg['top_n']} pages = {cumul:,} clicks = {_pct(cumul, pg['clicks']):.1f}% of all clicks")
+        print()
+
+        print(f"=== LOCALE SPLIT ===")
+        print(f"  {'locale':<6} {'clicks':>8} {'pages':>7}")
+        for loc, v in pg["locales"].items():
+            print(f"  {loc:<6} {v['clicks']:>8,} {v['pages']:>7,}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sitemap → GSC funnel audit (streaming, one pass per file)")
+    ap.add_argument("--sitemap", default=SITEMAP, help="one URL per line (build_sitemaps.py urls.tsv, or any plain dump)")
+    ap.add_argument("--pages", default=PAGES_CSV, help="GSC pages export (Page/Top pages, Clicks, Impressions, Position)")
+    ap.add_argument("--queries", default=QUERIES_CSV, help="GSC queries export")
+    ap.add_argument("--days", type=int, default=28, help="length of the export window, for the per-day figures")
+    ap.add_argument("--period", help="label for the export window (default: Filters.csv next to --pages)")
+    ap.add_argument("--chunk", type=int, default=CHUNK, help="rows per read chunk")
+    ap.add_argument("--top-pages", type=int, default=25)
+    ap.add_argument("--top-queries", type=int, default=15)
+    ap.add_argument("--bot-cache", action="store_true", help="reuse bot-pattern labels across runs (gsc_bot_filter.py)")
+    ap.add_argument("--json", help="also write the result dict here")
+    a = ap.parse_args()
+
+    res = audit(a.sitemap, a.pages, a.queries, a.chunk, a.top_pages, a.top_queries, a.bot_cache)
+    report(res, a.days, a.period)
+    if a.json:
+        os.makedirs(os.path.dirname(os.path.abspath(a.json)), exist_ok=True)
+        with open(a.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False, indent=1)
+        print(f"\nresult → {a.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Route table for curify-ai.com URLs — the one classifier for the Python SEO audits.
+
+Maps a URL (or path) to its (route family, locale). The families and the
+locale prefixes are compiled into a trie over path segments, and the trie into
+one anchored regex, so a URL is classified in a single C-level walk:
+
+    [locale/] nano-template/<slug>/example/…      nano_template_example
+    [locale/] nano-template/<slug>/carousel/…     nano_template_carousel
+    [locale/] nano-template/…                     nano_template_index
+    [locale/] nano-banana-pro-prompts/…           nano_banana_prompt
+    [locale/] topics/…                            topic_hub
+    [locale/] blog/…                              blog
+    [locale/] tools/…                             tool
+    [locale/] use-cases/…                         use_case
+    [locale]                                      home
+    anything else on the site                     other
+    another host                                  external
+
+Locales come from i18n/routing.ts (localePrefix "as-needed": en has no prefix).
+A route written "x/" covers x/ and everything below it, but not a bare /x —
+the same rule as the old startswith("/x/") chain in seo_funnel_audit.py.
+
+    from site_routes import classify, classify_many
+    classify("https://www.curify-ai.com/zh/blog/foo")     # ("blog", "zh")
+    families, locales = classify_many(urls)
+
+CLI — family / locale counts for a URL list (one per line, e.g. a sitemap dump):
+    python3 scripts/site_routes.py all_urls.txt [--by-locale]
+"""
+import argparse, re
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SITE = "https://www.curify-ai.com"
+DEFAULT_LOCALE = "en"
+
+ROUTES = [
+    ("nano-template/*/example/", "nano_template_example"),
+    ("nano-template/*/carousel/", "nano_template_carousel"),
+    ("nano-template/", "nano_template_index"),
+    ("nano-banana-pro-prompts/", "nano_banana_prompt"),
+    ("topics/", "topic_hub"),
+    ("blog/", "blog"),
+    ("tools/", "tool"),
+    ("use-cases/", "use_case"),
+]
+
+
+def _locales():
+    src = (ROOT / "i18n" / "routing.ts").read_text(encoding="utf-8")
+    block = re.search(r"locales:\s*\[(.*?)\]", src, re.S).group(1)
+    return re.findall(r"['\"]([a-z]{2}(?:-[A-Za-z]+)?)['\"]", block)
+
+
+LOCALES = _locales()
+
+
+def _compile(routes):
+    """{segment | "*": node, "": family}; a family on a node applies to every
+    path that goes at least one segment past it."""
+    trie = {}
+    for pattern, family in routes:
+        node = trie
+        for seg in pattern.rstrip("/").split("/"):
+            node = node.setdefault(seg, {})
+        node[""] = family
+    return trie
+
+
+def _pattern(trie, families):
+    """The trie as one anchored regex: a branch per segment, an empty named group
+    (f0, f1, …) where a family applies — `lastgroup` then names the deepest hit."""
+    alts = []
+    for seg, child in trie.items():
+        if not seg:
+            continue
+        sub = [_pattern(child, families)] if any(child.keys() - {""}) else []
+        if "" in child:
+            families.append(child[""])
+            sub.append(f"(?P<f{len(families) - 1}>)")
+        alts.append(("[^/]+" if seg == "*" else re.escape(seg)) + "/(?:" + "|".join(sub) + ")")
+    alts.sort(key=lambda a: a.startswith("[^/]"))                  # literal segments before wildcards
+    return "|".join(alts)
+
+
+TRIE = _compile(ROUTES)
+_FAMILIES = []
+_ROUTE_RE = re.compile(r"/?(?:(?P<locale>{})(?:/|$))?(?:(?P<home>$)|{})?".format(
+    "|".join(sorted(map(re.escape, LOCALES), key=len, reverse=True)),   # /en/… resolves too
+    _pattern(TRIE, _FAMILIES)))
+
+
+def classify(url):
+    """(family, locale); ("external", None) for URLs on another host."""
+    if url.startswith(SITE):
+        path = url[len(SITE):]
+    elif "://" in url:
+        return "external", None
+    else:
+        path = url
+    if "?" in path or "#" in path:
+        path = path.split("?", 1)[0].split("#", 1)[0]
+    m = _ROUTE_RE.match(path)
+    g = m.lastgroup
+    locale = m.group("locale") or DEFAULT_LOCALE
+    if g == "home":
+        return "home", locale
+    return (_FAMILIES[int(g[1:])] if g and g[0] == "f" else "other"), locale
+
+
+def classify_many(urls):
+    """([family], [locale]) for a batch; repeated URLs are classified once."""
+    memo = {}
+    out = [memo[u] if u in memo else memo.setdefault(u, classify(u)) for u in urls]
+    return [f for f, _ in out], [l for _, l in out]
+
+
+def family(url):
+    return classify(url)[0]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Route family / locale counts for a URL list")
+    ap.add_argument("urls", type=Path, help="one URL per line")
+    ap.add_argument("--by-locale", action="store_true", help="family × locale table")
+    a = ap.parse_args()
+
+    urls = [l.strip() for l in a.urls.read_text(encoding="utf-8").splitlines() if l.strip()]
+    fams, locs = classify_many(urls)
+    print(f"{len(urls):,} URLs")
+    if a.by_locale:
+        cells = Counter(zip(fams, locs))
+        cols = [l for l in LOCALES if any(c[1] == l for c in cells)]
+        print(f"  {'family':<24}" + "".join(f"{l:>8}" for l in cols))
+        for fam, _ in Counter(fams).most_common():
+            print(f"  {fam:<24}" + "".join(f"{cells.get((fam, l), 0):>8,}" for l in cols))
+    else:
+        for fam, n in Counter(fams).most_common():
+            print(f"  {n:>8,}  {fam}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,8 @@ import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import taxonomy_index
+
 try:
     from openai import OpenAI
 except ImportError:
@@ -99,7 +101,7 @@ Template:
 Which output types from the vocabulary does this template's output match?"""
 
 
-def classify_one(client, tpl: dict):
+def classify_one(client, tpl: dict, idx):
     try:
         res = client.chat.completions.create(
             model=MODEL,
@@ -119,7 +121,7 @@ def classify_one(client, tpl: dict):
         for s in proposed:
             if not isinstance(s, str):
                 continue
-            slug = s.strip().lower()
+            slug = idx.canonical(s) or s.strip().lower()
             if slug in ALLOWED_SET:
                 kept.append(slug)
             else:
@@ -149,6 +151,10 @@ def main() -> None:
     elif args.limit:
         targets = targets[: args.limit]
 
+    idx = taxonomy_index.load()
+    missing = [s for s in ALLOWED_SLUGS if s not in idx.slugs]
+    if missing:
+        print(f"WARN: not in taxonomy.json (re-run extend_taxonomy_output_types first): {missing}", file=sys.stderr)
     print(f"Vocab size: {len(ALLOWED_SLUGS)} output-type slugs")
     print(f"Processing {len(targets)} templates (concurrency={args.concurrency}, dry_run={args.dry_run})\n")
 
@@ -156,7 +162,7 @@ def main() -> None:
     results = {}
     drops = {}
     with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
-        futs = {pool.submit(classify_one, client, t): t["id"] for t in targets}
+        futs = {pool.submit(classify_one, client, t, idx): t["id"] for t in targets}
         done = 0
         for fut in as_completed(futs):
             tid, kept, dropped = fut.result()
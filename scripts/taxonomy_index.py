@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Compiled lib/taxonomy.json — the tag vocabulary every tagging script validates against.
+
+The taxonomy is a nest of tier lists keyed by parent; the LLM tagging passes all
+used to walk it on startup, slugify every entry and union the results into an
+allow set. This module does that walk once and writes the result to
+lib/generated/taxonomy_index.json:
+
+    slugs     slug → [tier, parent, axis, has_i18n]      (first placement wins: T1 → T4, then audience)
+    aliases   lowercased entry or slug → canonical slug ("forest animals" → "forest-animals")
+    allow     record kind → sorted canonical slugs the kind may carry
+    vocab     record kind → the grouped slug lists shown to the LLM
+    sources   sha256 of taxonomy.json and messages/en/topics.json it was built from
+
+axis is "audience", "entity" (T4), a content_styles sub-axis (mood, aesthetic, …)
+for style slugs, "format" under the template format parents, else "subject".
+has_i18n is whether messages/en/topics.json has a topic entry for the slug.
+
+load() returns the index; it rebuilds and rewrites the file only when a source
+hash no longer matches, and within a process a repeat call is a stat() away.
+
+    import taxonomy_index
+    idx = taxonomy_index.load()
+    kept, dropped = idx.validate(["Forest Animals", "kawaii", "made-up"], "inspirations")
+    idx.slugs["forest-animals"]           # Slug(tier=4, parent='animals', axis='entity', has_i18n=False)
+
+CLI:
+    python3 scripts/taxonomy_index.py build          # rewrite lib/generated/taxonomy_index.json
+    python3 scripts/taxonomy_index.py check TAG...   # [--kind templates]
+"""
+import argparse, hashlib, json, os
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+TAX_PATH = ROOT / "lib" / "taxonomy.json"
+I18N_PATH = ROOT / "messages" / "en" / "topics.json"
+INDEX = ROOT / "lib" / "generated" / "taxonomy_index.json"
+INDEX_VERSION = 1
+
+# Templates carry boilerplate (Info-Type + Layout + Style + Audience) only;
+# subject tags live on the inspirations + gallery prompts. Memory:
+# feedback_template_topics_should_be_boilerplate.md
+TEMPLATE_FORMAT_PARENTS_TIER2 = ("design", "product")
+TEMPLATE_FORMAT_PARENTS_TIER3 = ("design", "lifestyle", "product")
+KINDS = ("inspirations", "templates", "gallery")
+
+
+def slugify(s: str) -> str:
+    return s.lower().replace(" ", "-")
+
+
+def _entries(tax, tier):
+    """(parent, raw entry) in file order; `_note` keys and non-list values skipped."""
+    v = tax.get(tier)
+    if isinstance(v, list):
+        return [(None, str(x)) for x in v]
+    return [(k, str(x)) for k, xs in (v or {}).items() if k != "_note" and isinstance(xs, list) for x in xs]
+
+
+def build(tax_path=TAX_PATH, i18n_path=I18N_PATH) -> dict:
+    tax_bytes, i18n_bytes = Path(tax_path).read_bytes(), Path(i18n_path).read_bytes()
+    tax = json.loads(tax_bytes)
+    topics = json.loads(i18n_bytes).get("topics", {})
+    style_axis = {slugify(str(e["value"])): axis
+                  for axis, spec in (tax.get("content_styles") or {}).items() if isinstance(spec, dict)
+                  for e in spec.get("entries", []) if isinstance(e, dict) and "value" in e}
+    format_parents = {"tier2": TEMPLATE_FORMAT_PARENTS_TIER2, "tier3": TEMPLATE_FORMAT_PARENTS_TIER3}
+
+    slugs, aliases = {}, {}
+    for tier, n in (("tier1", 1), ("tier2", 2), ("tier3", 3), ("tier4", 4), ("audience", None)):
+        for parent, raw in _entries(tax, tier):
+            slug = slugify(raw)
+            aliases.setdefault(raw.lower(), slug)
+            aliases.setdefault(slug, slug)
+            if slug in slugs:
+                continue
+            if tier == "audience":
+                axis = "audience"
+            elif tier == "tier4":
+                axis = "entity"
+            elif slug in style_axis:
+                axis = style_axis[slug]
+            elif parent in format_parents.get(tier, ()):
+                axis = "format"
+            else:
+                axis = "subject"
+            slugs[slug] = [n, parent, axis, slug in topics]
+
+    def template_allow():
+        out = set()
+        for tier, parents in format_parents.items():
+            for parent in parents:
+                out.update(slugify(str(x)) for x in tax.get(tier, {}).get(parent, []) or [])
+        out.update(slugify(a) for _, a in _entries(tax, "audience"))
+        return sorted(out)
+
+    full_vocab = {
+        "subject_t1":  [slugify(s) for _, s in _entries(tax, "tier1")],
+        "subject_t2":  sorted({slugify(s) for _, s in _entries(tax, "tier2")}),
+        "subject_t3":  sorted({slugify(s) for _, s in _entries(tax, "tier3")}),
+        "entities_t4": sorted({slugify(s) for _, s in _entries(tax, "tier4")}),
+        "audience":    [slugify(s) for _, s in _entries(tax, "audience")],
+    }
+    tier = lambda t, p: sorted(tax.get(t, {}).get(p, []) or [])
+    template_vocab = {
+        "style_and_output":   tier("tier3", "design"),
+        "mood_and_aesthetic": tier("tier3", "lifestyle"),
+        "product_output":     tier("tier3", "product"),
+        "design_formats_t2":  tier("tier2", "design"),
+        "audience":           full_vocab["audience"],
+    }
+    return {
+        "version": INDEX_VERSION,
+        "sources": {str(Path(tax_path).relative_to(ROOT)): hashlib.sha256(tax_bytes).hexdigest(),
+                    str(Path(i18n_path).relative_to(ROOT)): hashlib.sha256(i18n_bytes).hexdigest()},
+        "slugs": slugs,
+        "aliases": aliases,
+        "allow": {"inspirations": sorted(slugs), "templates": template_allow(), "gallery": sorted(slugs)},
+        "vocab": {"inspirations": full_vocab, "templates": template_vocab, "gallery": full_vocab},
+    }
+
+
+class Slug(NamedTuple):
+    tier: Optional[int]                          # 1-4; None for audience
+    parent: Optional[str]                        # tier key it is listed under; None for T1 / audience
+    axis: str
+    has_i18n: bool
+
+
+class TaxonomyIndex(NamedTuple):
+    slugs: dict[str, Slug]
+    aliases: dict[str, str]
+    allow: dict[str, frozenset]
+    vocab: dict[str, dict[str, list[str]]]
+
+    def canonical(self, tag: str) -> Optional[str]:
+        """The taxonomy slug a free-form tag names, or None."""
+        key = tag.strip().lower()
+        return self.aliases.get(key) or self.aliases.get(slugify(key))
+
+    def validate(self, tags, kind: str) -> tuple[list[str], list[str]]:
+        """(kept canonical slugs, dropped raw tags) for an LLM proposal on a `kind` record."""
+        allow = self.allow[kind]
+        kept, dropped = [], []
+        for t in tags:
+            if not isinstance(t, str):
+                continue
+            slug = self.canonical(t)
+            if slug in allow:
+                kept.append(slug)
+            else:
+                dropped.append(t)
+        return kept, dropped
+
+
+def _sha(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _stamps(data):
+    out = []
+    for rel in data["sources"]:
+        st = os.stat(ROOT / rel)
+        out.append((st.st_mtime_ns, st.st_size))
+    return out
+
+
+def write(data, out=INDEX):
+    try:
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(out).with_name(f"{Path(out).name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(tmp, out)
+    except OSError:
+        pass                                     # a read-only checkout still works, just rebuilt per process
+
+
+_memo = {}
+
+
+def load(out=INDEX, tax_path=TAX_PATH, i18n_path=I18N_PATH) -> TaxonomyIndex:
+    """The index for the current taxonomy — from `out` when its source hashes still
+    match, otherwise rebuilt and rewritten."""
+    key = (Path(out), Path(tax_path), Path(i18n_path))
+    hit = _memo.get(key)
+    if hit and _stamps(hit[0]) == hit[1]:
+        return hit[2]
+    data = None
+    try:
+        data = json.loads(Path(out).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    wanted = {str(Path(p).relative_to(ROOT)) for p in (tax_path, i18n_path)}
+    if (not data or data.get("version") != INDEX_VERSION or set(data["sources"]) != wanted
+            or any(_sha(ROOT / rel) != sha for rel, sha in data["sources"].items())):
+        data = build(tax_path, i18n_path)
+        write(data, out)
+    idx = TaxonomyIndex(
+        slugs={s: Slug(*v) for s, v in data["slugs"].items()},
+        aliases=data["aliases"],
+        allow={k: frozenset(v) for k, v in data["allow"].items()},
+        vocab=data["vocab"],
+    )
+    _memo[key] = (data, _stamps(data), idx)
+    return idx
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compile lib/taxonomy.json into lib/generated/taxonomy_index.json")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="rebuild the index unconditionally")
+    p = sub.add_parser("check", help="validate tags the way the tagging scripts do")
+    p.add_argument("tags", nargs="+")
+    p.add_argument("--kind", choices=KINDS, default="inspirations")
+    a = ap.parse_args()
+
+    if a.cmd == "build":
+        data = build()
+        write(data)
+        axes = {}
+        for _, _, axis, _ in data["slugs"].values():
+            axes[axis] = axes.get(axis, 0) + 1
+        print(f"{len(data['slugs'])} slugs, {len(data['aliases'])} aliases, "
+              f"allow: {', '.join(f'{k}={len(v)}' for k, v in data['allow'].items())} → {INDEX.relative_to(ROOT)}")
+        print("  axes: " + ", ".join(f"{k}={n}" for k, n in sorted(axes.items(), key=lambda x: -x[1])))
+    else:
+        idx = load()
+        for t in a.tags:
+            slug = idx.canonical(t)
+            ok = slug in idx.allow[a.kind]
+            print(f"  {'ok  ' if ok else 'DROP'}  {t!r:<28} → {slug or '-'}" + (f"  {idx.slugs[slug]}" if slug else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,15 +20,32 @@ Usage:
   python scripts/text_overlay_no_prompt_engineering.py <image> --text "..." --subtitle "上传参考图，一键复刻"  # add a second line
   python scripts/text_overlay_no_prompt_engineering.py <image> --text "..." --accent 99,66,204               # custom brand color
 
-Deps: Pillow. CJK font: Hiragino Sans GB (macOS). Output: <out>/<stem>-<style>.jpg (source untouched).
+Batch (a whole campaign in one run, rendered across a process pool):
+  python scripts/text_overlay_no_prompt_engineering.py --manifest covers.json --out out/ [--workers 8]
+  python scripts/text_overlay_no_prompt_engineering.py --dir covers/ --out out/ --style all
+    manifest: JSON list (or .jsonl) of {"image", "text", "subtitle"?, "style"?, "accent"?};
+              relative image paths resolve against the manifest's folder.
+    dir:      every image with a same-stem .txt next to it — line 1 = text, line 2 = subtitle.
+  Each image gets its own contact sheet when more than one style is rendered, plus one
+  <out>/contact-sheet.jpg across the whole batch. Items that would write the same
+  <stem>-overlay-<style>.jpg (one image listed twice with different copy, photo.jpg
+  next to photo.png) get -2, -3, … after the stem, in input order.
+
+Deps: Pillow. CJK font: Hiragino Sans GB (macOS). Output: <out>/<stem>-overlay-<style>.jpg (source untouched).
 """
-import os, sys, argparse
+import os, sys, argparse, json, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+import image_cache
+
 HG = "/System/Library/Fonts/Hiragino Sans GB.ttc"        # CJK-capable, has Latin
 GOLD = (244, 201, 78); WHITE = (255, 255, 255)
 
+@lru_cache(maxsize=None)
 def font(sz):
+    """Cached per size — fit_font() probes ~7 sizes per line and batch runs reuse them."""
     try: return ImageFont.truetype(HG, sz, index=1)      # index 1 = bold weight
     except Exception: return ImageFont.truetype(HG, sz)
 
@@ -44,14 +61,13 @@ def fit_font(d, text, max_w, hi, lo=28):
     return lo
 
 def _grad(w, h, top, bot, alpha_top=None, alpha_bot=None):
-    """Vertical gradient strip. If alphas given, returns RGBA."""
-    rgba = alpha_top is not None
-    col = Image.new("RGBA" if rgba else "RGB", (1, h))
-    for y in range(h):
-        t = y / max(1, h-1)
-        c = tuple(int(top[i]*(1-t)+bot[i]*t) for i in range(3))
-        if rgba: c = c + (int(alpha_top*(1-t)+alpha_bot*t),)
-        col.putpixel((0, y), c)
+    """Vertical gradient strip. If alphas given, returns RGBA.
+    Built from Image.linear_gradient as a blend mask — no per-pixel Python loop."""
+    s = 255 / max(1, h-1)   # affine-sample the 0..255 ramp so row 0 → 0 and row h-1 → 255, as before
+    t = Image.linear_gradient("L").transform((1, h), Image.AFFINE, (1, 0, 0, 0, s, 0.5 - s/2), Image.NEAREST)
+    col = Image.composite(Image.new("RGB", (1, h), tuple(bot)), Image.new("RGB", (1, h), tuple(top)), t)
+    if alpha_top is not None:
+        col.putalpha(t.point(lambda v: int(alpha_top + (alpha_bot - alpha_top) * v / 255)))
     return col.resize((w, h))
 
 def render(base, text, style, accent, subtitle=None):
@@ -128,29 +144,132 @@ def render(base, text, style, accent, subtitle=None):
         raise SystemExit(f"unknown style: {style}")
     return im.convert("RGB")
 
+IMAGE_EXT = (".png", ".jpg", ".jpeg", ".webp")
+ALL_STYLES = ["top", "bottom", "sticker"]
+
+
+def contact_sheet(paths, size, out_path, tw=360):
+    W, H = size; th = int(H*tw/W)
+    cs = Image.new("RGB", (tw*len(paths)+10*(len(paths)+1), th+20), "white")
+    for i, p in enumerate(paths): cs.paste(Image.open(p).resize((tw, th)), (i*(tw+10)+10, 10))
+    cs.save(out_path, quality=92); print("wrote", out_path)
+    return out_path
+
+
+def render_item(job):
+    """One source image → one JPEG per style (+ its own contact sheet if >1 style).
+    Top-level so it can run in a worker process; fonts are cached per worker."""
+    image, text, subtitle, styles, accent, out = (job[k] for k in ("image", "text", "subtitle", "styles", "accent", "out"))
+    base = image_cache.load(image)
+    stem = job.get("name") or os.path.splitext(os.path.basename(image))[0]
+    out = out or os.path.dirname(os.path.abspath(image)); os.makedirs(out, exist_ok=True)
+    paths = []
+    for s in styles:
+        im = render(base, text, s, accent, subtitle)
+        p = os.path.join(out, f"{stem}-overlay-{s}.jpg"); im.save(p, quality=92); paths.append(p); print("wrote", p)
+    sheet = None
+    if len(paths) > 1:
+        sheet = contact_sheet(paths, base.size, os.path.join(out, f"{stem}-overlay-contact.jpg"))
+    return paths, sheet
+
+
+def _styles(style):
+    return ALL_STYLES if style == "all" else [style]
+
+
+def load_jobs(a, accent):
+    """Batch jobs from --manifest (JSON list / JSONL) or --dir (image + same-stem .txt)."""
+    jobs = []
+    if a.manifest:
+        root = os.path.dirname(os.path.abspath(a.manifest))
+        with open(a.manifest, encoding="utf-8") as f:
+            rows = ([json.loads(l) for l in f if l.strip()] if a.manifest.endswith(".jsonl") else json.load(f))
+        for r in rows:
+            jobs.append({"image": os.path.join(root, r["image"]), "text": r["text"],
+                         "subtitle": r.get("subtitle"), "styles": _styles(r.get("style", a.style)),
+                         "accent": tuple(int(x) for x in r["accent"].split(",")) if r.get("accent") else accent,
+                         "out": a.out})
+    else:
+        for name in sorted(os.listdir(a.dir)):
+            stem, ext = os.path.splitext(name)
+            txt = os.path.join(a.dir, stem + ".txt")
+            if ext.lower() not in IMAGE_EXT:
+                continue
+            if not os.path.exists(txt):
+                print(f"  skip {name}: no {stem}.txt"); continue
+            lines = [l.strip() for l in open(txt, encoding="utf-8").read().splitlines() if l.strip()]
+            if not lines:
+                print(f"  skip {name}: empty {stem}.txt"); continue
+            jobs.append({"image": os.path.join(a.dir, name), "text": lines[0],
+                         "subtitle": lines[1] if len(lines) > 1 else a.subtitle,
+                         "styles": _styles(a.style), "accent": accent, "out": a.out})
+    return _disambiguate(jobs)
+
+
+def _disambiguate(jobs):
+    """Give each job a distinct output stem within its output dir, so no render
+    overwrites another's; later duplicates get -2, -3, … ."""
+    taken = {}
+    for j in jobs:
+        out = os.path.abspath(j["out"] or os.path.dirname(os.path.abspath(j["image"])))
+        taken.setdefault(out, set()).add(os.path.splitext(os.path.basename(j["image"]))[0])
+    seen = {}
+    for j in jobs:
+        out = os.path.abspath(j["out"] or os.path.dirname(os.path.abspath(j["image"])))
+        stem = os.path.splitext(os.path.basename(j["image"]))[0]
+        used = seen.setdefault(out, set())
+        name, n = stem, 1
+        while name in used or (name != stem and name in taken[out]):   # don't take another image's stem
+            n += 1
+            name = f"{stem}-{n}"
+        if name != stem:
+            print(f"  {os.path.basename(j['image'])}: output stem taken, writing {name}-overlay-*.jpg")
+        used.add(name)
+        j["name"] = name
+    return jobs
+
+
+def run_batch(jobs, out, workers=None):
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(render_item, jobs))
+    paths = [p for ps, _ in results for p in ps]
+    print(f"{len(jobs)} image(s), {len(paths)} render(s) in {time.time()-t0:.1f}s")
+    if out and paths:
+        # one thumbnail per render, 6 per row — a quick visual QA of the whole campaign
+        tw, cols = 240, 6
+        thumbs = [Image.open(p) for p in paths]
+        th = max(int(im.height*tw/im.width) for im in thumbs)
+        rows = (len(thumbs)+cols-1)//cols
+        cs = Image.new("RGB", (cols*(tw+10)+10, rows*(th+10)+10), "white")
+        for i, im in enumerate(thumbs):
+            cs.paste(im.resize((tw, int(im.height*tw/im.width))), ((i % cols)*(tw+10)+10, (i//cols)*(th+10)+10))
+        cp = os.path.join(out, "contact-sheet.jpg"); cs.save(cp, quality=88); print("wrote", cp)
+    return results
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("image")
-    ap.add_argument("--text", required=True)
+    ap.add_argument("image", nargs="?")
+    ap.add_argument("--text", default=None)
     ap.add_argument("--subtitle", default=None)
     ap.add_argument("--style", default="all", choices=["top", "bottom", "sticker", "meme", "all"])
     ap.add_argument("--accent", default="99,66,204", help="R,G,B brand color (default Curify purple)")
     ap.add_argument("--out", default=None, help="output dir (default: alongside source)")
+    ap.add_argument("--manifest", default=None, help="batch: JSON/JSONL list of {image, text, subtitle?, style?, accent?}")
+    ap.add_argument("--dir", default=None, help="batch: folder of images with same-stem .txt files")
+    ap.add_argument("--workers", type=int, default=None, help="batch: worker processes (default: CPU count)")
     a = ap.parse_args()
     accent = tuple(int(x) for x in a.accent.split(","))
-    base = Image.open(a.image).convert("RGB")
-    stem = os.path.splitext(os.path.basename(a.image))[0]
-    out = a.out or os.path.dirname(os.path.abspath(a.image)); os.makedirs(out, exist_ok=True)
-    styles = ["top", "bottom", "sticker"] if a.style == "all" else [a.style]
-    paths = []
-    for s in styles:
-        im = render(base, a.text, s, accent, a.subtitle)
-        p = os.path.join(out, f"{stem}-overlay-{s}.jpg"); im.save(p, quality=92); paths.append(p); print("wrote", p)
-    if a.style == "all":
-        W, H = base.size; tw = 360; th = int(H*tw/W)
-        cs = Image.new("RGB", (tw*3+40, th+20), "white")
-        for i, p in enumerate(paths): cs.paste(Image.open(p).resize((tw, th)), (i*(tw+10)+10, 10))
-        cp = os.path.join(out, f"{stem}-overlay-contact.jpg"); cs.save(cp, quality=92); print("wrote", cp)
+    if a.manifest or a.dir:
+        jobs = load_jobs(a, accent)
+        if a.out: os.makedirs(a.out, exist_ok=True)
+        run_batch(jobs, a.out, a.workers)
+        return
+    if not a.image or not a.text:
+        ap.error("give <image> --text, or --manifest / --dir for a batch")
+    render_item({"image": a.image, "text": a.text, "subtitle": a.subtitle,
+                 "styles": _styles(a.style), "accent": accent, "out": a.out})
 
 if __name__ == "__main__":
     main()
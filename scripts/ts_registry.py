@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Topic-registry data from lib/topicRegistry_pure.ts, for the Python scripts.
+
+The registry's mappings are TypeScript constants — object / array literals, or
+references into an imported JSON file (`taxonomy.gallery_tag_to_topics`). Rather
+than a regex per block, the file is tokenized once (strings, template literals,
+// and /* */ comments, trailing commas, quoted or bare keys) and each top-level
+`const NAME[: Type] = <expr>` whose value is data is evaluated:
+
+    { k: v, "k": v, ...spread }   [a, b, ...spread]   "s" 's' `s`   1.5  true/false/null
+    new Set(<expr>)   <expr> as const   IMPORTED_JSON.a.b   OTHER_CONST.x
+
+Anything else (Maps, IIFEs, calls) is skipped. Results are cached in
+raw/.cache/ts-registry/ keyed by the source file and the JSON files it imports:
+unchanged mtime + size is a hit without reading anything, a touched-but-identical
+file is a hit after one hash, so a coverage audit can re-run in a loop while the
+registry is being edited.
+
+    import ts_registry
+    reg = ts_registry.load()                   # TopicRegistry
+    reg.gallery_tag["sneaker-design"]          # "sneakers"
+    reg.tag_to_topics()["vintage"]             # topics a gallery tag surfaces (GALLERY_TAG_TO_TOPICS)
+    ts_registry.constants()["RELATED_LINKS"]   # any data const in the file
+
+CLI:
+    python3 scripts/ts_registry.py snapshot [--out lib/generated/topic_registry.json]
+    python3 scripts/ts_registry.py get TOPIC_BLOG_SLUGS
+"""
+import argparse, hashlib, json, os, re
+from pathlib import Path
+from typing import NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+REGISTRY_TS = ROOT / "lib" / "topicRegistry_pure.ts"
+CACHE_DIR = ROOT / "raw" / ".cache" / "ts-registry"
+SNAPSHOT = ROOT / "lib" / "generated" / "topic_registry.json"
+CACHE_VERSION = 1
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\$]|\\.|\$(?!\{))*`)
+  | (?P<num>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<op>\.\.\.|=>|[{}\[\]().,:;=<>?|&!+\-*/%^~@#])
+  | (?P<other>.)
+""", re.X | re.S)
+_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.S)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+class Unsupported(Exception):
+    """The initializer is code, not data."""
+
+
+def tokenize(src):
+    """[(kind, text)] — comments and whitespace dropped."""
+    return [(m.lastgroup, m.group()) for m in _TOKEN.finditer(src) if m.lastgroup != "ws"]
+
+
+def _string(tok):
+    return _ESCAPE.sub(lambda m: chr(int(m.group(1)[1:], 16)) if len(m.group(1)) == 5
+                       else _ESCAPES.get(m.group(1), m.group(1)), tok[1:-1])
+
+
+class _Module:
+    """Top-level consts + default JSON imports of one TS file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tokens = tokenize(self.path.read_text(encoding="utf-8"))
+        self.imports, self.starts, self.values, self.busy = {}, {}, {}, set()
+        t, depth = self.tokens, 0
+        for i, (kind, text) in enumerate(t):
+            depth += text in ("{", "(", "[")
+            depth -= text in ("}", ")", "]")
+            if depth or i + 1 >= len(t) or t[i + 1][0] != "name":
+                continue
+            if text == "import" and i + 3 < len(t) and t[i + 2][1] == "from" and t[i + 3][0] == "str":
+                spec = _string(t[i + 3][1])
+                if spec.endswith(".json"):
+                    self.imports[t[i + 1][1]] = self._resolve(spec)
+            elif text == "const":
+                self.starts.setdefault(t[i + 1][1], i + 2)
+
+    def _resolve(self, spec):
+        if spec.startswith("@/"):
+            return ROOT / spec[2:]
+        return (self.path.parent / spec).resolve()
+
+    def deps(self):
+        return [self.path, *self.imports.values()]
+
+    def value(self, name):
+        if name in self.values:
+            return self.values[name]
+        if name in self.imports:
+            self.values[name] = json.loads(self.imports[name].read_text(encoding="utf-8"))
+            return self.values[name]
+        if name not in self.starts or name in self.busy:
+            raise Unsupported(name)
+        self.busy.add(name)
+        try:
+            i = self._skip_type(self.starts[name])
+            v, _ = self._expr(i + 1)
+        finally:
+            self.busy.discard(name)
+        self.values[name] = v
+        return v
+
+    def _skip_type(self, i):
+        """Index of the `=` after `NAME[: Type]`."""
+        depth = 0
+        while i < len(self.tokens):
+            text = self.tokens[i][1]
+            if text in ("<", "(", "[", "{"):
+                depth += 1
+            elif text in (">", ")", "]", "}"):
+                depth -= 1
+            elif text == "=" and depth == 0:
+                return i
+            i += 1
+        raise Unsupported("no initializer")
+
+    def _expr(self, i):
+        v, i = self._primary(i)
+        while i + 1 < len(self.tokens) and self.tokens[i][1] == "." and self.tokens[i + 1][0] == "name":
+            key = self.tokens[i + 1][1]
+            if not isinstance(v, dict) or key not in v:
+                raise Unsupported(f".{key}")
+            v, i = v[key], i + 2
+        if i < len(self.tokens) and self.tokens[i][1] in ("(", "[", "=>"):
+            raise Unsupported("call / index")
+        while i < len(self.tokens) and self.tokens[i][1] == "as":     # `as const`, `as Record<…>`
+            i, depth = i + 1, 0
+            while i < len(self.tokens):
+                text = self.tokens[i][1]
+                if depth == 0 and text in (",", ";", "}", "]", ")"):
+                    break
+                depth += text in ("<", "(", "[", "{")
+                depth -= text in (">", ")", "]", "}")
+                i += 1
+        return v, i
+
+    def _primary(self, i):
+        kind, text = self.tokens[i]
+        if kind == "str":
+            return _string(text), i + 1
+        if kind == "num":
+            return (float(text) if any(c in text for c in ".eE") else int(text)), i + 1
+        if text == "{":
+            return self._object(i + 1)
+        if text == "[":
+            return self._array(i + 1)
+        if text == "(":
+            v, i = self._expr(i + 1)
+            if self.tokens[i][1] != ")":
+                raise Unsupported("(")
+            return v, i + 1
+        if text == "new" and self.tokens[i + 1][1] == "Set":
+            i += 2
+            if self.tokens[i][1] == "<":
+                i = self._close(i, "<", ">")
+            if self.tokens[i][1] != "(":
+                raise Unsupported("new Set")
+            if self.tokens[i + 1][1] == ")":
+                return [], i + 2
+            v, i = self._expr(i + 1)
+            if self.tokens[i][1] != ")":
+                raise Unsupported("new Set(…)")
+            return list(dict.fromkeys(v)), i + 1
+        if kind == "name":
+            if text in ("true", "false", "null"):
+                return {"true": True, "false": False, "null": None}[text], i + 1
+            return self.value(text), i + 1
+        raise Unsupported(text)
+
+    def _close(self, i, open_, close):
+        depth = 0
+        while True:
+            depth += self.tokens[i][1] == open_
+            depth -= self.tokens[i][1] == close
+            i += 1
+            if depth == 0:
+                return i
+
+    def _object(self, i):
+        out = {}
+        while self.tokens[i][1] != "}":
+            if self.tokens[i][1] == "...":
+                v, i = self._expr(i + 1)
+                out.update(v)
+            else:
+                kind, key = self.tokens[i]
+                key = _string(key) if kind == "str" else key
+                if self.tokens[i + 1][1] != ":":
+                    raise Unsupported("shorthand / method")
+                out[key], i = self._expr(i + 2)
+            if self.tokens[i][1] == ",":
+                i += 1
+            elif self.tokens[i][1] != "}":
+                raise Unsupported(self.tokens[i][1])
+        return out, i + 1
+
+    def _array(self, i):
+        out = []
+        while self.tokens[i][1] != "]":
+            if self.tokens[i][1] == "...":
+                v, i = self._expr(i + 1)
+                out.extend(v)
+            else:
+                v, i = self._expr(i)
+                out.append(v)
+            if self.tokens[i][1] == ",":
+                i += 1
+            elif self.tokens[i][1] != "]":
+                raise Unsupported(self.tokens[i][1])
+        return out, i + 1
+
+    def constants(self):
+        out = {}
+        for name in self.starts:
+            try:
+                out[name] = self.value(name)
+            except (Unsupported, IndexError, KeyError, TypeError, ValueError):
+                continue
+        return out
+
+
+# --- cache ----------------------------------------------------------------------
+
+_memo = {}
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _sha(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def constants(path=REGISTRY_TS, cache_dir=CACHE_DIR):
+    """Every data const in the TS file, {name: value} (sets as lists)."""
+    path = Path(path).resolve()
+    entry = Path(cache_dir) / f"{hashlib.sha256(str(path).encode()).hexdigest()[:16]}.json"
+    cached = _memo.get(path)
+    if cached is None and entry.exists():
+        try:
+            cached = json.loads(entry.read_text(encoding="utf-8"))
+        except ValueError:
+            cached = None
+    if cached and cached.get("version") == CACHE_VERSION:
+        fresh, restamped = True, False
+        for dep, (stamp, sha) in cached["deps"].items():
+            try:
+                now = _stamp(dep)
+            except FileNotFoundError:
+                fresh = False
+                break
+            if now != stamp:
+                if _sha(dep) != sha:
+                    fresh = False
+                    break
+                cached["deps"][dep][0], restamped = now, True
+        if fresh:
+            if restamped:
+                _save(entry, cached)
+            _memo[path] = cached
+            return cached["consts"]
+
+    mod = _Module(path)
+    consts = mod.constants()
+    cached = {"version": CACHE_VERSION, "deps": {str(d): [_stamp(d), _sha(d)] for d in mod.deps()},
+              "consts": consts}
+    _save(entry, cached)
+    _memo[path] = cached
+    return consts
+
+
+def _save(entry, data):
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, entry)
+    except OSError:
+        pass                                     # a read-only checkout still works, just uncached
+
+
+# --- typed view -----------------------------------------------------------------
+
+class TopicRegistry(NamedTuple):
+    gallery_tag: dict[str, str]                  # topic → gallery tag its page pulls (TOPIC_GALLERY_TAG)
+    extra_tag_to_topics: dict[str, list[str]]    # gallery tag → extra topics (EXTRA_TAG_TO_TOPICS)
+    reverse_map_excluded: list[str]              # topics kept out of the tag → topic direction
+    blog_tag: dict[str, str]                     # topic → blog tag (TOPIC_BLOG_TAG)
+    blog_slugs: dict[str, list[str]]             # topic → blog slugs (TOPIC_BLOG_SLUGS)
+    related_links: dict[str, list[str]]          # topic → cross-linked topics (RELATED_LINKS)
+
+    def tag_to_topics(self) -> dict[str, list[str]]:
+        """GALLERY_TAG_TO_TOPICS: the topics a gallery tag surfaces, as the tag page builds it."""
+        excluded = set(self.reverse_map_excluded)
+        out: dict[str, list[str]] = {}
+        for topic, tag in self.gallery_tag.items():
+            if topic not in excluded:
+                out.setdefault(tag, []).append(topic)
+        for tag, topics in self.extra_tag_to_topics.items():
+            kept = [t for t in topics if t not in excluded]
+            if kept:
+                arr = out.setdefault(tag, [])
+                arr.extend(t for t in kept if t not in arr)
+        return out
+
+    def mapped_tags(self) -> set[str]:
+        """Gallery tags that reach a topic through either bridge."""
+        return set(self.gallery_tag.values()) | set(self.extra_tag_to_topics)
+
+
+def load(path=REGISTRY_TS, cache_dir=CACHE_DIR) -> TopicRegistry:
+    c = constants(path, cache_dir)
+    missing = [n for n in ("TOPIC_GALLERY_TAG", "EXTRA_TAG_TO_TOPICS") if n not in c]
+    if missing:
+        raise RuntimeError(f"{path}: could not evaluate {', '.join(missing)}")
+    return TopicRegistry(
+        gallery_tag=c["TOPIC_GALLERY_TAG"],
+        extra_tag_to_topics=c["EXTRA_TAG_TO_TOPICS"],
+        reverse_map_excluded=c.get("REVERSE_MAP_EXCLUDED_TOPICS", []),
+        blog_tag=c.get("TOPIC_BLOG_TAG", {}),
+        blog_slugs=c.get("TOPIC_BLOG_SLUGS", {}),
+        related_links=c.get("RELATED_LINKS", {}),
+    )
+
+
+def snapshot(reg: TopicRegistry, out=SNAPSHOT):
+    data = {"source": str(REGISTRY_TS.relative_to(ROOT)), **reg._asdict(), "tag_to_topics": reg.tag_to_topics()}
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    Path(out).write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Evaluate the data constants of lib/topicRegistry_pure.ts")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("snapshot", help="write the registry as JSON")
+    p.add_argument("--out", type=Path, default=SNAPSHOT)
+    p = sub.add_parser("get", help="print one const as JSON")
+    p.add_argument("name")
+    ap.add_argument("--ts", type=Path, default=REGISTRY_TS)
+    a = ap.parse_args()
+
+    if a.cmd == "snapshot":
+        reg = load(a.ts)
+        snapshot(reg, a.out)
+        print(f"{len(reg.gallery_tag)} gallery tags, {len(reg.extra_tag_to_topics)} extra tag → topics, "
+              f"{len(reg.tag_to_topics())} tags reach a topic → {a.out}")
+    else:
+        c = constants(a.ts)
+        if a.name not in c:
+            raise SystemExit(f"{a.name}: not a data const in {a.ts} (have: {', '.join(sorted(c))})")
+        print(json.dumps(c[a.name], indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
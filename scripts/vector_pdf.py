@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+"""Minimal vector PDF writer for the print builders (template packs, booklets).
+
+Pillow's PDF export writes every page as one flat raster, so type goes soft on zoom
+and every page carries a full-page image even where it is mostly white margin. This
+writer keeps the parts that should be vectors as vectors:
+
+- text is real PDF text in an embedded, SUBSET copy of the same TrueType/OpenType
+  font Pillow would have rasterised (fontTools does the subsetting; CJK-safe via
+  Identity-H CID fonts, with a ToUnicode map so copy/search still works),
+- rectangles / rounded boxes / ellipses / lines are path operators,
+- photos are JPEG XObjects at a chosen quality. A source that is already a JPEG
+  is embedded byte-for-byte (no second generation of compression loss); alpha and
+  paste masks ride along as a Flate soft mask; identical images (the logo on every
+  page) are stored once.
+
+The page API deliberately mirrors ImageDraw — text / textlength / rectangle /
+rounded_rectangle / ellipse / line, plus Image.paste — so a Pillow layout can be
+pointed at a Page with very few changes. Coordinates are in the CALLER's units
+(top-left origin, y down); `unit` says how many PDF points one caller unit is.
+
+Usage (as a module):
+    from vector_pdf import VectorPDF
+    doc = VectorPDF()
+    page = doc.new_page(1700, 2200, unit=72 / 200, bg="white")   # US Letter @200dpi units
+    page.text((100, 100), "你好 Curify", font=ImageFont.truetype(path, 32), fill=(34, 34, 34))
+    page.image("photo.jpg", (100, 200, 1600, 2000))
+    doc.save("out.pdf")
+"""
+import hashlib
+import io
+import zlib
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+from PIL import Image, ImageColor
+
+K = 0.5522847498  # cubic Bézier control distance for a quarter circle
+
+
+def _num(v):
+    s = f"{v:.3f}".rstrip("0").rstrip(".")
+    return s if s not in ("", "-0") else "0"
+
+
+def _rgb(c):
+    if c is None:
+        return None
+    if isinstance(c, str):
+        c = ImageColor.getrgb(c)
+    if isinstance(c, int):
+        c = (c, c, c)
+    return tuple(v / 255 for v in c[:3])
+
+
+def _name_escape(s):
+    return "".join(ch if ch.isalnum() else f"#{ord(ch):02X}" for ch in s)
+
+
+class _Font:
+    """One embedded font face. Glyph codes are resolved at save time, after the
+    subsetter has decided the final glyph order."""
+
+    def __init__(self, path, index):
+        self.path, self.index = path, index
+        self.tt = TTFont(path, fontNumber=index, lazy=True)
+        self.upm = self.tt["head"].unitsPerEm
+        self.cmap = self.tt.getBestCmap() or {}
+        self.hmtx = self.tt["hmtx"]
+        hhea = self.tt["hhea"]
+        self.ascent, self.descent = hhea.ascent, hhea.descent   # descent is negative
+        self.used = set()
+        self._adv = {}
+
+    def advance(self, ch):
+        """Advance width of one character in 1/upm units (memoised)."""
+        a = self._adv.get(ch)
+        if a is None:
+            g = self.cmap.get(ord(ch)) or self.tt.getGlyphOrder()[0]   # .notdef, as Pillow draws it
+            a = self._adv[ch] = self.hmtx[g][0]
+        return a
+
+    def width(self, s, size):
+        return sum(self.advance(ch) for ch in s) * size / self.upm
+
+    def embed(self, doc):
+        """Subset to the used characters and write the Type0 font objects.
+        Returns (font object ref, {char: cid})."""
+        opts = subset.Options()
+        opts.layout_features = []
+        opts.notdef_outline = True
+        opts.name_IDs = ["*"]
+        opts.drop_tables += ["GSUB", "GPOS", "GDEF", "morx", "kerx", "vhea", "vmtx", "FFTM"]
+        sub = subset.Subsetter(opts)
+        cps = sorted({ord(c) for c in self.used if ord(c) in self.cmap})
+        sub.populate(unicodes=cps)
+        tt = TTFont(self.path, fontNumber=self.index)   # fresh, non-lazy copy to subset
+        sub.subset(tt)
+        buf = io.BytesIO()
+        tt.save(buf)
+        data = buf.getvalue()
+
+        order = {n: i for i, n in enumerate(tt.getGlyphOrder())}
+        cmap = tt.getBestCmap() or {}
+        cff = "CFF " in tt
+        cid_keyed = cff and hasattr(tt["CFF "].cff.topDictIndex[0], "ROS")
+        cids = {}
+        for ch in self.used:
+            gname = cmap.get(ord(ch))
+            if gname is None:
+                cids[ch] = 0
+            elif cid_keyed and gname.startswith("cid"):
+                cids[ch] = int(gname[3:])
+            else:
+                cids[ch] = order[gname]
+
+        ps = tt["name"].getDebugName(6) or "Font"
+        tag = hashlib.md5(data).hexdigest()[:6].upper().translate(str.maketrans("0123456789", "GHIJKLMNOP"))
+        base = f"{tag}+{_name_escape(ps)}"
+        scale = 1000 / self.upm
+        bbox = [int(v * scale) for v in (tt["head"].xMin, tt["head"].yMin, tt["head"].xMax, tt["head"].yMax)]
+
+        if cff:
+            ff = doc._stream(data, {"Subtype": "/OpenType"}, compress=True)
+            ff_key, subtype = "FontFile3", "CIDFontType0"
+        else:
+            ff = doc._stream(data, {"Length1": str(len(data))}, compress=True)
+            ff_key, subtype = "FontFile2", "CIDFontType2"
+        desc = doc._obj(
+            f"<< /Type /FontDescriptor /FontName /{base} /Flags 4 "
+            f"/FontBBox [{' '.join(map(str, bbox))}] /ItalicAngle 0 "
+            f"/Ascent {int(self.ascent * scale)} /Descent {int(self.descent * scale)} "
+            f"/CapHeight {int(self.ascent * scale)} /StemV 80 /{ff_key} {ff} 0 R >>")
+
+        widths = " ".join(f"{cid} [{int(round(self.advance(ch) * scale))}]"
+                          for ch, cid in sorted(cids.items(), key=lambda kv: kv[1]))
+        extra = " /CIDToGIDMap /Identity" if not cff else ""
+        cidfont = doc._obj(
+            f"<< /Type /Font /Subtype /{subtype} /BaseFont /{base} "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {desc} 0 R /DW 1000 /W [{widths}]{extra} >>")
+
+        bf = "\n".join(f"<{cid:04X}> <{''.join(f'{u:04X}' for u in _utf16(ch))}>"
+                       for ch, cid in sorted(cids.items(), key=lambda kv: kv[1]))
+        cmap_src = ("/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+                    "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+                    "/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+                    "1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+                    f"{len(cids)} beginbfchar\n{bf}\nendbfchar\n"
+                    "endcmap CMapName currentdict /CMap defineresource pop end end")
+        tounicode = doc._stream(cmap_src.encode("ascii"), {}, compress=True)
+        ref = doc._obj(
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /{base} /Encoding /Identity-H "
+            f"/DescendantFonts [{cidfont} 0 R] /ToUnicode {tounicode} 0 R >>")
+        return ref, cids
+
+
+def _utf16(ch):
+    b = ch.encode("utf-16-be")
+    return [int.from_bytes(b[i:i + 2], "big") for i in range(0, len(b), 2)]
+
+
+class Page:
+    """One PDF page with an ImageDraw-like API in caller units.
+
+    unit       — PDF points per caller unit.
+    px         — caller units per image pixel, for `paste` (Pillow places images at
+                 their pixel size; a 2× raster layout passes px=1/2).
+    font_scale — caller units per Pillow font pixel (fonts built for an S× raster
+                 pass 1/S so their `.size` still means the same thing).
+    """
+
+    def __init__(self, doc, w, h, unit=1.0, px=1.0, font_scale=1.0):
+        self.doc, self.w, self.h = doc, w, h
+        self.unit, self.px, self.font_scale = unit, px, font_scale
+        self.ops = []          # bytes, or ("text", font, string) resolved at save time
+        self.fonts, self.images = {}, {}
+
+    # ── coordinate helpers ───────────────────────────────────────────────
+    def _x(self, x):
+        return x * self.unit
+
+    def _y(self, y):
+        return (self.h - y) * self.unit
+
+    def _emit(self, s):
+        self.ops.append(s.encode("latin-1") + b"\n")
+
+    def _paint(self, fill, outline, width):
+        """Colour state + paint operator for a closed path that was just emitted."""
+        f, o = _rgb(fill), _rgb(outline)
+        pre = ""
+        if f:
+            pre += f"{_num(f[0])} {_num(f[1])} {_num(f[2])} rg "
+        if o:
+            pre += f"{_num(o[0])} {_num(o[1])} {_num(o[2])} RG {_num(width * self.unit)} w "
+        op = "B" if f and o else "f" if f else "S" if o else "n"
+        return pre, op
+
+    @staticmethod
+    def _inset(box, d):
+        x0, y0, x1, y1 = box
+        return (x0 + d, y0 + d, x1 - d, y1 - d)
+
+    # ── shapes ───────────────────────────────────────────────────────────
+    def rectangle(self, box, fill=None, outline=None, width=1):
+        # Pillow strokes INSIDE the box; PDF strokes are centred on the path
+        if fill and outline:
+            self.rectangle(box, fill=fill)
+            self.rectangle(box, outline=outline, width=width)
+            return
+        x0, y0, x1, y1 = self._inset(box, width / 2) if outline else box
+        pre, op = self._paint(fill, outline, width)
+        self._emit(f"{pre}{_num(self._x(x0))} {_num(self._y(y1))} "
+                   f"{_num((x1 - x0) * self.unit)} {_num((y1 - y0) * self.unit)} re {op}")
+
+    def rounded_rectangle(self, box, radius=0, fill=None, outline=None, width=1):
+        if fill and outline:
+            self.rounded_rectangle(box, radius, fill=fill)
+            self.rounded_rectangle(box, radius, outline=outline, width=width)
+            return
+        if outline:
+            box, radius = self._inset(box, width / 2), max(0, radius - width / 2)
+        x0, y0, x1, y1 = box
+        r = min(radius, (x1 - x0) / 2, (y1 - y0) / 2)
+        if r <= 0:
+            return self.rectangle(box, fill=fill, outline=outline, width=width)
+        k = r * K
+        X, Y = self._x, self._y
+        path = [
+            f"{_num(X(x0 + r))} {_num(Y(y0))} m",
+            f"{_num(X(x1 - r))} {_num(Y(y0))} l",
+            f"{_num(X(x1 - r + k))} {_num(Y(y0))} {_num(X(x1))} {_num(Y(y0 + r - k))} {_num(X(x1))} {_num(Y(y0 + r))} c",
+            f"{_num(X(x1))} {_num(Y(y1 - r))} l",
+            f"{_num(X(x1))} {_num(Y(y1 - r + k))} {_num(X(x1 - r + k))} {_num(Y(y1))} {_num(X(x1 - r))} {_num(Y(y1))} c",
+            f"{_num(X(x0 + r))} {_num(Y(y1))} l",
+            f"{_num(X(x0 + r - k))} {_num(Y(y1))} {_num(X(x0))} {_num(Y(y1 - r + k))} {_num(X(x0))} {_num(Y(y1 - r))} c",
+            f"{_num(X(x0))} {_num(Y(y0 + r))} l",
+            f"{_num(X(x0))} {_num(Y(y0 + r - k))} {_num(X(x0 + r - k))} {_num(Y(y0))} {_num(X(x0 + r))} {_num(Y(y0))} c",
+        ]
+        pre, op = self._paint(fill, outline, width)
+        self._emit(pre + " ".join(path) + " h " + op)
+
+    def ellipse(self, box, fill=None, outline=None, width=1):
+        if fill and outline:
+            self.ellipse(box, fill=fill)
+            self.ellipse(box, outline=outline, width=width)
+            return
+        x0, y0, x1, y1 = self._inset(box, width / 2) if outline else box
+        cx, cy, rx, ry = (x0 + x1) / 2, (y0 + y1) / 2, (x1 - x0) / 2, (y1 - y0) / 2
+        kx, ky = rx * K, ry * K
+        X, Y = self._x, self._y
+        path = [
+            f"{_num(X(cx + rx))} {_num(Y(cy))} m",
+            f"{_num(X(cx + rx))} {_num(Y(cy + ky))} {_num(X(cx + kx))} {_num(Y(cy + ry))} {_num(X(cx))} {_num(Y(cy + ry))} c",
+            f"{_num(X(cx - kx))} {_num(Y(cy + ry))} {_num(X(cx - rx))} {_num(Y(cy + ky))} {_num(X(cx - rx))} {_num(Y(cy))} c",
+            f"{_num(X(cx - rx))} {_num(Y(cy - ky))} {_num(X(cx - kx))} {_num(Y(cy - ry))} {_num(X(cx))} {_num(Y(cy - ry))} c",
+            f"{_num(X(cx + kx))} {_num(Y(cy - ry))} {_num(X(cx + rx))} {_num(Y(cy - ky))} {_num(X(cx + rx))} {_num(Y(cy))} c",
+        ]
+        pre, op = self._paint(fill, outline, width)
+        self._emit(pre + " ".join(path) + " h " + op)
+
+    def line(self, xy, fill=None, width=1):
+        pts = list(xy)
+        if pts and isinstance(pts[0], (int, float)):
+            pts = list(zip(pts[0::2], pts[1::2]))
+        if len(pts) < 2:
+            return
+        c = _rgb(fill) or (0, 0, 0)
+        path = f"{_num(self._x(pts[0][0]))} {_num(self._y(pts[0][1]))} m " + " ".join(
+            f"{_num(self._x(x))} {_num(self._y(y))} l" for x, y in pts[1:])
+        self._emit(f"{_num(c[0])} {_num(c[1])} {_num(c[2])} RG {_num(width * self.unit)} w 0 J {path} S")
+
+    # ── text ─────────────────────────────────────────────────────────────
+    def _font(self, font):
+        path = getattr(font, "path", None)
+        if not isinstance(path, str):
+            raise ValueError("vector text needs a TrueType/OpenType font loaded from a file path")
+        return self.doc._font(path, getattr(font, "index", 0)), font.size * self.font_scale
+
+    def textlength(self, s, font=None):
+        f, size = self._font(font)
+        return f.width(s, size)
+
+    def text(self, xy, s, font=None, fill=None, anchor=None, **kw):
+        """Same anchors as ImageDraw for the ones the builders use: horizontal
+        l/m/r, vertical a (ascender, the default)/m/s (baseline)/d (descender)."""
+        if not s:
+            return
+        f, size = self._font(font)
+        anchor = anchor or "la"
+        x, y = xy
+        if anchor[0] in "mr":
+            w = f.width(s, size)
+            x -= w / 2 if anchor[0] == "m" else w
+        asc, desc = f.ascent * size / f.upm, f.descent * size / f.upm
+        v = anchor[1]
+        if v in "at":
+            y += asc
+        elif v == "m":
+            y += (asc + desc) / 2
+        elif v == "d":
+            y += desc
+        c = _rgb(fill) or (0, 0, 0)
+        f.used.update(s)
+        name = self.fonts.setdefault(f, f"F{self.doc._font_ids[f]}")
+        self._emit(f"BT {_num(c[0])} {_num(c[1])} {_num(c[2])} rg /{name} {_num(size * self.unit)} Tf "
+                   f"{_num(self._x(x))} {_num(self._y(y))} Td")
+        self.ops.append(("text", f, s))
+        self._emit("Tj ET")
+
+    # ── images ───────────────────────────────────────────────────────────
+    def image(self, src, box, mask=None, quality=None, lossless=False):
+        """Place an image stretched to `box` (caller units).
+
+        src      — a PIL image, or a path. A JPEG path is embedded as-is.
+        mask     — optional "L" image (same pixel size) used as soft mask; an RGBA
+                   source uses its own alpha.
+        lossless — Flate instead of JPEG (QR codes and other hard-edged art).
+        """
+        name = self.doc._image(src, mask, quality, lossless)
+        self.images[name] = True
+        x0, y0, x1, y1 = box
+        self._emit(f"q {_num((x1 - x0) * self.unit)} 0 0 {_num((y1 - y0) * self.unit)} "
+                   f"{_num(self._x(x0))} {_num(self._y(y1))} cm /{name} Do Q")
+
+    def paste(self, im, xy, mask=None, **kw):
+        """Image.paste equivalent: `xy` and the image's size are in pixels (see `px`)."""
+        if mask is im and im.mode == "RGBA":
+            mask = None
+        if mask is not None and mask.mode != "L":
+            mask = mask.getchannel("A") if mask.mode in ("RGBA", "LA") else mask.convert("L")
+        x, y = xy[0] * self.px, xy[1] * self.px
+        self.image(im, (x, y, x + im.width * self.px, y + im.height * self.px), mask=mask, **kw)
+
+
+class VectorPDF:
+    """Document: collects pages, fonts and deduplicated images; `save` writes it."""
+
+    def __init__(self, jpeg_quality=85):
+        self.jpeg_quality = jpeg_quality
+        self.pages = []
+        self._objs = []            # index i -> bytes of object i+1
+        self._font_ids = {}
+        self._fonts = {}
+        self._img_by_key = {}
+        self._img_refs = {}
+
+    # ── low-level object store ───────────────────────────────────────────
+    def _obj(self, body):
+        self._objs.append(body.encode("latin-1") if isinstance(body, str) else body)
+        return len(self._objs)
+
+    def _reserve(self):
+        self._objs.append(None)
+        return len(self._objs)
+
+    def _stream(self, data, extra, compress=False):
+        if compress:
+            data = zlib.compress(data, 9)
+            extra = dict(extra, Filter="/FlateDecode")
+        d = " ".join(f"/{k} {v}" for k, v in extra.items())
+        return self._obj(f"<< {d} /Length {len(data)} >>\nstream\n".encode("latin-1") + data + b"\nendstream")
+
+    # ── resources ────────────────────────────────────────────────────────
+    def _font(self, path, index=0):
+        key = (path, index)
+        f = self._fonts.get(key)
+        if f is None:
+            f = self._fonts[key] = _Font(path, index)
+            self._font_ids[f] = len(self._font_ids) + 1
+        return f
+
+    def _image(self, src, mask, quality, lossless):
+        quality = quality or self.jpeg_quality
+        if isinstance(src, str):
+            with open(src, "rb") as fh:
+                raw = fh.read()
+            im = Image.open(io.BytesIO(raw))
+            if im.format == "JPEG" and im.mode in ("RGB", "L") and mask is None and not lossless:
+                return self._register(("jpeg", hashlib.sha1(raw).hexdigest()),
+                                      lambda: self._jpeg_xobject(raw, im.size, im.mode))
+            src = im
+        if src.mode in ("RGBA", "LA") or (src.mode == "P" and "transparency" in src.info):
+            src = src.convert("RGBA")
+            if mask is None:
+                mask = src.getchannel("A")
+            src = src.convert("RGB")
+        elif src.mode not in ("RGB", "L"):
+            src = src.convert("RGB")
+        key = ("img", hashlib.sha1(src.tobytes()).hexdigest(), src.size, src.mode,
+               hashlib.sha1(mask.tobytes()).hexdigest() if mask is not None else None,
+               quality, lossless)
+        return self._register(key, lambda: self._encode(src, mask, quality, lossless))
+
+    def _register(self, key, build):
+        name = self._img_by_key.get(key)
+        if name is None:
+            name = self._img_by_key[key] = f"Im{len(self._img_by_key) + 1}"
+            self._img_refs[name] = build()
+        return name
+
+    def _jpeg_xobject(self, data, size, mode, smask=None):
+        cs = "/DeviceGray" if mode == "L" else "/DeviceRGB"
+        extra = {"Type": "/XObject", "Subtype": "/Image", "Width": size[0], "Height": size[1],
+                 "ColorSpace": cs, "BitsPerComponent": 8, "Filter": "/DCTDecode"}
+        if smask:
+            extra["SMask"] = f"{smask} 0 R"
+        return self._stream(data, extra)
+
+    def _encode(self, im, mask, quality, lossless):
+        smask = None
+        if mask is not None:
+            m = mask.convert("L")
+            if m.size != im.size:
+                m = m.resize(im.size, Image.LANCZOS)
+            smask = self._stream(m.tobytes(), {
+                "Type": "/XObject", "Subtype": "/Image", "Width": m.width, "Height": m.height,
+                "ColorSpace": "/DeviceGray", "BitsPerComponent": 8}, compress=True)
+        if lossless:
+            extra = {"Type": "/XObject", "Subtype": "/Image", "Width": im.width, "Height": im.height,
+                     "ColorSpace": "/DeviceGray" if im.mode == "L" else "/DeviceRGB",
+                     "BitsPerComponent": 8}
+            if smask:
+                extra["SMask"] = f"{smask} 0 R"
+            return self._stream(im.tobytes(), extra, compress=True)
+        buf = io.BytesIO()
+        im.save(buf, "JPEG", quality=quality, optimize=True)
+        return self._jpeg_xobject(buf.getvalue(), im.size, im.mode, smask)
+
+    # ── pages ────────────────────────────────────────────────────────────
+    def new_page(self, w, h, unit=1.0, px=1.0, font_scale=1.0, bg=None):
+        page = Page(self, w, h, unit=unit, px=px, font_scale=font_scale)
+        if bg is not None:
+            page.rectangle((0, 0, w, h), fill=bg)
+        self.pages.append(page)
+        return page
+
+    def save(self, path):
+        font_refs = {}
+        for f in self._font_ids:
+            font_refs[f] = f.embed(self) if f.used else (None, {})
+        pages_ref = self._reserve()
+        kids = []
+        for p in self.pages:
+            chunks = []
+            for op in p.ops:
+                if isinstance(op, bytes):
+                    chunks.append(op)
+                else:
+                    _, f, s = op
+                    cids = font_refs[f][1]
+                    chunks.append(b"<" + "".join(f"{cids.get(ch, 0):04X}" for ch in s).encode("ascii") + b"> ")
+            content = self._stream(b"".join(chunks), {}, compress=True)
+            fonts = " ".join(f"/{n} {font_refs[f][0]} 0 R" for f, n in p.fonts.items())
+            xobjs = " ".join(f"/{n} {self._img_refs[n]} 0 R" for n in p.images)
+            kids.append(self._obj(
+                f"<< /Type /Page /Parent {pages_ref} 0 R "
+                f"/MediaBox [0 0 {_num(p.w * p.unit)} {_num(p.h * p.unit)}] "
+                f"/Resources << /Font << {fonts} >> /XObject << {xobjs} >> >> /Contents {content} 0 R >>"))
+        self._objs[pages_ref - 1] = (f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] "
+                                     f"/Count {len(kids)} >>").encode("latin-1")
+        catalog = self._obj(f"<< /Type /Catalog /Pages {pages_ref} 0 R >>")
+
+        out = io.BytesIO()
+        out.write(b"%PDF-1.6\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for i, body in enumerate(self._objs, 1):
+            offsets.append(out.tell())
+            out.write(f"{i} 0 obj\n".encode("latin-1") + body + b"\nendobj\n")
+        xref = out.tell()
+        out.write(f"xref\n0 {len(self._objs) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+        for off in offsets:
+            out.write(f"{off:010d} 00000 n \n".encode("latin-1"))
+        out.write(f"trailer\n<< /Size {len(self._objs) + 1} /Root {catalog} 0 R >>\n"
+                  f"startxref\n{xref}\n%%EOF\n".encode("latin-1"))
+        with open(path, "wb") as fh:
+            fh.write(out.getvalue())
+        return path